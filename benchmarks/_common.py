@@ -0,0 +1,247 @@
+"""
+Benchmark'ların ortak yardımcıları: server modülünü içe aktarma, yerel
+server/REST stub süreçleri, yüzdelikler ve sonuç dosyası.
+"""
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ocpp_common.log_pipeline import setup_logging
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+SERVER_DIR = ROOT_DIR / "server"
+
+
+def add_server_path() -> None:
+    """server/ bir paket değil, betik dizini; modüllerini düz import edebilmek için."""
+    if str(SERVER_DIR) not in sys.path:
+        sys.path.insert(0, str(SERVER_DIR))
+
+
+def percentiles(samples: Sequence[float], scale: float = 1000.0) -> dict:
+    """Ham örneklerden kesin p50/p95/p99/max (varsayılan: ms)."""
+    if not samples:
+        return {"count": 0, "p50": None, "p95": None, "p99": None, "max": None, "avg": None}
+    data = sorted(samples)
+    n = len(data)
+
+    def pick(q: float) -> float:
+        return round(data[min(n - 1, int(q * n))] * scale, 3)
+
+    return {
+        "count": n,
+        "avg": round(sum(data) / n * scale, 3),
+        "p50": pick(0.50),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+        "max": round(data[-1] * scale, 3),
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=str(ROOT_DIR), stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def write_results(path: Optional[str], results: dict) -> None:
+    results.setdefault("meta", {}).update({
+        "git": git_revision(),
+        "python": sys.version.split()[0],
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    })
+    text = json.dumps(results, indent=2)
+    if path:
+        Path(path).write_text(text)
+        print(f"Results written to {path}")
+    print(text)
+
+
+def wait_for_port(host: str, port: int, timeout: float = 15.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise TimeoutError(f"{host}:{port} did not open within {timeout}s")
+
+
+def make_self_signed_cert(directory: str) -> Tuple[str, str]:
+    """TLS benchmark'ları için localhost sertifikası (openssl CLI gerekir)."""
+    cert = os.path.join(directory, "cert.pem")
+    key = os.path.join(directory, "key.pem")
+    subprocess.check_call(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-keyout", key, "-out", cert,
+         "-days", "1", "-subj", "/CN=localhost"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    return cert, key
+
+
+def _run_rest_stub(host: str, port: int) -> None:
+    import asyncio
+    from benchmarks.rest_stub import serve
+    asyncio.run(serve(host, port))
+
+
+def _run_server(host: str, port: int, rest_base: str, env: Dict[str, str], use_ssl: bool = False) -> None:
+    import asyncio
+    os.environ.update(env)
+    os.environ["REST_API_BASE"] = rest_base
+    os.environ.setdefault("REST_OUTBOX_DIR", "")
+    os.environ.setdefault("CONTROL_PORT", "0")  # kontrol API'si server_env ile açılabilir
+    add_server_path()
+    # Cluster worker'ları da setup_logging() ile LOG_LEVEL'i okur
+    os.environ.setdefault("LOG_LEVEL", os.environ.get("BENCH_SERVER_LOG", "WARNING"))
+    setup_logging()
+    from server import MockOCPPServer
+    server = MockOCPPServer(host=host, port=port, use_ssl=use_ssl)
+    asyncio.run(server.start())
+
+
+def _run_cluster(host: str, port: int, rest_base: str, env: Dict[str, str],
+                 workers: int, peer_base_port: int, use_ssl: bool = False) -> None:
+    import argparse
+    import signal
+    os.environ.update(env)
+    os.environ["REST_API_BASE"] = rest_base
+    os.environ.setdefault("REST_OUTBOX_DIR", "")
+    os.environ.setdefault("CONTROL_PORT", "0")  # kontrol API'si server_env ile açılabilir
+    add_server_path()
+    # Cluster worker'ları da setup_logging() ile LOG_LEVEL'i okur
+    os.environ.setdefault("LOG_LEVEL", os.environ.get("BENCH_SERVER_LOG", "WARNING"))
+    setup_logging()
+    from cluster import ServerCluster
+    args = argparse.Namespace(
+        workers=workers, host=host, port=port, no_ssl=not use_ssl,
+        registry=os.path.join(tempfile.mkdtemp(prefix="ocpp-bench-"), "connections.db"),
+        peer_base_port=peer_base_port, control_port=int(os.environ["CONTROL_PORT"]),
+    )
+    cluster = ServerCluster(args)
+    cluster.start()
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        cluster.supervise()
+    except SystemExit:
+        pass
+    finally:
+        cluster.stop()
+
+
+class LocalStack:
+    """
+    MockOCPPServer ve REST stub'ı ayrı süreçlerde başlatır; yük üreticiyle
+    aynı CPU'yu paylaşmasınlar diye. workers > 1 ise server cluster.py ile
+    SO_REUSEPORT modunda çalışır. auth_rules geçici bir AUTH_FILE'a yazılır
+    (bkz. server/auth_store.py kural sözdizimi). tls=True ile server geçici
+    self-signed sertifikayla wss:// üzerinden dinler.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8280, rest_port: int = 3900,
+                 auth_rules: Iterable[str] = (), server_env: Optional[Dict[str, str]] = None,
+                 workers: int = 1, peer_base_port: int = 8380, tls: bool = False) -> None:
+        self.host = host
+        self.port = port
+        self.rest_port = rest_port
+        self.workers = workers
+        self.peer_base_port = peer_base_port
+        self.auth_rules = list(auth_rules)
+        self.server_env = dict(server_env or {})
+        self.tls = tls
+        self._auth_dir: Optional[str] = None
+        self._cert_dir: Optional[str] = None
+        self._procs: List[multiprocessing.Process] = []
+        self._server: Optional[multiprocessing.Process] = None
+
+    @property
+    def url(self) -> str:
+        return f"{'wss' if self.tls else 'ws'}://{self.host}:{self.port}"
+
+    def start(self) -> "LocalStack":
+        ctx = multiprocessing.get_context("spawn")
+        stub = ctx.Process(target=_run_rest_stub, args=(self.host, self.rest_port), daemon=True)
+        stub.start()
+        self._procs.append(stub)
+        wait_for_port(self.host, self.rest_port)
+        self.start_server()
+        return self
+
+    def _write_auth_file(self) -> None:
+        if "AUTH_FILE" in self.server_env:
+            return
+        self._auth_dir = tempfile.mkdtemp(prefix="ocpp-bench-auth-")
+        path = os.path.join(self._auth_dir, "authorized_cp_ids.txt")
+        Path(path).write_text("\n".join(self.auth_rules) + "\n")
+        self.server_env["AUTH_FILE"] = path
+
+    def _write_cert(self) -> None:
+        if not self.tls or self._cert_dir is not None:
+            return
+        self._cert_dir = tempfile.mkdtemp(prefix="ocpp-bench-tls-")
+        cert, key = make_self_signed_cert(self._cert_dir)
+        self.server_env["TLS_CERT_FILE"] = cert
+        self.server_env["TLS_KEY_FILE"] = key
+
+    def start_server(self) -> None:
+        ctx = multiprocessing.get_context("spawn")
+        rest_base = f"http://{self.host}:{self.rest_port}"
+        self._write_auth_file()
+        self._write_cert()
+        if self.workers > 1:
+            # Cluster kendi worker süreçlerini açar; daemon süreçler çocuk açamaz
+            self._server = ctx.Process(
+                target=_run_cluster,
+                args=(self.host, self.port, rest_base, self.server_env,
+                      self.workers, self.peer_base_port, self.tls),
+            )
+        else:
+            self._server = ctx.Process(
+                target=_run_server,
+                args=(self.host, self.port, rest_base, self.server_env, self.tls),
+                daemon=True,
+            )
+        self._server.start()
+        wait_for_port(self.host, self.port)
+
+    def stop_server(self) -> None:
+        if self._server is not None:
+            self._server.terminate()
+            self._server.join(5)
+            self._server = None
+
+    def stop(self) -> None:
+        self.stop_server()
+        for proc in self._procs:
+            proc.terminate()
+            proc.join(5)
+        self._procs = []
+        if self._auth_dir is not None:
+            shutil.rmtree(self._auth_dir, ignore_errors=True)
+            self.server_env.pop("AUTH_FILE", None)
+            self._auth_dir = None
+        if self._cert_dir is not None:
+            shutil.rmtree(self._cert_dir, ignore_errors=True)
+            self.server_env.pop("TLS_CERT_FILE", None)
+            self.server_env.pop("TLS_KEY_FILE", None)
+            self._cert_dir = None
+
+    def __enter__(self) -> "LocalStack":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
@@ -0,0 +1,96 @@
+"""
+JSON codec mikro-benchmark'ı: ocpp_common.codec backend'lerini (stdlib json,
+orjson) gerçek OCPP 1.6 çerçeveleri üzerinde karşılaştırır.
+
+Her çerçeve için ölçülenler (µs/işlem):
+    loads_str   : websocket text frame'i çözme (server/client okuma yolu)
+    loads_bytes : bytes çözme (peer kanalı, outbox satırları)
+    dumps_text  : websocket text frame üretme
+    dumps_bytes : REST gövdesi / NDJSON satırı üretme
+
+    python -m benchmarks.codec_bench --iterations 100000 --output results/codec.json
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import datetime, timezone
+
+from benchmarks._common import write_results
+from benchmarks.dispatch_bench import sample_payloads
+from ocpp_common.codec import BACKENDS
+
+
+def sample_frames() -> dict:
+    now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+    frames = {
+        f"CALL {action}": [2, "3f1c9a52-8d1e-4b8e-9d0c-1a2b3c4d5e6f", action, payload]
+        for action, payload in sample_payloads().items()
+    }
+    frames["CALLRESULT BootNotification"] = [
+        3, "3f1c9a52-8d1e-4b8e-9d0c-1a2b3c4d5e6f",
+        {"status": "Accepted", "currentTime": now, "interval": 60},
+    ]
+    frames["CALLERROR"] = [
+        4, "3f1c9a52-8d1e-4b8e-9d0c-1a2b3c4d5e6f", "PropertyConstraintViolation",
+        "$.status: 'Bogus' is not an allowed value", {"path": "$.status"},
+    ]
+    # UI'ye giden tipik broadcast mesajı
+    frames["UI status_update"] = {
+        "type": "status_update", "connector_id": 1, "status": "Charging",
+        "timestamp": now, "charge_point_id": "VESTEL-EVC-001",
+    }
+    return frames
+
+
+def _per_op(fn, arg, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(arg)
+    return round((time.perf_counter() - start) / iterations * 1e6, 3)
+
+
+def run(args: argparse.Namespace) -> dict:
+    codecs = {}
+    for name, cls in BACKENDS.items():
+        try:
+            codecs[name] = cls()
+        except ImportError:
+            print(f"{name}: not installed, skipped")
+
+    reference = BACKENDS["json"]()
+    results = {}
+    for label, frame in sample_frames().items():
+        text = reference.dumps_text(frame)
+        data = text.encode("utf-8")
+        row = {"frame_bytes": len(data)}
+        for name, codec in codecs.items():
+            row[name] = {
+                "loads_str": _per_op(codec.loads, text, args.iterations),
+                "loads_bytes": _per_op(codec.loads, data, args.iterations),
+                "dumps_text": _per_op(codec.dumps_text, frame, args.iterations),
+                "dumps_bytes": _per_op(codec.dumps, frame, args.iterations),
+            }
+        if "orjson" in row:
+            row["speedup"] = {
+                op: round(row["json"][op] / row["orjson"][op], 2) if row["orjson"][op] else None
+                for op in row["json"]
+            }
+        results[label] = row
+    return {"config": {"iterations": args.iterations, "backends": list(codecs)}, "frames": results}
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="ocpp_common.codec backend comparison on OCPP frames")
+    parser.add_argument("--iterations", type=int, default=50000, help="Çerçeve ve işlem başına tekrar")
+    parser.add_argument("--output", help="Sonuç JSON dosyası")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    write_results(args.output, run(args))
+
+
+if __name__ == "__main__":
+    main()
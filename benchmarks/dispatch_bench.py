@@ -0,0 +1,118 @@
+"""
+Server mesaj işleme mikro-benchmark'ı (ağ yok).
+
+Her core action için örnek CALL çerçevesi MockOCPPServer.handle_message'dan
+geçirilir (JSON parse → doğrulama → handler → CALLRESULT serialize) ve
+şema doğrulamasının mesaj başına süredeki payı ölçülür. REST forward ve
+websocket gönderimi sahte nesnelerle devre dışıdır.
+
+    python -m benchmarks.dispatch_bench --iterations 50000 --output results/dispatch.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+
+from benchmarks._common import add_server_path, write_results
+
+
+def sample_payloads() -> dict:
+    now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+    meter_value = {
+        "timestamp": now,
+        "sampledValue": [
+            {"value": "1234.5", "measurand": "Energy.Active.Import.Register", "unit": "Wh"},
+            {"value": "7200", "measurand": "Power.Active.Import", "unit": "W"},
+            {"value": "230.1", "measurand": "Voltage", "phase": "L1-N", "unit": "V"},
+        ],
+    }
+    return {
+        "Authorize": {"idTag": "TAG-0001"},
+        "BootNotification": {
+            "chargePointVendor": "Vestel", "chargePointModel": "AC22kW",
+            "chargePointSerialNumber": "VST-00000001", "chargeBoxSerialNumber": "BOX-00000001",
+            "firmwareVersion": "1.2.3", "iccid": "89860000000000000001", "imsi": "286010000000001",
+            "meterType": "AC", "meterSerialNumber": "MTR-00000001",
+        },
+        "DataTransfer": {"vendorId": "Vestel", "messageId": "Ping", "data": "{}"},
+        "Heartbeat": {},
+        "MeterValues": {"connectorId": 1, "transactionId": 1, "meterValue": [meter_value]},
+        "StartTransaction": {"connectorId": 1, "idTag": "TAG-0001", "meterStart": 0, "timestamp": now},
+        "StatusNotification": {"connectorId": 1, "errorCode": "NoError", "status": "Charging", "timestamp": now},
+        "StopTransaction": {
+            "transactionId": 1, "idTag": "TAG-0001", "meterStop": 12000, "timestamp": now,
+            "reason": "EVDisconnected", "transactionData": [meter_value],
+        },
+    }
+
+
+class NullWebSocket:
+    async def send(self, message) -> None:
+        pass
+
+
+async def _time_dispatch(server, raw: str, iterations: int) -> float:
+    websocket = NullWebSocket()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await server.handle_message(websocket, "BENCH-001", raw)
+    return (time.perf_counter() - start) / iterations
+
+
+def _time_validator(validator, payload: dict, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        validator(payload)
+    return (time.perf_counter() - start) / iterations
+
+
+def run(args: argparse.Namespace) -> dict:
+    os.environ["REST_OUTBOX_DIR"] = ""
+    add_server_path()
+    import server as server_module
+
+    logging.getLogger().setLevel(logging.WARNING)
+    server = server_module.MockOCPPServer(use_ssl=False)
+    server.rest_forwarder.submit = lambda endpoint, payload: True
+
+    loop = asyncio.new_event_loop()
+    results = {}
+    try:
+        for action, payload in sample_payloads().items():
+            raw = json.dumps([2, "bench-1", action, payload])
+            server.validate_payloads = True
+            with_validation = loop.run_until_complete(_time_dispatch(server, raw, args.iterations))
+            server.validate_payloads = False
+            without_validation = loop.run_until_complete(_time_dispatch(server, raw, args.iterations))
+            validator_only = _time_validator(server_module.REQUEST_VALIDATORS[action], payload, args.iterations)
+            results[action] = {
+                "frame_bytes": len(raw),
+                "us_per_msg": round(with_validation * 1e6, 2),
+                "us_per_msg_no_validation": round(without_validation * 1e6, 2),
+                "validation_us": round(validator_only * 1e6, 2),
+                "validation_share_pct": round(validator_only / with_validation * 100, 1),
+            }
+    finally:
+        loop.close()
+    return {"config": {"iterations": args.iterations}, "actions": results}
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="MockOCPPServer dispatch/validation micro-benchmark")
+    parser.add_argument("--iterations", type=int, default=20000, help="Action başına mesaj sayısı")
+    parser.add_argument("--output", help="Sonuç JSON dosyası")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    write_results(args.output, run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Boşta bekleyen client'lar için heartbeat zamanlama maliyeti (ağ yok).
+
+Aynı event loop'ta N adet OCPPClient yalnızca heartbeat gönderir;
+gönderim sahte bir coroutine'dir. İki mod karşılaştırılır:
+
+    tasks : client başına uyuyan heartbeat coroutine'i (eski _heartbeat_loop,
+            datetime ile)
+    wheel : paylaşılan timer wheel (ocpp_client/client/timer_wheel.py)
+
+Ölçülenler: loop uyanma sayısı (selector.select çağrısı), süreç CPU
+zamanı, gönderilen heartbeat sayısı ve heartbeat gecikmesi (vaktinden
+ne kadar geç gönderildiği).
+
+    python -m benchmarks.heartbeat_bench --clients 10000 --interval 5 --duration 20 \
+        --output results/heartbeat.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+
+from benchmarks._common import write_results
+from ocpp_client.client.latency import LatencyHistogram
+from ocpp_client.client.ocpp_client import OCPPClient
+from ocpp_client.client.timer_wheel import shared_wheel
+
+
+async def _legacy_heartbeat_loop(client: OCPPClient, lag: LatencyHistogram) -> None:
+    # Timer wheel öncesi OCPPClient._heartbeat_loop'un aynısı
+    while client.connected:
+        elapsed = (datetime.now() - client.last_message_time).total_seconds()
+        wait_time = max(client.heartbeat_interval - elapsed, 0)
+        if wait_time > 0:
+            await asyncio.sleep(wait_time)
+        overdue = (datetime.now() - client.last_message_time).total_seconds() - client.heartbeat_interval
+        if overdue >= 0:
+            lag.observe(overdue)
+            await client.send_heartbeat()
+            client.last_message_time = datetime.now()
+
+
+def _make_clients(count: int, interval: int) -> list:
+    clients = []
+    for i in range(count):
+        client = OCPPClient("ws://127.0.0.1:1", f"BENCH-{i:06d}")
+        client.connected = True
+        client.heartbeat_interval = interval
+        clients.append(client)
+    return clients
+
+
+async def _run_mode(mode: str, clients: list, interval: int, duration: float) -> dict:
+    loop = asyncio.get_running_loop()
+    selector = loop._selector  # uyanma sayacı
+    select = selector.select
+    wakeups = 0
+
+    def counting_select(timeout=None):
+        nonlocal wakeups
+        wakeups += 1
+        return select(timeout)
+
+    sent = 0
+
+    async def fake_send_heartbeat() -> None:
+        nonlocal sent
+        sent += 1
+
+    lag = LatencyHistogram()
+    tasks = []
+    now_mono = time.monotonic()
+    now_wall = datetime.now()
+    for client in clients:
+        client.connected = True
+        client.send_heartbeat = fake_send_heartbeat
+        offset = random.uniform(0, interval)  # heartbeat'ler interval boyunca dağılsın
+        client.last_message_at = now_mono - offset
+        client.last_message_time = now_wall - timedelta(seconds=offset)
+        client.heartbeat_lag = LatencyHistogram()
+        if mode == "tasks":
+            tasks.append(asyncio.create_task(_legacy_heartbeat_loop(client, lag)))
+        else:
+            client._arm_heartbeat()
+
+    selector.select = counting_select
+    cpu_start = time.process_time()
+    await asyncio.sleep(duration)
+    cpu = time.process_time() - cpu_start
+    selector.select = select
+
+    for client in clients:
+        client.connected = False
+        if client._hb_timer is not None:
+            client._hb_timer.cancel()
+            client._hb_timer = None
+        lag_hist = client.heartbeat_lag
+        for i, n in enumerate(lag_hist.counts):
+            lag.counts[i] += n
+        lag.count += lag_hist.count
+        lag.sum += lag_hist.sum
+        lag.max = max(lag.max, lag_hist.max)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    result = {
+        "heartbeats": sent,
+        "wakeups": wakeups,
+        "wakeups_per_s": round(wakeups / duration, 1),
+        "cpu_s": round(cpu, 3),
+        "cpu_pct": round(cpu / duration * 100, 1),
+        "lag_ms": {k: round(v * 1000, 3) if isinstance(v, float) else v for k, v in lag.snapshot().items()},
+    }
+    if mode == "wheel":
+        result["wheel_wakeups"] = shared_wheel().wakeups
+    return result
+
+
+def run(args: argparse.Namespace) -> dict:
+    clients = _make_clients(args.clients, args.interval)
+    results = {}
+    for mode in args.modes:
+        results[mode] = asyncio.run(_run_mode(mode, clients, args.interval, args.duration))
+        print(f"{mode}: {results[mode]}")
+    return {
+        "config": {"clients": args.clients, "interval_s": args.interval, "duration_s": args.duration},
+        "modes": results,
+    }
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Idle-client heartbeat scheduling cost: per-client tasks vs timer wheel")
+    parser.add_argument("--clients", type=int, default=10000)
+    parser.add_argument("--interval", type=int, default=5, help="Heartbeat aralığı (sn)")
+    parser.add_argument("--duration", type=float, default=20.0, help="Mod başına ölçüm süresi (sn)")
+    parser.add_argument("--modes", nargs="+", default=["tasks", "wheel"], choices=["tasks", "wheel"])
+    parser.add_argument("--output", help="Sonuç JSON dosyası")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    write_results(args.output, run(args))
+
+
+if __name__ == "__main__":
+    main()
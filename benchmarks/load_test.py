@@ -0,0 +1,201 @@
+"""
+MockOCPPServer için uçtan uca yük testi.
+
+N eşzamanlı OCPP 1.6 websocket oturumu açar; her oturum BootNotification,
+periyodik Heartbeat ve (Poisson) StatusNotification gönderir. Action bazlı
+CALL→CALLRESULT gecikmesi (p50/p95/p99/max), bağlantı kurulum süresi,
+hatalar ve ulaşılan mesaj/sn JSON olarak yazılır.
+
+Tamamen offline, yerel server + REST stub ile:
+    python -m benchmarks.load_test --local --clients 2000 --duration 60 \
+        --output results/load-$(git rev-parse --short HEAD).json
+
+Çalışan bir server'a karşı:
+    python -m benchmarks.load_test --url ws://localhost:8080 --prefix VESTEL-EVC --clients 8
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import ssl
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import websockets
+
+from benchmarks._common import LocalStack, percentiles, write_results
+
+STATUSES = ["Available", "Preparing", "Charging", "SuspendedEV", "Finishing"]
+
+
+class LoadStats:
+    def __init__(self) -> None:
+        self.latency: Dict[str, List[float]] = defaultdict(list)
+        self.connect_time: List[float] = []
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.attempted = 0
+        self.established = 0
+        self.completed_calls = 0
+        self.started_at = 0.0
+        self.steady_at = 0.0  # ramp bittiği an
+
+    def error(self, kind: str) -> None:
+        self.errors[kind] += 1
+
+
+class Session:
+    """Tek bir simüle CP; aynı anda tek bekleyen CALL (OCPP kuralı)."""
+
+    def __init__(self, cp_id: str, args: argparse.Namespace, stats: LoadStats) -> None:
+        self.cp_id = cp_id
+        self.args = args
+        self.stats = stats
+        self.ws = None
+
+    async def call(self, action: str, payload: dict) -> Optional[dict]:
+        msg_id = uuid.uuid4().hex
+        t0 = time.perf_counter()
+        await self.ws.send(json.dumps([2, msg_id, action, payload]))
+        while True:
+            raw = await asyncio.wait_for(self.ws.recv(), timeout=self.args.call_timeout)
+            frame = json.loads(raw)
+            if frame[1] != msg_id:
+                continue  # server-initiated CALL vb.; yük testinde yok sayılır
+            if frame[0] == 4:
+                self.stats.error(f"callerror:{action}:{frame[2]}")
+                return None
+            self.stats.latency[action].append(time.perf_counter() - t0)
+            self.stats.completed_calls += 1
+            return frame[2]
+
+    async def run(self, deadline: float) -> None:
+        args, stats = self.args, self.stats
+        stats.attempted += 1
+        uri = f"{args.url.rstrip('/')}/{self.cp_id}"
+        ssl_ctx = ssl._create_unverified_context() if uri.startswith("wss") else None
+        t0 = time.perf_counter()
+        try:
+            self.ws = await websockets.connect(
+                uri, subprotocols=["ocpp1.6"], ssl=ssl_ctx,
+                ping_interval=None, open_timeout=args.call_timeout, max_queue=None,
+            )
+        except Exception as e:
+            stats.error(f"connect:{type(e).__name__}")
+            return
+        stats.connect_time.append(time.perf_counter() - t0)
+        stats.established += 1
+
+        try:
+            await self.call("BootNotification", {
+                "chargePointVendor": "LoadTest",
+                "chargePointModel": "Bench",
+                "chargePointSerialNumber": self.cp_id,
+            })
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            # İlk heartbeat'leri yay ki tüm oturumlar aynı anda atmasın
+            next_hb = now + random.uniform(0, args.heartbeat_interval)
+            next_status = now + (random.expovariate(args.status_rate) if args.status_rate > 0 else float("inf"))
+            while True:
+                now = loop.time()
+                if now >= deadline:
+                    break
+                wake = min(next_hb, next_status, deadline)
+                if wake > now:
+                    await asyncio.sleep(wake - now)
+                    continue
+                if next_hb <= now:
+                    await self.call("Heartbeat", {})
+                    next_hb += args.heartbeat_interval
+                if next_status <= now:
+                    await self.call("StatusNotification", {
+                        "connectorId": random.randint(1, 2),
+                        "errorCode": "NoError",
+                        "status": random.choice(STATUSES),
+                        "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+                    })
+                    next_status += random.expovariate(args.status_rate)
+        except asyncio.TimeoutError:
+            stats.error("timeout")
+        except websockets.exceptions.ConnectionClosed as e:
+            stats.error(f"closed:{e.code}")
+        except Exception as e:
+            stats.error(f"session:{type(e).__name__}")
+        finally:
+            await self.ws.close()
+
+
+async def run_load(args: argparse.Namespace) -> dict:
+    stats = LoadStats()
+    ids = [f"{args.prefix}-{i:05d}" for i in range(1, args.clients + 1)]
+    loop = asyncio.get_running_loop()
+    stats.started_at = loop.time()
+    ramp_delay = args.ramp_up / len(ids) if ids and args.ramp_up > 0 else 0
+    deadline = stats.started_at + args.ramp_up + args.duration
+
+    tasks = []
+    for cp_id in ids:
+        tasks.append(asyncio.create_task(Session(cp_id, args, stats).run(deadline)))
+        if ramp_delay:
+            await asyncio.sleep(ramp_delay)
+    stats.steady_at = loop.time()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    elapsed = loop.time() - stats.started_at
+
+    return {
+        "config": {
+            "url": args.url,
+            "clients": args.clients,
+            "ramp_up_s": args.ramp_up,
+            "duration_s": args.duration,
+            "heartbeat_interval_s": args.heartbeat_interval,
+            "status_rate_per_cp": args.status_rate,
+        },
+        "connections": {
+            "attempted": stats.attempted,
+            "established": stats.established,
+            "setup_ms": percentiles(stats.connect_time),
+        },
+        "latency_ms": {action: percentiles(samples) for action, samples in sorted(stats.latency.items())},
+        "errors": dict(stats.errors),
+        "calls_completed": stats.completed_calls,
+        "elapsed_s": round(elapsed, 3),
+        "messages_per_sec": round(stats.completed_calls / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="OCPP 1.6 load generator for MockOCPPServer")
+    parser.add_argument("--url", default="ws://127.0.0.1:8280", help="Server adresi (--local ile yok sayılır)")
+    parser.add_argument("--local", action="store_true", help="Yerel server + REST stub başlat")
+    parser.add_argument("--port", type=int, default=8280, help="--local server portu")
+    parser.add_argument("--rest-port", type=int, default=3900, help="--local REST stub portu")
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--prefix", default="LOAD")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="Tüm oturumların açılma süresi (sn)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Ramp sonrası ölçüm süresi (sn)")
+    parser.add_argument("--heartbeat-interval", type=float, default=10.0)
+    parser.add_argument("--status-rate", type=float, default=0.2, help="CP başına saniyede StatusNotification")
+    parser.add_argument("--call-timeout", type=float, default=30.0)
+    parser.add_argument("--output", help="Sonuç JSON dosyası")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    if args.local:
+        with LocalStack(port=args.port, rest_port=args.rest_port, auth_rules=[f"{args.prefix}-*"]) as stack:
+            args.url = stack.url
+            results = asyncio.run(run_load(args))
+    else:
+        results = asyncio.run(run_load(args))
+    write_results(args.output, results)
+
+
+if __name__ == "__main__":
+    main()
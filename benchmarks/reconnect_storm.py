@@ -0,0 +1,152 @@
+"""
+Server yeniden başlatılırken yeniden bağlanma fırtınası ve toparlanma süresi.
+
+Aynı süreçte N adet OCPPClient (FleetRunner) yerel server'a bağlanır; hepsi
+Accepted olunca server süreci durdurulur, --downtime sn sonra yeniden
+başlatılır ve herkesin tekrar Accepted olma süresi ölçülür. Modlar:
+
+    legacy : eski davranış; jitter'sız 2→4→8→16→30 backoff, temiz
+             kapanıştan sonra beklemeden yeniden bağlanma, handshake sınırı yok
+    jitter : full jitter backoff + paylaşılan ConnectLimiter
+             (bkz. ocpp_client/client/reconnect.py)
+
+Ölçülenler: toparlanma süresi (ilk kopuştan son Accepted'a), yeniden
+bağlanma denemesi sayısı, saniyelik deneme tepe değeri, BootNotification
+hataları.
+
+    python -m benchmarks.reconnect_storm --clients 5000 --downtime 3 \
+        --output results/reconnect-storm.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from benchmarks._common import LocalStack, write_results
+from ocpp_client.client.fleet import FleetRunner, build_ids
+from ocpp_client.client.reconnect import Backoff
+from ocpp_common.log_pipeline import setup_logging
+
+
+class LegacyBackoff(Backoff):
+    """reconnect.Backoff öncesi OCPPClient.start davranışı."""
+
+    def reset(self) -> None:
+        self.attempt = 0
+        self._skip = True  # başarılı oturumdan sonra beklemeden bağlan
+
+    def next(self) -> float:
+        if self._skip:
+            self._skip = False
+            return 0.0
+        delay = min(2 * 2 ** self.attempt, 30)
+        self.attempt += 1
+        return delay
+
+
+def _attempts(runner: FleetRunner) -> int:
+    return sum(client.reconnects for client in runner.clients.values())
+
+
+async def _wait_all_accepted(runner: FleetRunner, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if runner.connected_count() == len(runner.clients):
+            return True
+        await asyncio.sleep(0.1)
+    return False
+
+
+async def _run_mode(mode: str, stack: LocalStack, args: argparse.Namespace) -> dict:
+    loop = asyncio.get_running_loop()
+    if mode == "legacy":
+        runner = FleetRunner(stack.url, ramp_rate=args.ramp_rate, connect_rate=0,
+                             connect_concurrency=args.clients)
+    else:
+        runner = FleetRunner(stack.url, ramp_rate=args.ramp_rate, connect_rate=args.connect_rate,
+                             connect_concurrency=args.connect_concurrency)
+    ids = build_ids(f"{args.prefix}-{mode.upper()}", args.clients)
+    await runner.add_many(ids)
+    if mode == "legacy":
+        for client in runner.clients.values():
+            client.backoff = LegacyBackoff()
+    if not await _wait_all_accepted(runner, args.timeout):
+        raise RuntimeError(f"{mode}: initial ramp did not complete ({runner.connected_count()}/{args.clients})")
+
+    attempts_before = _attempts(runner)
+    failures_before = sum(c.send_failures.get("BootNotification", 0) for c in runner.clients.values())
+    restart_at = time.monotonic()
+    await loop.run_in_executor(None, stack.stop_server)
+    await asyncio.sleep(args.downtime)
+    await loop.run_in_executor(None, stack.start_server)
+    server_up = time.monotonic() - restart_at
+
+    # Saniyelik deneme sayısı (tepe değeri fırtınanın şiddeti)
+    peak_rate = 0
+    last = _attempts(runner)
+    recovered = False
+    deadline = time.monotonic() + args.timeout
+    while time.monotonic() < deadline:
+        await asyncio.sleep(1.0)
+        now_attempts = _attempts(runner)
+        peak_rate = max(peak_rate, now_attempts - last)
+        last = now_attempts
+        if runner.reconnect_tracker.outage_started is None and runner.connected_count() == len(runner.clients):
+            recovered = True
+            break
+
+    tracker = runner.reconnect_tracker
+    result = {
+        "recovered": recovered,
+        "server_up_after_s": round(server_up, 2),
+        "full_reconnect_s": round(tracker.last_recovery, 2) if recovered and tracker.last_recovery else None,
+        "accepted": runner.connected_count(),
+        "reconnect_attempts": _attempts(runner) - attempts_before,
+        "peak_attempts_per_s": peak_rate,
+        "boot_failures": sum(c.send_failures.get("BootNotification", 0) for c in runner.clients.values())
+                         - failures_before,
+    }
+    await runner.stop()
+    return result
+
+
+async def run(args: argparse.Namespace) -> dict:
+    results = {}
+    with LocalStack(port=args.port, rest_port=args.rest_port, auth_rules=[f"{args.prefix}-*"]) as stack:
+        for mode in args.modes:
+            results[mode] = await _run_mode(mode, stack, args)
+            print(f"{mode}: {results[mode]}")
+    return {
+        "config": {
+            "clients": args.clients, "downtime_s": args.downtime, "connect_rate": args.connect_rate,
+            "connect_concurrency": args.connect_concurrency,
+        },
+        "modes": results,
+    }
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Reconnect storm after a server restart: legacy backoff vs jitter + connect limiter")
+    parser.add_argument("--clients", type=int, default=5000)
+    parser.add_argument("--downtime", type=float, default=3.0, help="Server'ın kapalı kaldığı süre (sn)")
+    parser.add_argument("--modes", nargs="+", default=["legacy", "jitter"], choices=["legacy", "jitter"])
+    parser.add_argument("--connect-rate", type=float, default=200.0)
+    parser.add_argument("--connect-concurrency", type=int, default=100)
+    parser.add_argument("--ramp-rate", type=float, default=0, help="İlk açılış hızı (0: sınırsız)")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Toparlanma için en fazla bekleme (sn)")
+    parser.add_argument("--prefix", default="STORM")
+    parser.add_argument("--port", type=int, default=8280)
+    parser.add_argument("--rest-port", type=int, default=3900)
+    parser.add_argument("--output", help="Sonuç JSON dosyası")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    setup_logging(level="CRITICAL")  # binlerce "Connection failed" satırı ölçümü bozmasın
+    write_results(args.output, asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Yük testleri için yerel REST backend yerine geçen stub.
+
+evc/backend (Express + Prisma) olmadan MockOCPPServer'ın REST forward
+yolunu çalıştırır: her POST'u (tek kayıt ya da /bulk dizisi) sayar ve 201 döner.
+
+    python -m benchmarks.rest_stub --port 3900
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+
+from aiohttp import web
+
+
+class RestStub:
+    def __init__(self) -> None:
+        self.requests = 0
+        self.records = 0
+
+    async def handle(self, request: web.Request) -> web.Response:
+        body = await request.read()
+        self.requests += 1
+        try:
+            data = json.loads(body) if body else None
+            self.records += len(data) if isinstance(data, list) else 1
+        except ValueError:
+            return web.json_response({"error": "invalid json"}, status=400)
+        return web.json_response({"ok": True}, status=201)
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response({"requests": self.requests, "records": self.records})
+
+    def app(self) -> web.Application:
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_get("/__stats", self.stats)
+        app.router.add_post("/{tail:.*}", self.handle)
+        return app
+
+
+async def serve(host: str = "127.0.0.1", port: int = 3900) -> None:
+    runner = web.AppRunner(RestStub().app(), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    await asyncio.Future()  # Run forever
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Local REST stand-in for load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3900)
+    args = parser.parse_args(argv)
+    asyncio.run(serve(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
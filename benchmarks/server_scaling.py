@@ -0,0 +1,96 @@
+"""
+Çok süreçli (SO_REUSEPORT) MockOCPPServer throughput ölçeklenmesi.
+
+Her worker sayısı için yerel cluster + REST stub başlatılır ve birden fazla
+yük üreticisi süreci (tek süreçli üretici darboğaz olmasın diye) aynı anda
+benchmarks.load_test oturumları açar. Sonuçta worker sayısına karşı
+mesaj/sn ve gecikme tablosu yazılır.
+
+    python -m benchmarks.server_scaling --workers 1 2 4 --clients 2000 \
+        --generators 4 --duration 30 --output results/scaling.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import multiprocessing
+from typing import List
+
+from benchmarks._common import LocalStack, write_results
+from benchmarks.load_test import parse_args as load_args, run_load
+
+
+def _generator(argv: List[str]) -> dict:
+    return asyncio.run(run_load(load_args(argv)))
+
+
+def run_point(workers: int, args: argparse.Namespace) -> dict:
+    per_gen = max(1, args.clients // args.generators)
+    prefixes = [f"SCALE{g}" for g in range(args.generators)]
+    rules = [f"{p}-*" for p in prefixes]
+
+    with LocalStack(port=args.port, rest_port=args.rest_port, auth_rules=rules, workers=workers) as stack:
+        argvs = [[
+            "--url", stack.url, "--prefix", p, "--clients", str(per_gen),
+            "--ramp-up", str(args.ramp_up), "--duration", str(args.duration),
+            "--heartbeat-interval", str(args.heartbeat_interval),
+            "--status-rate", str(args.status_rate),
+        ] for p in prefixes]
+        with multiprocessing.get_context("spawn").Pool(args.generators) as pool:
+            parts = pool.map(_generator, argvs)
+
+    actions = {}
+    for part in parts:
+        for action, lat in part["latency_ms"].items():
+            agg = actions.setdefault(action, {"count": 0, "p50": [], "p99": [], "max": 0.0})
+            agg["count"] += lat["count"]
+            agg["p50"].append(lat["p50"] or 0.0)
+            agg["p99"].append(lat["p99"] or 0.0)
+            agg["max"] = max(agg["max"], lat["max"] or 0.0)
+    return {
+        "workers": workers,
+        "clients": per_gen * args.generators,
+        "established": sum(p["connections"]["established"] for p in parts),
+        "messages_per_sec": round(sum(p["messages_per_sec"] for p in parts), 1),
+        # Üreticiler arası: p50 ortalaması, p99 için en kötüsü (muhafazakâr)
+        "latency_ms": {
+            action: {
+                "count": a["count"],
+                "p50": round(sum(a["p50"]) / len(a["p50"]), 3),
+                "p99_worst": max(a["p99"]),
+                "max": a["max"],
+            }
+            for action, a in actions.items()
+        },
+        "errors": sum(sum(p["errors"].values()) for p in parts),
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="MockOCPPServer multi-process throughput scaling")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--generators", type=int, default=max(1, (multiprocessing.cpu_count() or 2) // 2))
+    parser.add_argument("--ramp-up", type=float, default=5.0)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--heartbeat-interval", type=float, default=1.0)
+    parser.add_argument("--status-rate", type=float, default=1.0)
+    parser.add_argument("--port", type=int, default=8280)
+    parser.add_argument("--rest-port", type=int, default=3900)
+    parser.add_argument("--output")
+    args = parser.parse_args(argv)
+
+    points = []
+    for workers in args.workers:
+        point = run_point(workers, args)
+        print(f"workers={workers}: {point['messages_per_sec']} msg/s, errors={point['errors']}")
+        points.append(point)
+
+    base = points[0]["messages_per_sec"] or 1.0
+    for point in points:
+        point["speedup"] = round(point["messages_per_sec"] / base, 2)
+    write_results(args.output, {"config": vars(args), "points": points})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+StatusSimulator ölçek testi (ağ yok): tek event loop'ta N connector'ı
+otomatik modda sürer ve CPU, bellek, olay ve StatusNotification hızını
+ölçer. Client yerine gönderimi sayan sahte bir nesne kullanılır.
+
+    python -m benchmarks.simulator_bench --connectors 100000 --per-client 2 --duration 60 \
+        --output results/simulator.json
+
+--status-change-probability ile geçiş sıklığı artırılabilir (varsayılan
+config değeri 0.15).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import time
+import tracemalloc
+
+from benchmarks._common import write_results
+from ocpp_client.client.event_scheduler import shared_scheduler
+from ocpp_client.client.status_simulator import StatusSimulator
+
+
+class CountingClient:
+    def __init__(self, cp_id: str, connector_count: int, probability: float, counter: list) -> None:
+        self.charge_point_id = cp_id
+        self.config = {
+            "connector_count": connector_count,
+            "simulation": {"status_change_probability": probability},
+        }
+        self._counter = counter
+
+    async def send_status_notification(self, connector_id: int, status: str, error_code: str = "NoError") -> None:
+        self._counter[0] += 1
+
+
+async def _run(args: argparse.Namespace) -> dict:
+    counter = [0]
+    clients = max(1, args.connectors // args.per_client)
+    tracemalloc.start()
+    simulators = []
+    for i in range(clients):
+        simulator = StatusSimulator(CountingClient(f"SIM-{i:06d}", args.per_client, args.status_change_probability, counter))
+        simulator.manual_mode = args.manual
+        simulators.append(simulator)
+    tasks = [asyncio.create_task(simulator.start()) for simulator in simulators]
+
+    await asyncio.sleep(args.warmup)  # ilk StatusNotification turu (start içinde 2 sn bekleme)
+    gc.collect()
+    scheduler = shared_scheduler()
+    notifications_start, fired_start, wakeups_start = counter[0], scheduler.fired, scheduler.wakeups
+    cpu_start = time.process_time()
+    await asyncio.sleep(args.duration)
+    cpu = time.process_time() - cpu_start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = {
+        "connectors": clients * args.per_client,
+        "manual": args.manual,
+        "pending_events": len(scheduler),
+        "events_per_s": round((scheduler.fired - fired_start) / args.duration, 1),
+        "scheduler_wakeups_per_s": round((scheduler.wakeups - wakeups_start) / args.duration, 1),
+        "status_notifications_per_s": round((counter[0] - notifications_start) / args.duration, 1),
+        "cpu_pct": round(cpu / args.duration * 100, 1),
+        "traced_memory_mb": round(current / 1e6, 1),
+        "traced_peak_mb": round(peak / 1e6, 1),
+    }
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return result
+
+
+def run(args: argparse.Namespace) -> dict:
+    result = asyncio.run(_run(args))
+    print(result)
+    return {"config": vars(args), "result": result}
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="StatusSimulator event scheduler scale test")
+    parser.add_argument("--connectors", type=int, default=100000)
+    parser.add_argument("--per-client", type=int, default=2, help="Client başına connector")
+    parser.add_argument("--duration", type=float, default=30.0, help="Ölçüm süresi (sn)")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Ölçüm öncesi bekleme (ilk bildirim turu)")
+    parser.add_argument("--status-change-probability", type=float, default=0.15)
+    parser.add_argument("--manual", action="store_true", help="Manuel mod (olay kurulmaz)")
+    parser.add_argument("--output", help="Sonuç JSON dosyası")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    write_results(args.output, run(args))
+
+
+if __name__ == "__main__":
+    main()
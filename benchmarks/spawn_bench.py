@@ -0,0 +1,64 @@
+"""
+sim_manager toplu spawn throughput'u (CP/sn).
+
+spawn_jobs.submit_ui farklı launch havuzu boyutlarıyla çalıştırılır
+(1: eski sıralı davranışa yakın temel çizgi). Ölçülen süre port aralığı
+ayırma + log dosyaları + Popen dönüşüne kadardır; client'ın hazır olmasını
+kapsamaz. Her noktadan sonra açılan süreçler öldürülür.
+
+    python -m benchmarks.spawn_bench --count 200 --concurrency 1 8 16 \
+        --output results/spawn.json
+
+--client sleep ile UI'li client yerine hafif bir süreç açılır (sim_manager
+tarafının maliyeti, client'ın import süresinden bağımsız ölçülür).
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+
+from benchmarks._common import write_results
+from sim_manager import spawn_jobs
+from sim_manager.process_store import store
+from sim_manager.supervisor import supervisor
+
+CLIENT_CMDS = {
+    "ui": [sys.executable, "-m", "ocpp_client.backend.main"],
+    "sleep": [sys.executable, "-c", "import time; time.sleep(600)"],
+}
+
+
+def run_point(concurrency: int, args: argparse.Namespace) -> dict:
+    spawn_jobs.set_concurrency(concurrency)
+    ids = [f"{args.prefix}-C{concurrency}-{i:04d}" for i in range(args.count)]
+    job = spawn_jobs.submit_ui(ids, CLIENT_CMDS[args.client], args.server_url, args.base_port, None,
+                               lambda port, cp_id: f"http://localhost:{port}/?cp_id={cp_id}")
+    job.done_event.wait()
+    result = job.to_dict(include_results=False)
+    supervisor.stop_kind("ui")
+    store.clients.clear()
+    return {"concurrency": concurrency, **result}
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="sim_manager bulk spawn throughput")
+    parser.add_argument("--count", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 16])
+    parser.add_argument("--client", choices=sorted(CLIENT_CMDS), default="sleep")
+    parser.add_argument("--base-port", type=int, default=18101)
+    parser.add_argument("--server-url", default="ws://127.0.0.1:8280")
+    parser.add_argument("--prefix", default="SPAWN")
+    parser.add_argument("--output")
+    args = parser.parse_args(argv)
+
+    points = []
+    for concurrency in args.concurrency:
+        point = run_point(concurrency, args)
+        print(f"concurrency={concurrency}: {point['spawned']} CP in {point['elapsed_s']}s "
+              f"({point['cps_per_sec']} CP/s, failed={point['failed']})")
+        points.append(point)
+    write_results(args.output, {"config": vars(args), "points": points})
+
+
+if __name__ == "__main__":
+    main()
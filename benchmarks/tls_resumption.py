@@ -0,0 +1,97 @@
+"""
+TLS oturum devamı açık/kapalı: handshake/sn ve yeniden bağlanma gecikmesi.
+
+Yerel server geçici self-signed sertifikayla wss:// üzerinden başlatılır
+(LocalStack tls=True). Her modda --concurrency adet döngü --duration sn
+boyunca bağlanıp hemen kapatır; bağlantılar OCPPClient.connect ile aynı
+yoldan geçer (tls.client_ssl_context + tls.remember_session). İlk
+bağlantıdan sonraki her bağlantı bir "yeniden bağlanma"dır; döngüler
+aynı host'a gittiğinden bilet filo genelinde paylaşılır.
+
+    off : her bağlantı tam handshake (paylaşılan context, oturum yok)
+    on  : saklı oturum/bilet sunulur (bkz. ocpp_client/client/tls.py)
+
+    python -m benchmarks.tls_resumption --concurrency 50 --duration 10 \
+        --output results/tls-resumption.json
+
+--workers > 1 ile server cluster modunda çalışır; bilet anahtarları
+worker'lar arasında paylaşıldığından devam oranı düşmemelidir.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from typing import List
+
+import websockets
+
+from benchmarks._common import LocalStack, percentiles, write_results
+from ocpp_client.client import tls
+
+
+async def _connect_loop(url: str, deadline: float, latencies: List[float], errors: List[str]) -> None:
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        try:
+            websocket = await websockets.connect(url, subprotocols=["ocpp1.6"], ssl=tls.client_ssl_context())
+        except Exception as e:  # noqa: BLE001 - ölçümde hata türü sayılır
+            errors.append(type(e).__name__)
+            continue
+        latencies.append(time.perf_counter() - started)
+        tls.remember_session(websocket)
+        await websocket.close()
+
+
+async def run_mode(mode: str, url: str, args: argparse.Namespace) -> dict:
+    tls.set_resumption(mode == "on")
+    handshakes_before, resumed_before = tls.stats.handshakes, tls.stats.resumed
+    latencies: List[float] = []
+    errors: List[str] = []
+    started = time.monotonic()
+    deadline = started + args.duration
+    await asyncio.gather(*[
+        _connect_loop(f"{url}/{args.prefix}-{mode.upper()}-{i}", deadline, latencies, errors)
+        for i in range(args.concurrency)
+    ])
+    elapsed = time.monotonic() - started
+    handshakes = tls.stats.handshakes - handshakes_before
+    resumed = tls.stats.resumed - resumed_before
+    return {
+        "handshakes": handshakes,
+        "handshakes_per_sec": round(handshakes / elapsed, 1),
+        "resumed_ratio": round(resumed / handshakes, 3) if handshakes else None,
+        "connect_latency_ms": percentiles(latencies),
+        "errors": len(errors),
+    }
+
+
+async def run(url: str, args: argparse.Namespace) -> dict:
+    results = {}
+    for mode in args.modes:
+        results[mode] = await run_mode(mode, url, args)
+        print(f"{mode}: {results[mode]['handshakes_per_sec']} handshakes/s, "
+              f"p50={results[mode]['connect_latency_ms']['p50']} ms, resumed={results[mode]['resumed_ratio']}")
+    return results
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="TLS session resumption on/off: handshakes/sec and reconnect latency")
+    parser.add_argument("--modes", nargs="+", default=["off", "on"], choices=["off", "on"])
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--prefix", default="TLS")
+    parser.add_argument("--port", type=int, default=8280)
+    parser.add_argument("--rest-port", type=int, default=3900)
+    parser.add_argument("--output")
+    args = parser.parse_args(argv)
+
+    with LocalStack(port=args.port, rest_port=args.rest_port, auth_rules=[f"{args.prefix}-*"],
+                    workers=args.workers, tls=True) as stack:
+        modes = asyncio.run(run(stack.url, args))
+    write_results(args.output, {"config": vars(args), "modes": modes})
+
+
+if __name__ == "__main__":
+    main()
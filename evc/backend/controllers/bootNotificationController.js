@@ -1,7 +1,13 @@
 import { PrismaClient } from "../generated/prisma/index.js";
+import { isStr, isValidationError, optStr, partitionRows, sendBulkResult } from "./validate.js";
 
 const prisma = new PrismaClient();
 
+const OPTIONAL_FIELDS = [
+  "chargePointSerialNumber", "chargeBoxSerialNumber", "firmwareVersion",
+  "iccid", "imsi", "meterType", "meterSerialNumber",
+];
+
 export const createBootNotification = async (req, res) => {
   try {
     const data = req.body;
@@ -33,6 +39,43 @@ export const createBootNotification = async (req, res) => {
   }
 };
 
+export const createBootNotificationsBulk = async (req, res) => {
+  try {
+    const rows = Array.isArray(req.body) ? req.body : [];
+    if (!rows.length) {
+      return res.status(400).json({ error: "Body must be a non-empty array" });
+    }
+
+    const { valid, invalid } = partitionRows(rows, (data) =>
+      isStr(data.chargePointVendor) && isStr(data.chargePointModel) && isStr(data.clientId) &&
+      OPTIONAL_FIELDS.every((name) => optStr(data[name]))
+    );
+    const result = await prisma.bootNotification.createMany({
+      data: valid
+        .map((data) => ({
+          chargePointVendor: data.chargePointVendor,
+          chargePointModel: data.chargePointModel,
+          chargePointSerialNumber: data.chargePointSerialNumber,
+          chargeBoxSerialNumber: data.chargeBoxSerialNumber,
+          firmwareVersion: data.firmwareVersion,
+          iccid: data.iccid,
+          imsi: data.imsi,
+          meterType: data.meterType,
+          meterSerialNumber: data.meterSerialNumber,
+          clientId: data.clientId,
+        })),
+    });
+
+    sendBulkResult(res, result.count, invalid);
+  } catch (error) {
+    console.error("Error creating BootNotification logs (bulk):", error);
+    if (isValidationError(error)) {
+      return res.status(400).json({ error: "Invalid row data" });
+    }
+    res.status(500).json({ error: "Internal server error" });
+  }
+};
+
 export const getAllBootNotifications = async (req, res) => {
   try {
     const logs = await prisma.bootNotification.findMany({
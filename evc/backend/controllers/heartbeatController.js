@@ -1,4 +1,5 @@
 import { PrismaClient } from "../generated/prisma/index.js";
+import { isStr, isValidationError, optDate, partitionRows, sendBulkResult } from "./validate.js";
 
 const prisma = new PrismaClient();
 
@@ -8,7 +9,8 @@ export const createHeartbeat = async (req, res) => {
     const newHeartbeat = await prisma.heartbeat.create({
       data: {
         clientId: req.body.clientId, // Assuming clientId is passed in the request body
-        // timestamp will default to now()
+        // OCPP server'ın alma anı; yoksa now()
+        createdAt: req.body.createdAt ? new Date(req.body.createdAt) : undefined,
       },
     });
     res.status(201).json(newHeartbeat);
@@ -18,6 +20,33 @@ export const createHeartbeat = async (req, res) => {
   }
 };
 
+// POST /bulk - OCPP server'ın batch forwarder'ından gelen dizi
+export const createHeartbeatsBulk = async (req, res) => {
+  try {
+    const rows = Array.isArray(req.body) ? req.body : [];
+    if (!rows.length) {
+      return res.status(400).json({ error: "Body must be a non-empty array" });
+    }
+
+    const { valid, invalid } = partitionRows(rows, (row) => isStr(row.clientId) && optDate(row.createdAt));
+    const result = await prisma.heartbeat.createMany({
+      data: valid
+        // createdAt: OCPP server'ın alma anı (batch/outbox replay'i geç yazar)
+        .map((row) => ({
+          clientId: row.clientId,
+          createdAt: row.createdAt ? new Date(row.createdAt) : undefined,
+        })),
+    });
+    sendBulkResult(res, result.count, invalid);
+  } catch (error) {
+    console.error("Error creating Heartbeat logs (bulk):", error);
+    if (isValidationError(error)) {
+      return res.status(400).json({ error: "Invalid row data" });
+    }
+    res.status(500).json({ error: "Internal server error" });
+  }
+};
+
 export const getHeartbeats = async (req, res) => {
   try {
     const heartbeats = await prisma.heartbeat.findMany({
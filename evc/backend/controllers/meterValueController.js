@@ -0,0 +1,92 @@
+import { PrismaClient } from "../generated/prisma/index.js";
+import { isDate, isInt, isStr, isValidationError, optInt, partitionRows, sendBulkResult } from "./validate.js";
+
+const prisma = new PrismaClient();
+
+// OCPP MeterValues gövdesini sampledValue başına satırlara açar
+const toRows = (data) => {
+  if (!data || !data.connectorId || !Array.isArray(data.meterValue)) {
+    return [];
+  }
+  return data.meterValue.flatMap((meterValue) =>
+    (meterValue.sampledValue || []).map((sample) => ({
+      connectorId: data.connectorId,
+      transactionId: data.transactionId ?? undefined,
+      timestamp: new Date(meterValue.timestamp),
+      measurand: sample.measurand,
+      value: String(sample.value),
+      unit: sample.unit,
+      phase: sample.phase,
+      context: sample.context,
+      location: sample.location,
+      clientId: data.clientId,
+    }))
+  );
+};
+
+// POST - Create meter values of one MeterValues request
+export const createMeterValues = async (req, res) => {
+  try {
+    const rows = toRows(req.body);
+    if (!rows.length) {
+      return res.status(400).json({ error: "connectorId and meterValue are required" });
+    }
+
+    const result = await prisma.meterValue.createMany({ data: rows });
+    res.status(201).json({ count: result.count });
+  } catch (error) {
+    console.error("Error creating MeterValue log:", error);
+    res.status(500).json({ error: "Internal server error" });
+  }
+};
+
+// Bulk için istek düzeyinde tip kontrolü; bir örnek bozuksa istek tümden geçersiz
+const isValidRequest = (data) =>
+  isInt(data.connectorId) && optInt(data.transactionId) && isStr(data.clientId) &&
+  Array.isArray(data.meterValue) &&
+  data.meterValue.every((meterValue) =>
+    meterValue && isDate(meterValue.timestamp) && Array.isArray(meterValue.sampledValue) &&
+    meterValue.sampledValue.every((sample) => sample && sample.value !== undefined && sample.value !== null)
+  );
+
+// POST /bulk - Many MeterValues requests in one insert
+export const createMeterValuesBulk = async (req, res) => {
+  try {
+    const requests = Array.isArray(req.body) ? req.body : [];
+    if (!requests.length) {
+      return res.status(400).json({ error: "Body must be a non-empty array" });
+    }
+
+    const { valid, invalid } = partitionRows(requests, isValidRequest);
+    const result = await prisma.meterValue.createMany({
+      data: valid.flatMap(toRows),
+    });
+    sendBulkResult(res, result.count, invalid);
+  } catch (error) {
+    console.error("Error creating MeterValue logs (bulk):", error);
+    if (isValidationError(error)) {
+      return res.status(400).json({ error: "Invalid row data" });
+    }
+    res.status(500).json({ error: "Internal server error" });
+  }
+};
+
+// GET - Fetch latest meter values (?clientId=&connectorId=&limit=)
+export const getMeterValues = async (req, res) => {
+  try {
+    const where = {};
+    if (req.query.clientId) where.clientId = String(req.query.clientId);
+    if (req.query.connectorId) where.connectorId = Number(req.query.connectorId);
+    const take = Math.min(Number(req.query.limit) || 1000, 10000);
+
+    const meterValues = await prisma.meterValue.findMany({
+      where,
+      orderBy: { timestamp: "desc" },
+      take,
+    });
+    res.json(meterValues);
+  } catch (error) {
+    console.error("Error fetching meter values:", error);
+    res.status(500).json({ error: "Internal server error" });
+  }
+};
@@ -1,4 +1,5 @@
 import { PrismaClient } from "../generated/prisma/index.js";
+import { isInt, isStr, isValidationError, optDate, optStr, partitionRows, sendBulkResult } from "./validate.js";
 
 const prisma = new PrismaClient();
 
@@ -31,6 +32,42 @@ export const createStatusNotification = async (req, res) => {
   }
 };
 
+// POST /bulk - Create many status notifications in one insert
+export const createStatusNotificationsBulk = async (req, res) => {
+  try {
+    const rows = Array.isArray(req.body) ? req.body : [];
+    if (!rows.length) {
+      return res.status(400).json({ error: "Body must be a non-empty array" });
+    }
+
+    const { valid, invalid } = partitionRows(rows, (data) =>
+      isInt(data.connectorId) && isStr(data.status) && isStr(data.errorCode) && isStr(data.clientId) &&
+      optStr(data.info) && optStr(data.vendorId) && optStr(data.vendorErrorCode) && optDate(data.timestamp)
+    );
+    const result = await prisma.statusNotification.createMany({
+      data: valid
+        .map((data) => ({
+          connectorId: data.connectorId,
+          status: data.status,
+          errorCode: data.errorCode,
+          info: data.info,
+          timestamp: data.timestamp ? new Date(data.timestamp) : undefined,
+          vendorId: data.vendorId,
+          vendorErrorCode: data.vendorErrorCode,
+          clientId: data.clientId,
+        })),
+    });
+
+    sendBulkResult(res, result.count, invalid);
+  } catch (error) {
+    console.error("Error creating StatusNotification logs (bulk):", error);
+    if (isValidationError(error)) {
+      return res.status(400).json({ error: "Invalid row data" });
+    }
+    res.status(500).json({ error: "Internal server error" });
+  }
+};
+
 // GET - Fetch all status notifications
 export const getStatusNotifications = async (req, res) => {
   try {
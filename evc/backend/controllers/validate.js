@@ -0,0 +1,43 @@
+import { Prisma } from "../generated/prisma/index.js";
+
+// /bulk gövdelerindeki satırlar için Prisma şemasına uygun tip kontrolleri.
+// Geçersiz satır 500 yerine 4xx ile bildirilir; OCPP server'ın forwarder'ı
+// 5xx'i tekrar dener, 4xx'i veri hatası sayıp geçer.
+
+export const isStr = (value) => typeof value === "string" && value.length > 0;
+
+export const optStr = (value) => value === undefined || value === null || typeof value === "string";
+
+export const isInt = (value) => Number.isInteger(value);
+
+export const optInt = (value) => value === undefined || value === null || Number.isInteger(value);
+
+export const isDate = (value) =>
+  (typeof value === "string" || typeof value === "number") && !Number.isNaN(new Date(value).getTime());
+
+export const optDate = (value) => value === undefined || value === null || isDate(value);
+
+// Satırları geçerli / geçersiz (indeks) olarak ayır
+export const partitionRows = (rows, isValid) => {
+  const valid = [];
+  const invalid = [];
+  rows.forEach((row, index) => {
+    if (row && typeof row === "object" && isValid(row)) {
+      valid.push(row);
+    } else {
+      invalid.push(index);
+    }
+  });
+  return { valid, invalid };
+};
+
+// Geçerliler yazıldıktan sonra: hepsi geçerliyse 201, değilse 422 + geçersiz indeksler
+export const sendBulkResult = (res, count, invalid) => {
+  if (invalid.length) {
+    return res.status(422).json({ error: `${invalid.length} invalid row(s)`, count, invalid });
+  }
+  return res.status(201).json({ count });
+};
+
+// Kontrollerden kaçan tip hatası (ör. şema değişikliği) da 4xx olsun
+export const isValidationError = (error) => error instanceof Prisma.PrismaClientValidationError;
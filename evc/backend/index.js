@@ -5,6 +5,7 @@ import bootNotificationRoutes from "./routes/bootNotificationRoutes.js";
 import  heartbeatRoutes from "./routes/heartbeatRoutes.js";
 import statusNotificationRoutes from "./routes/statusNotificationRoutes.js";
 import clientNotificationRoutes from "./routes/clientNotificationRoutes.js";
+import meterValueRoutes from "./routes/meterValueRoutes.js";
 
 import cors from "cors";
 
@@ -12,12 +13,13 @@ import cors from "cors";
 const app = express();
 const prisma = new PrismaClient();
 
-app.use(express.json());
+app.use(express.json({ limit: "5mb" })); // bulk uçları yüzlerce kayıtlık dizi alır
 app.use(cors());
 app.use("/bootnotification", bootNotificationRoutes);
 app.use("/heartbeat", heartbeatRoutes);
 app.use("/status-notification", statusNotificationRoutes);
 app.use("/client-notifications", clientNotificationRoutes);
+app.use("/meter-values", meterValueRoutes);
 
 app.get("/", (req, res) => {
   res.send("Backend is working");
@@ -0,0 +1,18 @@
+-- CreateTable
+CREATE TABLE "MeterValue" (
+    "id" INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+    "connectorId" INTEGER NOT NULL,
+    "transactionId" INTEGER,
+    "timestamp" DATETIME NOT NULL,
+    "measurand" TEXT NOT NULL DEFAULT 'Energy.Active.Import.Register',
+    "value" TEXT NOT NULL,
+    "unit" TEXT,
+    "phase" TEXT,
+    "context" TEXT,
+    "location" TEXT,
+    "createdAt" DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "clientId" TEXT NOT NULL
+);
+
+-- CreateIndex
+CREATE INDEX "MeterValue_clientId_connectorId_timestamp_idx" ON "MeterValue"("clientId", "connectorId", "timestamp");
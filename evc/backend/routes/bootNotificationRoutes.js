@@ -1,9 +1,10 @@
 import express from "express";
-import { createBootNotification , getAllBootNotifications} from "../controllers/bootNotificationController.js";
+import { createBootNotification, createBootNotificationsBulk, getAllBootNotifications } from "../controllers/bootNotificationController.js";
 
 const router = express.Router();
 
 router.post("/", createBootNotification);
+router.post("/bulk", createBootNotificationsBulk);
 router.get("/", getAllBootNotifications);
 
 export default router;
\ No newline at end of file
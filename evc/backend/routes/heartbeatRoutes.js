@@ -1,9 +1,10 @@
 import express from "express";
-import { createHeartbeat, getHeartbeats } from "../controllers/heartbeatController.js";
+import { createHeartbeat, createHeartbeatsBulk, getHeartbeats } from "../controllers/heartbeatController.js";
 
 const router = express.Router();
 
 router.post("/", createHeartbeat);
+router.post("/bulk", createHeartbeatsBulk);
 router.get("/", getHeartbeats);
 
 export default router;
\ No newline at end of file
@@ -0,0 +1,10 @@
+import express from "express";
+import { createMeterValues, createMeterValuesBulk, getMeterValues } from "../controllers/meterValueController.js";
+
+const router = express.Router();
+
+router.post("/", createMeterValues);
+router.post("/bulk", createMeterValuesBulk);
+router.get("/", getMeterValues);
+
+export default router;
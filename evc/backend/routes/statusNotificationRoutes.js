@@ -1,9 +1,10 @@
 import express from "express";
-import { createStatusNotification, getStatusNotifications } from "../controllers/statusNotificationController.js";
+import { createStatusNotification, createStatusNotificationsBulk, getStatusNotifications } from "../controllers/statusNotificationController.js";
 
 const router = express.Router();
 
 router.post("/", createStatusNotification);
+router.post("/bulk", createStatusNotificationsBulk);
 router.get("/", getStatusNotifications);
 
 export default router;
\ No newline at end of file
@@ -1,32 +1,45 @@
-from fastapi import APIRouter, HTTPException, Depends
-from ocpp_client.backend.models import ConnectorStatus, SystemStatus
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import Response
+from ocpp_client.backend.models import SystemStatus
 from ocpp_client.backend.dependencies import get_ocpp_client
+from ocpp_client.backend.status_snapshot import etag_matches, status_snapshots
 import logging
 from ocpp_client.backend.api.websocket import websocket_manager
 router = APIRouter()
 logger = logging.getLogger("API")
 
-@router.get("/status", response_model=SystemStatus)
-async def get_system_status(client = Depends(get_ocpp_client)):
+@router.get("/status", response_model=None, responses={200: {"model": SystemStatus}, 304: {}})
+async def get_system_status(request: Request, client = Depends(get_ocpp_client)):
     if client is None:
         raise HTTPException(status_code=500, detail="OCPP client not initialized")
 
-    return SystemStatus(
-        connected=client.connected,
-        charge_point_id=client.charge_point_id,
-        heartbeat_interval=client.heartbeat_interval,
-        last_heartbeat=getattr(client, 'last_heartbeat', None),
-        connectors={
-            cid: ConnectorStatus(
-                connector_id=conn.connector_id,
-                status=conn.status.value,
-                last_update=conn.last_status_change,
-                session_active=conn.session_active
-            )
-            for cid, conn in client.simulator.connectors.items()
-        },
-        manual_mode=client.simulator.manual_mode
-    )
+    # Durum değişmediyse önbellekteki byte'lar; tarayıcı ETag ile 304 alır
+    etag, body = status_snapshots.snapshot(client)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+@router.get("/status/changes")
+async def get_status_changes(since: int = Query(0, ge=0), client = Depends(get_ocpp_client)):
+    if client is None:
+        raise HTTPException(status_code=500, detail="OCPP client not initialized")
+    # since sürümünden sonra değişen connector'lar; sonraki istekte version'ı ver
+    return status_snapshots.changes(client, since)
+
+@router.get("/latency")
+async def get_call_latency(client = Depends(get_ocpp_client)):
+    if client is None:
+        raise HTTPException(status_code=500, detail="OCPP client not initialized")
+    # Action bazlı CALL→CALLRESULT gecikmesi (saniye)
+    return client.latency_stats()
+
+@router.get("/offline-queue")
+async def get_offline_queue(client = Depends(get_ocpp_client)):
+    if client is None:
+        raise HTTPException(status_code=500, detail="OCPP client not initialized")
+    # Bağlantı yokken biriken StatusNotification/MeterValues kuyruğu
+    return client.offline_queue.stats()
 
 @router.post("/connectors/{connector_id}/start")
 async def start_charging(connector_id: int, client = Depends(get_ocpp_client)):
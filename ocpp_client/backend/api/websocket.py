@@ -1,31 +1,134 @@
+"""
+UI canlı güncellemeleri (/ws).
+
+OCPP yolu UI teslimatını beklemez: publish() mesajı bir kez serileştirir,
+her abonenin sınırlı kuyruğuna koyar ve döner. Her abonenin kendi yazıcı
+task'ı vardır; yavaş bir sekme yalnızca kendi kuyruğunu doldurur.
+
+    - Abone geride kalırsa aynı connector'ın bekleyen güncellemesi yenisiyle
+      değişir (son durum kazanır); anahtar (type, connector_id)
+    - Kuyruk max_pending'i aşan ya da tek gönderimi send_timeout'u aşan
+      abone düşürülür (tarayıcı yeniden bağlanıp güncel durumu /api/status
+      ile alır)
+"""
 from fastapi import WebSocket
-from typing import List
-import json
+from typing import Dict, Hashable, List, Optional
+from collections import OrderedDict
 import asyncio
+import itertools
+import logging
+
+from ocpp_common import codec
+from ocpp_common.metrics import MetricFamily, Sample
+
+logger = logging.getLogger("WebSocketManager")
+
+
+class _Subscriber:
+    def __init__(self, websocket: WebSocket) -> None:
+        self.websocket = websocket
+        self.pending: "OrderedDict[Hashable, str]" = OrderedDict()
+        self.ready = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
 
 class WebSocketManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
+    def __init__(self, max_pending: int = 256, send_timeout: float = 5.0):
+        self.max_pending = max_pending
+        self.send_timeout = send_timeout
+        self._subscribers: Dict[WebSocket, _Subscriber] = {}
+        self._seq = itertools.count()
+        # Sayaçlar (bkz. collect_metrics)
+        self.published = 0
+        self.coalesced = 0
+        self.dropped_subscribers = 0
+
+    @property
+    def active_connections(self) -> List[WebSocket]:
+        return list(self._subscribers)
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        subscriber = _Subscriber(websocket)
+        subscriber.task = asyncio.create_task(self._writer(subscriber))
+        self._subscribers[websocket] = subscriber
 
     def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
+        subscriber = self._subscribers.pop(websocket, None)
+        if subscriber is not None and subscriber.task is not None:
+            subscriber.task.cancel()
+
+    def publish(self, message: dict) -> None:
+        """Beklemeden tüm abonelerin kuyruğuna koy (OCPP yolundan çağrılır)."""
+        if not self._subscribers:
+            return
+        self.published += 1
+        text = codec.dumps_text(message)  # abone başına değil, bir kez
+        if "connector_id" in message:
+            key = (message.get("type"), message["connector_id"])
+        else:
+            key = next(self._seq)
+        for subscriber in list(self._subscribers.values()):
+            pending = subscriber.pending
+            if pending.pop(key, None) is not None:
+                self.coalesced += 1
+            pending[key] = text
+            if len(pending) > self.max_pending:
+                self._drop(subscriber, f"{len(pending)} messages pending")
+                continue
+            subscriber.ready.set()
 
     async def broadcast(self, message: dict):
-        if self.active_connections:
-            tasks = []
-            for connection in self.active_connections.copy():
+        """Geriye dönük uyumluluk; teslimatı beklemez."""
+        self.publish(message)
+
+    def _drop(self, subscriber: _Subscriber, reason: str) -> None:
+        if self._subscribers.pop(subscriber.websocket, None) is None:
+            return
+        self.dropped_subscribers += 1
+        logger.warning("Dropping slow UI subscriber: %s", reason)
+        if subscriber.task is not None:
+            subscriber.task.cancel()
+        # Tarayıcı close'u görüp yeniden bağlanır
+        asyncio.create_task(self._close(subscriber.websocket))
+
+    @staticmethod
+    async def _close(websocket: WebSocket) -> None:
+        try:
+            await websocket.close(code=1013)  # 1013: Try Again Later
+        except Exception:
+            pass
+
+    async def _writer(self, subscriber: _Subscriber) -> None:
+        pending = subscriber.pending
+        while True:
+            await subscriber.ready.wait()
+            subscriber.ready.clear()
+            while pending:
+                _, text = pending.popitem(last=False)
                 try:
-                    tasks.append(connection.send_text(json.dumps(message)))
-                except:
-                    if connection in self.active_connections:
-                        self.active_connections.remove(connection)
-            
-            if tasks:
-                await asyncio.gather(*tasks, return_exceptions=True)
-
-websocket_manager = WebSocketManager()
\ No newline at end of file
+                    await asyncio.wait_for(subscriber.websocket.send_text(text), self.send_timeout)
+                except asyncio.TimeoutError:
+                    self._drop(subscriber, f"send exceeded {self.send_timeout}s")
+                    return
+                except Exception:
+                    # Kopmuş soket: receive döngüsü de disconnect çağırır
+                    self._subscribers.pop(subscriber.websocket, None)
+                    return
+
+    def collect_metrics(self) -> list:
+        return [
+            MetricFamily("ocpp_ui_subscribers", "gauge", "Connected UI WebSocket subscribers",
+                         [Sample("", {}, len(self._subscribers))]),
+            MetricFamily("ocpp_ui_pending_messages", "gauge", "UI updates waiting in subscriber queues",
+                         [Sample("", {}, sum(len(s.pending) for s in self._subscribers.values()))]),
+            MetricFamily("ocpp_ui_messages_total", "counter", "UI updates by result", [
+                Sample("", {"result": "published"}, self.published),
+                Sample("", {"result": "coalesced"}, self.coalesced),
+            ]),
+            MetricFamily("ocpp_ui_dropped_subscribers_total", "counter",
+                         "UI subscribers dropped for lagging behind", [Sample("", {}, self.dropped_subscribers)]),
+        ]
+
+
+websocket_manager = WebSocketManager()
@@ -3,13 +3,13 @@ from __future__ import annotations
 import os
 import asyncio
 import ssl
-import logging
 from pathlib import Path
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.templating import Jinja2Templates
+from fastapi.responses import Response
 import uvicorn
 from fastapi import HTTPException
 
@@ -22,6 +22,10 @@ from ocpp_client.backend.api.websocket import websocket_manager
 # Client tarafı
 from ocpp_client.client.config import CLIENT_CONFIG, get_or_create_client_config
 from ocpp_client.client.ocpp_client import OCPPClient
+from ocpp_client.client import tls
+from ocpp_client.client.client_metrics import client_families, tls_families
+from ocpp_common.log_pipeline import setup_logging
+from ocpp_common.metrics import CONTENT_TYPE, REGISTRY
 
 # Konfigürasyon & ENV override
 BASE_DIR = Path(__file__).resolve().parent
@@ -79,6 +83,11 @@ async def health_check():
    
    return {"status": "ok", "connected": True, "cp_id": _ocpp_client.charge_point_id}
 
+# Prometheus metrikleri (heartbeat gecikmesi, gönderim hataları, yeniden bağlanmalar)
+@app.get("/metrics")
+async def metrics():
+   return Response(REGISTRY.render().encode("utf-8"), headers={"Content-Type": CONTENT_TYPE})
+
 # UI Anasayfa
 @app.get("/")
 async def index(request: Request):
@@ -95,17 +104,17 @@ _ocpp_client: OCPPClient | None = None
 async def on_startup():
    global _ocpp_client
 
-   # Logger (isteğe göre sade)
-   logging.basicConfig(
-       level=logging.INFO,
-       format="%(asctime)s - %(levelname)s - %(name)s - %(message)s"
-   )
+   # Logger (isteğe göre sade); I/O event loop dışında, bkz. ocpp_common.log_pipeline
+   setup_logging(text_format="%(asctime)s - %(levelname)s - %(name)s - %(message)s")
 
    _ocpp_client = OCPPClient(
        server_url=CLIENT_CONFIG["server_url"],
        charge_point_id=CLIENT_CONFIG["charge_point_id"]
    )
    set_ocpp_client_instance(_ocpp_client)
+   REGISTRY.register_collector(lambda: client_families([_ocpp_client]) if _ocpp_client is not None else [])
+   REGISTRY.register_collector(lambda: tls_families(tls.stats))
+   REGISTRY.register_collector(websocket_manager.collect_metrics)
 
    # Client'ı arka planda asyncio task olarak çalıştır
    asyncio.create_task(_ocpp_client.start())
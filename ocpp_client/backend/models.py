@@ -32,4 +32,5 @@ class SystemStatus(BaseModel):
     heartbeat_interval: int
     last_heartbeat: Optional[datetime]
     connectors: Dict[int, ConnectorStatus]
-    manual_mode: bool = True
\ No newline at end of file
+    manual_mode: bool = True
+    version: int = 0  # StatusSimulator.version; /api/status/changes?since= için
\ No newline at end of file
@@ -0,0 +1,100 @@
+"""
+GET /api/status için sürümlü snapshot önbelleği ve delta.
+
+StatusSimulator.version görünür durum her değiştiğinde artar (bkz.
+StatusSimulator.mark_changed). Snapshot yalnızca sürüm ya da client başlık
+alanları (bağlantı, heartbeat) değişince yeniden serileştirilir; aradaki
+her poll aynı byte'ları ve ETag'i döner, If-None-Match eşleşirse 304.
+
+/api/status/changes?since=<version> yalnızca o sürümden sonra değişen
+connector'ları döner; since mevcut sürümden büyükse (client yeniden
+başladı) "reset": true ile hepsini.
+"""
+from __future__ import annotations
+
+import zlib
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+from ocpp_common import codec
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    """pydantic ile aynı biçim: UTC için 'Z' soneki."""
+    if value is None:
+        return None
+    text = value.isoformat()
+    if value.tzinfo is not None and value.utcoffset() == timezone.utc.utcoffset(None):
+        text = text[:-6] + "Z"
+    return text
+
+
+def _connector(conn) -> dict:
+    return {
+        "connector_id": conn.connector_id,
+        "status": conn.status.value,
+        "last_update": _iso(conn.last_status_change),
+        "session_active": conn.session_active,
+        "error_code": "NoError",
+    }
+
+
+def _header(client) -> dict:
+    return {
+        "connected": client.connected,
+        "charge_point_id": client.charge_point_id,
+        "heartbeat_interval": client.heartbeat_interval,
+        "last_heartbeat": _iso(client.last_heartbeat),
+        "manual_mode": client.simulator.manual_mode,
+        "version": client.simulator.version,
+    }
+
+
+class StatusSnapshots:
+    def __init__(self) -> None:
+        self._key = None
+        self._etag = ""
+        self._body = b""
+        # Gözlem: önbellekten dönen / yeniden üretilen snapshot sayısı
+        self.hits = 0
+        self.builds = 0
+
+    def snapshot(self, client) -> Tuple[str, bytes]:
+        """(ETag, JSON gövdesi); durum değişmediyse önbellekten."""
+        simulator = client.simulator
+        key = (id(client), simulator.version, client.connected, client.heartbeat_interval, client.last_heartbeat)
+        if key == self._key:
+            self.hits += 1
+            return self._etag, self._body
+        body = dict(_header(client))
+        body["connectors"] = {str(cid): _connector(conn) for cid, conn in simulator.connectors.items()}
+        self._body = codec.dumps(body)
+        self._etag = f'"{simulator.version}-{zlib.crc32(self._body):08x}"'
+        self._key = key
+        self.builds += 1
+        return self._etag, self._body
+
+    @staticmethod
+    def changes(client, since: int) -> dict:
+        simulator = client.simulator
+        reset = since < 0 or since > simulator.version
+        body = dict(_header(client))
+        body["reset"] = reset
+        body["connectors"] = {
+            str(cid): _connector(conn) for cid, conn in simulator.connectors.items()
+            if reset or conn.version > since
+        }
+        return body
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+status_snapshots = StatusSnapshots()
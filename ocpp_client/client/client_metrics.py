@@ -0,0 +1,125 @@
+"""
+OCPPClient sayaçlarının Prometheus ailelerine dönüştürülmesi.
+
+Client sıcak yolda yalnızca kendi int alanlarını / histogramlarını artırır;
+aileler scrape anında buradan üretilir (bkz. ocpp_common/metrics.py):
+
+    REGISTRY.register_collector(lambda: client_families([client]))
+
+per_client=False ile (fleet modu) tüm client'lar cp_id etiketi olmadan toplanır.
+fleet_families() filo geneli yeniden bağlanma, tls_families() süreç geneli
+TLS handshake / oturum devamı metriklerini üretir.
+"""
+from __future__ import annotations
+
+from typing import Dict, Iterable, List
+
+from ocpp_client.client.latency import LatencyHistogram
+from ocpp_common.metrics import MetricFamily, Sample, histogram_samples
+
+
+def _labels(client, per_client: bool) -> Dict[str, str]:
+    return {"cp_id": client.charge_point_id} if per_client else {}
+
+
+def _merge_histograms(target: Dict[tuple, LatencyHistogram], key: tuple, hist: LatencyHistogram) -> None:
+    merged = target.get(key)
+    if merged is None:
+        merged = target[key] = LatencyHistogram(hist.buckets)
+    for i, n in enumerate(hist.counts):
+        merged.counts[i] += n
+    merged.count += hist.count
+    merged.sum += hist.sum
+
+
+def _sum_into(target: Dict[tuple, float], key: tuple, value: float) -> None:
+    target[key] = target.get(key, 0) + value
+
+
+def client_families(clients: Iterable, per_client: bool = True) -> List[MetricFamily]:
+    connected: Dict[tuple, float] = {}
+    reconnects: Dict[tuple, float] = {}
+    failures: Dict[tuple, float] = {}
+    timeouts: Dict[tuple, float] = {}
+    offline_depth: Dict[tuple, float] = {}
+    offline: Dict[tuple, float] = {}
+    lag: Dict[tuple, LatencyHistogram] = {}
+    latency: Dict[tuple, LatencyHistogram] = {}
+
+    for client in list(clients):
+        base = tuple(_labels(client, per_client).items())
+        _sum_into(connected, base, int(client.connection_accepted))
+        _sum_into(reconnects, base, client.reconnects)
+        for action, n in list(client.send_failures.items()):
+            _sum_into(failures, base + (("action", action),), n)
+        for action, n in list(client.call_timeout_count.items()):
+            _sum_into(timeouts, base + (("action", action),), n)
+        queue = client.offline_queue
+        _sum_into(offline_depth, base, len(queue))
+        for result in ("buffered", "coalesced", "dropped", "replayed", "replay_failed"):
+            _sum_into(offline, base + (("result", result),), getattr(queue, result))
+        _merge_histograms(lag, base, client.heartbeat_lag)
+        for action, hist in list(client.call_latency.items()):
+            _merge_histograms(latency, base + (("action", action),), hist)
+
+    def samples(values: Dict[tuple, float]) -> List[Sample]:
+        return [Sample("", dict(key), value) for key, value in values.items()]
+
+    def histograms(values: Dict[tuple, LatencyHistogram]) -> List[Sample]:
+        result = []
+        for key, hist in values.items():
+            result.extend(histogram_samples(hist.buckets, hist.counts, hist.sum, hist.count, dict(key)))
+        return result
+
+    return [
+        MetricFamily("ocpp_client_connected", "gauge",
+                     "Charge points with an accepted BootNotification", samples(connected)),
+        MetricFamily("ocpp_client_reconnects_total", "counter",
+                     "Reconnect attempts after a failed or closed connection", samples(reconnects)),
+        MetricFamily("ocpp_client_send_failures_total", "counter",
+                     "CALLs that failed (timeout, CALLERROR, connection loss)", samples(failures)),
+        MetricFamily("ocpp_client_call_timeouts_total", "counter",
+                     "CALLs without a reply before the action timeout", samples(timeouts)),
+        MetricFamily("ocpp_client_offline_queue_depth", "gauge",
+                     "Messages waiting in the offline queue for replay", samples(offline_depth)),
+        MetricFamily("ocpp_client_offline_messages_total", "counter",
+                     "Offline queue messages by result", samples(offline)),
+        MetricFamily("ocpp_client_heartbeat_lag_seconds", "histogram",
+                     "Delay between a Heartbeat falling due and being sent (includes up to one timer wheel tick)", histograms(lag)),
+        MetricFamily("ocpp_client_call_latency_seconds", "histogram",
+                     "CALL to CALLRESULT round-trip time", histograms(latency)),
+    ]
+
+
+def fleet_families(limiter, tracker) -> List[MetricFamily]:
+    """ConnectLimiter / ReconnectTracker durumu (bkz. reconnect.py)."""
+    hist = tracker.recovery
+    return [
+        MetricFamily("ocpp_fleet_clients", "gauge",
+                     "Clients hosted by this fleet process", [Sample("", {}, len(tracker.clients))]),
+        MetricFamily("ocpp_fleet_accepted_clients", "gauge",
+                     "Clients with an accepted BootNotification", [Sample("", {}, len(tracker.accepted_clients))]),
+        MetricFamily("ocpp_fleet_outages_total", "counter",
+                     "Outages (an accepted client lost its connection)", [Sample("", {}, tracker.outages)]),
+        MetricFamily("ocpp_fleet_outage_seconds", "gauge",
+                     "Age of the ongoing outage (0 when fully connected)", [Sample("", {}, tracker.outage_seconds())]),
+        MetricFamily("ocpp_fleet_full_reconnect_seconds", "histogram",
+                     "Time from the first lost connection until every client is accepted again",
+                     histogram_samples(hist.buckets, hist.counts, hist.sum, hist.count, {})),
+        MetricFamily("ocpp_fleet_connect_waiting", "gauge",
+                     "Connection attempts waiting for a handshake token or slot", [Sample("", {}, limiter.waiting)]),
+        MetricFamily("ocpp_fleet_connect_in_flight", "gauge",
+                     "WebSocket/TLS handshakes in progress", [Sample("", {}, limiter.in_flight)]),
+        MetricFamily("ocpp_fleet_connects_admitted_total", "counter",
+                     "Handshakes admitted by the connect limiter", [Sample("", {}, limiter.admitted)]),
+    ]
+
+
+def tls_families(stats) -> List[MetricFamily]:
+    """Süreç geneli TLS sayaçları (bkz. tls.py)."""
+    return [
+        MetricFamily("ocpp_client_tls_handshakes_total", "counter", "Completed client TLS handshakes", [
+            Sample("", {"resumed": "true"}, stats.resumed),
+            Sample("", {"resumed": "false"}, stats.handshakes - stats.resumed),
+        ]),
+    ]
@@ -0,0 +1,185 @@
+"""
+Simülasyon saati: client, StatusSimulator, heartbeat zamanlayıcısı ve mesaj
+zaman damgaları süreyi buradan okur; böylece bir günlük filo davranışı
+hızlandırılmış olarak oynatılabilir.
+
+    RealClock          gerçek zaman (varsayılan)
+    ScaledClock(10)    sanal zaman gerçeğin 10 katı hızında akar
+    MaxSpeedClock()    sanal zaman bir sonraki olaya atlar; server'ın
+                       yetişebildiği kadar hızlı (ayrık olay simülasyonu)
+
+Süreç başına tek saat vardır (get_clock / set_clock); SIM_SPEED ortam
+değişkeni ("1", "10", "100", "max") varsayılanı belirler. Zaman damgaları
+sanal zamandan üretilir (UTC), yani 100× modda mesajlardaki saatler de
+100× hızla ilerler.
+
+MaxSpeedClock geri basıncı: CALL'lar begin()/end() ile sayılır; cevap
+bekleyen CALL sayısı max_inflight'a ulaşınca sanal zaman ilerlemez.
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+
+
+class Clock:
+    """Sabit hız katsayılı sanal saat (speed=1 gerçek zamanla aynı hızda akar)."""
+
+    def __init__(self, speed: float = 1.0, start: Optional[datetime] = None):
+        if speed <= 0:
+            raise ValueError("speed must be > 0")
+        self.speed = speed
+        self._real_origin = time.monotonic()
+        self._wall_origin = start or datetime.now(timezone.utc)
+
+    def time(self) -> float:
+        """Sanal monotonik saniye (yalnızca farkları anlamlı)."""
+        return self._real_origin + (time.monotonic() - self._real_origin) * self.speed
+
+    def now(self) -> datetime:
+        """Sanal duvar saati (UTC)."""
+        return self._wall_origin + timedelta(seconds=self.time() - self._real_origin)
+
+    def timestamp(self) -> str:
+        """OCPP zaman damgası: 2024-01-01T12:00:00.000000Z"""
+        return self.now().strftime(TIMESTAMP_FORMAT)
+
+    def call_at(self, when: float, callback: Callable, *args) -> asyncio.Handle:
+        """callback'i sanal `when` anında çalıştır (iptal edilebilir handle döner)."""
+        delay = (when - self.time()) / self.speed
+        return asyncio.get_running_loop().call_later(max(delay, 0.0), callback, *args)
+
+    async def sleep(self, delay: float) -> None:
+        await asyncio.sleep(delay / self.speed)
+
+    # Geri basınç kancaları; yalnızca MaxSpeedClock kullanır
+    def begin(self) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+class ScaledClock(Clock):
+    """ScaledClock(100): bir gerçek saniyede 100 sanal saniye."""
+
+
+class RealClock(Clock):
+    def time(self) -> float:
+        return time.monotonic()
+
+    def now(self) -> datetime:
+        return datetime.now(timezone.utc)
+
+
+class _VirtualHandle:
+    __slots__ = ("callback", "args", "cancelled")
+
+    def __init__(self, callback: Callable, args: tuple):
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+def _resolve(fut: asyncio.Future) -> None:
+    if not fut.done():
+        fut.set_result(None)
+
+
+class MaxSpeedClock(Clock):
+    """
+    Sanal zaman yalnızca bir sonraki bekleyen zamanlayıcıya atlayarak
+    ilerler; her atlamadan sonra loop'a dönülür ki tetiklenen gönderimler
+    başlayabilsin.
+    """
+
+    def __init__(self, max_inflight: int = 1000, start: Optional[datetime] = None):
+        super().__init__(1.0, start)
+        self.speed = float("inf")
+        self.max_inflight = max_inflight
+        self.inflight = 0
+        self._now = self._real_origin
+        self._timers: list = []
+        self._seq = itertools.count()
+        self._driver: Optional[asyncio.Handle] = None
+
+    def time(self) -> float:
+        return self._now
+
+    def call_at(self, when: float, callback: Callable, *args) -> _VirtualHandle:
+        handle = _VirtualHandle(callback, args)
+        heapq.heappush(self._timers, (when, next(self._seq), handle))
+        self._kick()
+        return handle
+
+    async def sleep(self, delay: float) -> None:
+        fut = asyncio.get_running_loop().create_future()
+        handle = self.call_at(self._now + delay, _resolve, fut)
+        try:
+            await fut
+        finally:
+            handle.cancel()
+
+    def begin(self) -> None:
+        self.inflight += 1
+
+    def end(self) -> None:
+        self.inflight -= 1
+        if self.inflight < self.max_inflight:
+            self._kick()
+
+    def _kick(self) -> None:
+        if self._driver is None:
+            self._driver = asyncio.get_running_loop().call_soon(self._step)
+
+    def _step(self) -> None:
+        self._driver = None
+        if self.inflight >= self.max_inflight:
+            return  # end() yeniden tetikler
+        timers = self._timers
+        while timers and timers[0][2].cancelled:
+            heapq.heappop(timers)
+        if not timers:
+            return
+        when, _, handle = heapq.heappop(timers)
+        if when > self._now:
+            self._now = when
+        handle.cancel()  # tek seferlik
+        handle.callback(*handle.args)
+        if timers:
+            self._kick()
+
+
+def clock_from_spec(spec: Optional[str]) -> Clock:
+    """'1' / '' -> RealClock, '10' -> ScaledClock(10), 'max' -> MaxSpeedClock"""
+    spec = (spec or "1").strip().lower()
+    if spec in ("max", "inf", "0"):
+        return MaxSpeedClock(int(os.environ.get("SIM_MAX_INFLIGHT", "1000")))
+    speed = float(spec.rstrip("x"))
+    return RealClock() if speed == 1 else ScaledClock(speed)
+
+
+_clock: Optional[Clock] = None
+
+
+def get_clock() -> Clock:
+    global _clock
+    if _clock is None:
+        _clock = clock_from_spec(os.environ.get("SIM_SPEED"))
+    return _clock
+
+
+def set_clock(clock: Clock) -> None:
+    """Client'lar oluşturulmadan önce çağrılmalı (zamanlayıcılar saati ilk kullanımda alır)."""
+    global _clock
+    _clock = clock
@@ -2,12 +2,12 @@ import hashlib
 import json
 from pathlib import Path
 
-def get_or_create_client_config(cp_id: str):
-    """Her CP_ID için kalıcı ve benzersiz config üretir"""
+def get_or_create_client_config(cp_id: str, persist: bool = True):
+    """Her CP_ID için kalıcı ve benzersiz config üretir.
+    persist=False ise dosya varsa okunur ama yeni dosya yazılmaz (fleet modu)."""
     
     # Config dosyasını saklamak için dizin
     config_dir = Path("client_configs")
-    config_dir.mkdir(exist_ok=True)
     config_file = config_dir / f"{cp_id}.json"
     
     # Eğer bu CP_ID için config varsa, onu yükle
@@ -15,7 +15,19 @@ def get_or_create_client_config(cp_id: str):
         with open(config_file, 'r') as f:
             return json.load(f)
     
-    # Yoksa yeni oluştur
+    config = build_client_config(cp_id)
+    if not persist:
+        return config
+    
+    # Config'i kaydet
+    config_dir.mkdir(exist_ok=True)
+    with open(config_file, 'w') as f:
+        json.dump(config, f, indent=2)
+    
+    return config
+
+def build_client_config(cp_id: str):
+    """CP_ID'den deterministik config üretir (diske dokunmaz)"""
     # CP_ID'den deterministik değerler üret (her zaman aynı olacak)
     hash_base = hashlib.md5(cp_id.encode()).hexdigest()
     
@@ -32,6 +44,7 @@ def get_or_create_client_config(cp_id: str):
         "meter_type": "AC",
         "meter_serial_number": f"MTR-{hash_base[16:24].upper()}",
         "default_heartbeat_interval": 60,
+        "call_timeouts": {"default": 30, "BootNotification": 30},
         "connector_count": 2,
         "simulation": {
             "charging_duration_min": 30,
@@ -39,13 +52,16 @@ def get_or_create_client_config(cp_id: str):
             "idle_duration_min": 60,
             "idle_duration_max": 300,
             "status_change_probability": 0.15
+        },
+        # Şarj sırasında MeterValues eğrisi (profiller: meter_sampler.PROFILES)
+        "meter_values": {
+            "sample_interval": 60,
+            "profile": "AC22kW",
+            "battery_kwh": [40, 100],
+            "start_soc": [10, 60]
         }
     }
     
-    # Config'i kaydet
-    with open(config_file, 'w') as f:
-        json.dump(config, f, indent=2)
-    
     return config
 
 # Varsayılan config (import edildiğinde CP_ID yoksa kullanılır)
@@ -62,6 +78,7 @@ CLIENT_CONFIG = {
     "meter_type": "AC",
     "meter_serial_number": "MTR2024001",
     "default_heartbeat_interval": 60,
+    "call_timeouts": {"default": 30, "BootNotification": 30},
     "connector_count": 2,
     "simulation": {
         "charging_duration_min": 30,
@@ -69,5 +86,11 @@ CLIENT_CONFIG = {
         "idle_duration_min": 60,
         "idle_duration_max": 300,
         "status_change_probability": 0.15
+    },
+    "meter_values": {
+        "sample_interval": 60,
+        "profile": "AC22kW",
+        "battery_kwh": [40, 100],
+        "start_soc": [10, 60]
     }
 }
\ No newline at end of file
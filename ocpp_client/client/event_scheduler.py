@@ -0,0 +1,146 @@
+"""
+Simülasyon olayları için heapq tabanlı ayrık olay zamanlayıcısı.
+
+Her connector geçişi (ör. Preparing → Charging) heap'te tek bir kayıttır;
+bekleyen coroutine yoktur. Loop'ta en fazla tek bir call_later kaydı
+bulunur ve en yakın olayın anına kurulur. Vakti gelen olaylar toplu
+işlenir; tek uyanmada en fazla batch_limit olay çalıştırılır, kalanlar
+bir sonraki loop turuna bırakılır (diğer işler aç kalmasın).
+
+Geri çağrılar senkron olmalı; gönderim gibi await gerektiren işler için
+geri çağrı kendi task'ını açar. İptal O(1)'dir (tembel silme); iptal
+edilmiş kayıtlar heap'in yarısını geçince heap sıkıştırılır.
+
+Heartbeat'lerden farklı olarak (bkz. timer_wheel.py) simülasyon süreleri
+dakikalar/saatler mertebesinde ve düzensizdir; heap kesin sıralama verir.
+
+    scheduler = shared_scheduler()
+    event = scheduler.call_later(12.5, on_tick, connector)
+    event.cancel()
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import sys
+import weakref
+from typing import Callable, List, Optional
+
+from ocpp_client.client.clock import Clock, get_clock
+
+DEFAULT_BATCH_LIMIT = 5000
+COMPACT_MIN = 1024  # bundan az iptal edilmiş kayıt için sıkıştırma yapılmaz
+
+
+class ScheduledEvent:
+    __slots__ = ("when", "callback", "args", "done", "_scheduler")
+
+    def __init__(self, scheduler: "EventScheduler", when: float, callback: Callable, args: tuple):
+        self._scheduler = scheduler
+        self.when = when
+        self.callback = callback
+        self.args = args
+        self.done = False  # çalıştı ya da iptal edildi
+
+    def cancel(self) -> None:
+        if not self.done:
+            self.done = True
+            self._scheduler._cancelled_one()
+
+
+class EventScheduler:
+    def __init__(self, clock: Optional[Clock] = None,
+                 loop: Optional[asyncio.AbstractEventLoop] = None,
+                 batch_limit: int = DEFAULT_BATCH_LIMIT):
+        self.clock = clock or get_clock()
+        self.batch_limit = batch_limit
+        self._loop = loop
+        self._heap: List[tuple] = []
+        self._seq = itertools.count()  # aynı andaki olaylar ekleme sırasıyla
+        self._cancelled = 0
+        self._handle = None  # saatin call_at handle'ı
+        self._next_when: Optional[float] = None
+        self._running = False
+        # Gözlem sayaçları
+        self.wakeups = 0
+        self.fired = 0
+
+    def __len__(self) -> int:
+        return len(self._heap) - self._cancelled
+
+    def call_at(self, when: float, callback: Callable, *args) -> ScheduledEvent:
+        """when: self.clock.time() cinsinden mutlak zaman (bkz. clock.py)."""
+        event = ScheduledEvent(self, when, callback, args)
+        heapq.heappush(self._heap, (when, next(self._seq), event))
+        if not self._running and (self._next_when is None or when < self._next_when):
+            self._arm(when)
+        return event
+
+    def call_later(self, delay: float, callback: Callable, *args) -> ScheduledEvent:
+        return self.call_at(self.clock.time() + delay, callback, *args)
+
+    def _cancelled_one(self) -> None:
+        self._cancelled += 1
+        if self._running:
+            return  # _run heap'i gezerken liste değiştirilmez
+        if self._cancelled >= COMPACT_MIN and self._cancelled * 2 > len(self._heap):
+            self._heap = [entry for entry in self._heap if not entry[2].done]
+            heapq.heapify(self._heap)
+            self._cancelled = 0
+
+    def _arm(self, when: float) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+        self._next_when = when
+        self._handle = self.clock.call_at(when, self._run)
+
+    def _run(self) -> None:
+        self._handle = None
+        self._next_when = None
+        self.wakeups += 1
+        heap = self._heap
+        now = self.clock.time()
+        budget = self.batch_limit
+        self._running = True
+        try:
+            while heap and heap[0][0] <= now and budget:
+                event = heapq.heappop(heap)[2]
+                if event.done:
+                    self._cancelled -= 1
+                    continue
+                event.done = True
+                budget -= 1
+                self.fired += 1
+                try:
+                    event.callback(*event.args)
+                except Exception:
+                    (self._loop or asyncio.get_running_loop()).call_exception_handler({
+                        "message": "EventScheduler callback failed", "exception": sys.exc_info()[1],
+                    })
+        finally:
+            self._running = False
+        # Baştaki iptal edilmiş kayıtlar uyanma anını belirlemesin
+        while heap and heap[0][2].done:
+            heapq.heappop(heap)
+            self._cancelled -= 1
+        if heap:
+            self._arm(heap[0][0])
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        self._next_when = None
+
+
+_schedulers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, EventScheduler]" = weakref.WeakKeyDictionary()
+
+
+def shared_scheduler() -> EventScheduler:
+    """Çalışan event loop'a ait paylaşılan zamanlayıcı (yoksa oluşturulur)."""
+    loop = asyncio.get_running_loop()
+    scheduler = _schedulers.get(loop)
+    if scheduler is None:
+        scheduler = _schedulers[loop] = EventScheduler(loop=loop)
+    return scheduler
@@ -0,0 +1,281 @@
+"""
+Headless fleet modu: tek süreç, tek asyncio loop içinde N adet OCPPClient.
+
+Her client kendi config'i, StatusSimulator'ı ve ManualController'ı ile
+çalışır; uvicorn/FastAPI/Jinja yüklenmez.
+
+Kullanım:
+    python -m ocpp_client.client.fleet --prefix CP-IZMIR --count 1000 \
+        --server-url wss://localhost:8080
+
+Yeniden bağlanma fırtınasına karşı tüm client'lar tek bir ConnectLimiter'ı
+paylaşır (--connect-rate handshake/sn, --connect-concurrency eşzamanlı
+handshake); ReconnectTracker kesinti sonrası herkesin yeniden Accepted
+olma süresini ölçer (bkz. reconnect.py, kontrol kanalında "metrics").
+Kesintide biriken offline kuyrukların tekrarı da --replay-rate (mesaj/sn)
+ile filo genelinde sınırlanır (bkz. offline_queue.py).
+
+--speed ile simülasyon hızlandırılır (bkz. clock.py): 10, 100 ya da "max"
+(sanal zaman bir sonraki olaya atlar, server'ın yetiştiği kadar hızlı).
+
+sim_manager worker olarak çalışırken --control-port ile 127.0.0.1 üzerinde
+satır bazlı JSON kontrol kanalı açılır (bkz. FleetControlServer).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import signal
+from typing import Dict, List, Optional
+
+from ocpp_client.client import tls
+from ocpp_client.client.client_metrics import client_families, fleet_families, tls_families
+from ocpp_client.client.clock import clock_from_spec, set_clock
+from ocpp_client.client.config import get_or_create_client_config
+from ocpp_client.client.ocpp_client import OCPPClient
+from ocpp_client.client.reconnect import ConnectLimiter, ReconnectTracker, TokenBucket
+from ocpp_common.log_pipeline import setup_logging
+from ocpp_common.metrics import REGISTRY
+
+
+class FleetRunner:
+    """
+    Aynı event loop içinde çok sayıda OCPPClient barındırır.
+    Client'lar çalışırken eklenip çıkarılabilir.
+    """
+
+    def __init__(self, server_url: str, ramp_rate: float = 50.0,
+                 connect_rate: float = 200.0, connect_concurrency: int = 100,
+                 replay_rate: float = 500.0) -> None:
+        self.server_url = server_url
+        self.ramp_rate = ramp_rate  # saniyede en fazla bu kadar yeni client başlatılır
+        # Yeniden bağlanmalar ramp'tan geçmez; handshake'leri bu kapı sınırlar
+        self.connect_limiter = ConnectLimiter(rate=connect_rate, concurrency=connect_concurrency)
+        self.reconnect_tracker = ReconnectTracker()
+        self.replay_limiter = TokenBucket(replay_rate)
+        self.clients: Dict[str, OCPPClient] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._stopped = asyncio.Event()
+        self.logger = logging.getLogger("FleetRunner")
+
+    def add(self, cp_id: str, server_url: Optional[str] = None) -> bool:
+        """
+        Yeni client oluştur ve arka planda başlat. Zaten varsa False döner.
+        """
+        if cp_id in self.clients:
+            return False
+        config = dict(get_or_create_client_config(cp_id, persist=False))
+        config["charge_point_id"] = cp_id
+        config["server_url"] = server_url or self.server_url
+
+        client = OCPPClient(
+            server_url=config["server_url"],
+            charge_point_id=cp_id,
+            config=config,
+        )
+        client.connect_limiter = self.connect_limiter
+        client.reconnect_tracker = self.reconnect_tracker
+        client.replay_limiter = self.replay_limiter
+        self.reconnect_tracker.register(client)
+        self.clients[cp_id] = client
+        self._tasks[cp_id] = asyncio.create_task(client.start(), name=f"ocpp-client-{cp_id}")
+        return True
+
+    async def add_many(self, cp_ids: List[str], server_url: Optional[str] = None) -> List[str]:
+        """
+        Client'ları ramp_rate hızında başlat (hepsi aynı anda handshake yapmasın).
+        """
+        added = []
+        delay = 1.0 / self.ramp_rate if self.ramp_rate > 0 else 0
+        for cp_id in cp_ids:
+            if self.add(cp_id, server_url):
+                added.append(cp_id)
+                if delay:
+                    await asyncio.sleep(delay)
+        return added
+
+    async def remove(self, cp_id: str) -> bool:
+        client = self.clients.pop(cp_id, None)
+        task = self._tasks.pop(cp_id, None)
+        if client is None:
+            return False
+        self.reconnect_tracker.unregister(client)
+        if task is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError, Exception):
+                await task
+        await client.close()
+        return True
+
+    def status(self) -> List[dict]:
+        return [
+            {
+                "cp_id": cp_id,
+                "connected": client.connected,
+                "accepted": client.connection_accepted,
+                "error": client.connection_error,
+            }
+            for cp_id, client in self.clients.items()
+        ]
+
+    def connected_count(self) -> int:
+        return sum(1 for c in self.clients.values() if c.connection_accepted)
+
+    def collect_metrics(self) -> list:
+        return (client_families(self.clients.values(), per_client=False)
+                + fleet_families(self.connect_limiter, self.reconnect_tracker)
+                + tls_families(tls.stats))
+
+    async def stop(self) -> None:
+        for cp_id in list(self.clients):
+            await self.remove(cp_id)
+        self._stopped.set()
+
+    async def wait_stopped(self) -> None:
+        await self._stopped.wait()
+
+
+class FleetControlServer:
+    """
+    sim_manager ile worker arasındaki yerel kontrol kanalı.
+    Her istek/yanıt tek satır JSON:
+        {"cmd": "ping"}
+        {"cmd": "list"}
+        {"cmd": "spawn", "ids": [...], "server_url": "wss://..."}
+        {"cmd": "kill", "cp_id": "..."}
+        {"cmd": "kill_all"}
+        {"cmd": "metrics"}
+    """
+
+    def __init__(self, runner: FleetRunner, port: int, host: str = "127.0.0.1") -> None:
+        self.runner = runner
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._background: set = set()
+
+    async def start(self) -> None:
+        # Binlerce id'lik spawn isteği tek satırda gelebilir
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, limit=16 * 1024 * 1024)
+        self.runner.logger.info(f"Control channel listening on {self.host}:{self.port}")
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    response = await self.dispatch(json.loads(line))
+                except Exception as e:
+                    response = {"ok": False, "error": str(e)}
+                writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+            with contextlib.suppress(Exception):
+                await writer.wait_closed()
+
+    async def dispatch(self, request: dict) -> dict:
+        cmd = request.get("cmd")
+        runner = self.runner
+        if cmd == "ping":
+            return {"ok": True, "clients": len(runner.clients)}
+        if cmd == "list":
+            return {"ok": True, "clients": runner.status()}
+        if cmd == "spawn":
+            ids = [i for i in request.get("ids", []) if i not in runner.clients]
+            # Ramp arka planda sürer; kabul edilen id'ler hemen döner
+            task = asyncio.create_task(runner.add_many(ids, request.get("server_url")))
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+            return {"ok": True, "accepted": ids}
+        if cmd == "kill":
+            return {"ok": await runner.remove(request.get("cp_id", ""))}
+        if cmd == "metrics":
+            # NamedTuple'lar JSON'da düz listeye çevrilir (server peer "metrics" ile aynı biçim)
+            families = [[name, kind, doc, [list(sample) for sample in samples]]
+                        for name, kind, doc, samples in REGISTRY.collect()]
+            return {"ok": True, "families": families}
+        if cmd == "kill_all":
+            ids = list(runner.clients)
+            for cp_id in ids:
+                await runner.remove(cp_id)
+            return {"ok": True, "count": len(ids)}
+        return {"ok": False, "error": f"unknown command: {cmd}"}
+
+
+def build_ids(prefix: str, count: int, start_index: int = 1) -> List[str]:
+    return [f"{prefix}-{i:03d}" for i in range(start_index, start_index + count)]
+
+
+async def run_fleet(args: argparse.Namespace) -> None:
+    runner = FleetRunner(server_url=args.server_url, ramp_rate=args.ramp_rate,
+                         connect_rate=args.connect_rate, connect_concurrency=args.connect_concurrency,
+                         replay_rate=args.replay_rate)
+    REGISTRY.register_collector(runner.collect_metrics)
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        with contextlib.suppress(NotImplementedError):  # Windows
+            loop.add_signal_handler(sig, lambda: asyncio.create_task(runner.stop()))
+
+    control = None
+    if args.control_port:
+        control = FleetControlServer(runner, args.control_port)
+        await control.start()
+
+    ids = build_ids(args.prefix, args.count, args.start_index) if args.prefix else []
+    await runner.add_many(ids)
+    runner.logger.info(f"Fleet started: {len(runner.clients)} client(s) -> {args.server_url}")
+
+    try:
+        await runner.wait_stopped()
+    finally:
+        if control is not None:
+            await control.close()
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Headless OCPP client fleet (single event loop)")
+    parser.add_argument("--prefix", help="CP id öneki, örn: CP-IZMIR")
+    parser.add_argument("--count", type=int, default=0, help="Kaç client başlatılacak")
+    parser.add_argument("--start-index", type=int, default=1)
+    parser.add_argument("--server-url", default="wss://localhost:8080")
+    parser.add_argument("--ramp-rate", type=float, default=50.0,
+                        help="Saniyede başlatılacak client sayısı (0: sınırsız)")
+    parser.add_argument("--connect-rate", type=float, default=float(os.environ.get("FLEET_CONNECT_RATE", "200")),
+                        help="Saniyede en fazla yeni WebSocket/TLS handshake (0: sınırsız)")
+    parser.add_argument("--connect-concurrency", type=int,
+                        default=int(os.environ.get("FLEET_CONNECT_CONCURRENCY", "100")),
+                        help="Aynı anda süren en fazla handshake")
+    parser.add_argument("--replay-rate", type=float, default=float(os.environ.get("FLEET_REPLAY_RATE", "500")),
+                        help="Offline kuyruk tekrarı, filo geneli mesaj/sn (0: sınırsız)")
+    parser.add_argument("--control-port", type=int, default=0,
+                        help="sim_manager kontrol kanalı portu (0: kapalı)")
+    parser.add_argument("--speed", default=os.environ.get("SIM_SPEED", "1"),
+                        help="Simülasyon hızı: 1 (gerçek zaman), 10, 100 ya da max")
+    # Binlerce client INFO loglarsa I/O baskın olur; varsayılan WARNING
+    parser.add_argument("--log-level", default="WARNING")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    setup_logging(level=args.log_level)
+    set_clock(clock_from_spec(args.speed))
+    logging.getLogger("FleetRunner").setLevel(logging.INFO)
+    asyncio.run(run_fleet(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,9 @@
 import asyncio
-import logging
 from ocpp_client.client.ocpp_client import OCPPClient
 from ocpp_client.client.config import CLIENT_CONFIG
+from ocpp_common.log_pipeline import setup_logging
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+setup_logging()
 
 def create_ocpp_client():
     return OCPPClient(
@@ -1,6 +1,6 @@
-import asyncio
 import logging
-from datetime import datetime
+
+from ocpp_client.client.clock import get_clock
 from ocpp_client.client.status_simulator import ChargePointStatus
 
 class ManualController:
@@ -18,9 +18,10 @@ class ManualController:
             return False
             
         await self.client.simulator.change_status(connector, ChargePointStatus.PREPARING)
-        await asyncio.sleep(3)
+        await get_clock().sleep(3)
         await self.client.simulator.change_status(connector, ChargePointStatus.CHARGING)
         connector.session_active = True
+        self.client.simulator.mark_changed(connector)
         
         self.logger.info(f"Manual charging started on connector {connector_id}")
         return True
@@ -38,9 +39,10 @@ class ManualController:
             return False
             
         await self.client.simulator.change_status(connector, ChargePointStatus.FINISHING)
-        await asyncio.sleep(2)
+        await get_clock().sleep(2)
         await self.client.simulator.change_status(connector, ChargePointStatus.AVAILABLE)
         connector.session_active = False
+        self.client.simulator.mark_changed(connector)
         
         self.logger.info(f"Manual charging stopped on connector {connector_id}")
         return True
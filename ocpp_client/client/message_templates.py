@@ -1,20 +1,24 @@
-from datetime import datetime
+from ocpp_client.client.clock import get_clock
 from ocpp_client.client.config import CLIENT_CONFIG
 
 class MessageTemplates:
     
-    @staticmethod
-    def boot_notification() -> dict:
+    def __init__(self, config: dict = None):
+        # Her client kendi config'ini verir; verilmezse modül geneli CLIENT_CONFIG
+        self.config = config if config is not None else CLIENT_CONFIG
+    
+    def boot_notification(self) -> dict:
+        config = self.config
         return {
-            "chargePointVendor": CLIENT_CONFIG["charge_point_vendor"],
-            "chargePointModel": CLIENT_CONFIG["charge_point_model"],
-            "chargePointSerialNumber": CLIENT_CONFIG.get("charge_point_serial_number"),
-            "chargeBoxSerialNumber": CLIENT_CONFIG.get("charge_box_serial_number"),
-            "firmwareVersion": CLIENT_CONFIG.get("firmware_version"),
-            "iccid": CLIENT_CONFIG.get("iccid"),
-            "imsi": CLIENT_CONFIG.get("imsi"),
-            "meterType": CLIENT_CONFIG.get("meter_type"),
-            "meterSerialNumber": CLIENT_CONFIG.get("meter_serial_number")
+            "chargePointVendor": config["charge_point_vendor"],
+            "chargePointModel": config["charge_point_model"],
+            "chargePointSerialNumber": config.get("charge_point_serial_number"),
+            "chargeBoxSerialNumber": config.get("charge_box_serial_number"),
+            "firmwareVersion": config.get("firmware_version"),
+            "iccid": config.get("iccid"),
+            "imsi": config.get("imsi"),
+            "meterType": config.get("meter_type"),
+            "meterSerialNumber": config.get("meter_serial_number")
         }
     
     @staticmethod
@@ -27,5 +31,12 @@ class MessageTemplates:
             "connectorId": connector_id,
             "errorCode": error_code,
             "status": status,
-            "timestamp": datetime.now().strftime("%Y-%m-%dT%H:%M:%S.%fZ")
-        }
\ No newline at end of file
+            "timestamp": get_clock().timestamp()  # sanal zaman, UTC
+        }
+    
+    @staticmethod
+    def meter_values(connector_id: int, meter_value: list, transaction_id: int = None) -> dict:
+        payload = {"connectorId": connector_id, "meterValue": meter_value}
+        if transaction_id is not None:
+            payload["transactionId"] = transaction_id
+        return payload
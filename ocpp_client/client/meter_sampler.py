@@ -0,0 +1,297 @@
+"""
+Şarj eden connector'lar için MeterValues üretimi (NumPy ile vektörel).
+
+Süreçteki tüm şarj eden connector'lar, aynı örnekleme aralığına sahip
+tek bir MeterSampler'da satır olarak tutulur. Her örnekleme anında güç,
+enerji, akım, gerilim ve SoC eğrileri bütün satırlar için tek seferde
+dizi işlemleriyle hesaplanır; connector başına Python döngüsü yalnızca
+hazır değerlerden payload kurup gönderim task'ı açmak içindir.
+
+Profiller (client config'te "meter_values" bloğu):
+
+    "meter_values": {"sample_interval": 60, "profile": "AC22kW",
+                     "battery_kwh": [40, 100], "start_soc": [10, 60]}
+
+    AC22kW : 3 faz 230 V, 32 A; araç yerleşik şarj cihazı sınırı (7.4/11/22 kW)
+             oturum başında seçilir, taper_soc üstünde güç doğrusal düşer
+    DC     : sabit güç (CC) taper_soc'a kadar, sonra min_power_ratio'ya
+             doğru düşüş; batarya gerilimi SoC ile voltage_min→voltage_max
+
+Bloktaki profil anahtarları (ör. "max_power_kw": 11) seçilen profili ezer.
+Örnekler sanal saatle (bkz. clock.py) alınır; ScaledClock altında enerji
+de aynı hızla birikir.
+
+    sampler = shared_sampler(60)
+    sampler.add(client, connector)     # Charging'e geçince
+    sampler.remove(connector)          # Suspended / Finishing / Available
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import weakref
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from ocpp_client.client.clock import Clock, get_clock
+from ocpp_client.client.event_scheduler import ScheduledEvent, shared_scheduler
+
+DEFAULT_SAMPLE_INTERVAL = 60
+DEFAULT_PROFILE = "AC22kW"
+SEND_BATCH = 2000  # loop turu başına açılan en fazla gönderim task'ı
+
+PROFILES: Dict[str, dict] = {
+    "AC22kW": {
+        "type": "AC",
+        "max_power_kw": 22.0,
+        "phases": 3,
+        "voltage": 230.0,
+        "vehicle_max_power_kw": [7.4, 11.0, 22.0],
+        "taper_soc": 90.0,
+        "min_power_ratio": 0.1,
+    },
+    "DC": {
+        "type": "DC",
+        "max_power_kw": 50.0,
+        "voltage_min": 350.0,
+        "voltage_max": 410.0,
+        "vehicle_max_power_kw": [50.0],
+        "taper_soc": 55.0,
+        "min_power_ratio": 0.15,
+    },
+}
+
+# Satır başına tutulan float64 sütunları
+_COLUMNS = (
+    "energy_wh",      # Energy.Active.Import.Register (connector sayacı, oturumlar arası kalıcı)
+    "soc",            # %
+    "capacity_wh",    # araç bataryası
+    "max_power_w",    # min(profil, araç) gücü
+    "taper_soc",
+    "min_ratio",
+    "is_dc",          # 0/1
+    "voltage",        # AC faz gerilimi
+    "voltage_min",    # DC batarya gerilimi aralığı
+    "voltage_max",
+    "phases",
+    "last_t",         # son örnek anı (clock.time())
+)
+
+
+def resolve_profile(config: dict) -> dict:
+    """Client config'inden etkin profil (varsayılanlar + "meter_values" ezmeleri)."""
+    meter = config.get("meter_values") or {}
+    name = meter.get("profile") or (
+        config.get("charge_point_model") if config.get("charge_point_model") in PROFILES
+        else ("DC" if config.get("meter_type") == "DC" else DEFAULT_PROFILE)
+    )
+    if name not in PROFILES:
+        raise ValueError(f"Unknown meter profile: {name}")
+    profile = dict(PROFILES[name])
+    profile.update({k: v for k, v in meter.items() if k in PROFILES[name]})
+    profile["name"] = name
+    return profile
+
+
+def sample_interval(config: dict) -> float:
+    return float((config.get("meter_values") or {}).get("sample_interval", DEFAULT_SAMPLE_INTERVAL))
+
+
+class MeterSampler:
+    def __init__(self, interval: float = DEFAULT_SAMPLE_INTERVAL, clock: Optional[Clock] = None,
+                 seed: Optional[int] = None):
+        if interval <= 0:
+            raise ValueError("interval must be > 0")
+        self.interval = interval
+        self.clock = clock or get_clock()
+        self.logger = logging.getLogger("MeterSampler")
+        self._rng = np.random.default_rng(seed)
+        self._size = 0
+        self._cols: Dict[str, np.ndarray] = {name: np.zeros(16) for name in _COLUMNS}
+        self._rows: List[tuple] = []  # satır -> (client, connector)
+        self._event: Optional[ScheduledEvent] = None
+        self._tasks: set = set()
+        # Gözlem sayaçları
+        self.ticks = 0
+        self.samples = 0
+        self.skipped = 0  # önceki MeterValues hâlâ cevap bekliyordu
+
+    def __len__(self) -> int:
+        return self._size
+
+    # --- Satır yönetimi ---
+
+    def add(self, client, connector) -> None:
+        """connector şarja (Charging) geçti; oturum yoksa yeni araç bağlanmış sayılır."""
+        if getattr(connector, "meter_row", None) is not None:
+            return
+        meter = client.config.get("meter_values") or {}
+        profile = resolve_profile(client.config)
+        if connector.ev_soc is None:
+            kwh_lo, kwh_hi = meter.get("battery_kwh", (40, 100))
+            soc_lo, soc_hi = meter.get("start_soc", (10, 60))
+            connector.ev_capacity_wh = random.uniform(kwh_lo, kwh_hi) * 1000
+            connector.ev_soc = random.uniform(soc_lo, soc_hi)
+            connector.ev_max_power_w = min(profile["max_power_kw"],
+                                           random.choice(profile["vehicle_max_power_kw"])) * 1000
+
+        if self._size == len(self._cols["soc"]):
+            for name, col in self._cols.items():
+                self._cols[name] = np.concatenate([col, np.zeros(len(col))])
+        row = self._size
+        self._size += 1
+        is_dc = profile["type"] == "DC"
+        values = {
+            "energy_wh": connector.meter_wh,
+            "soc": connector.ev_soc,
+            "capacity_wh": connector.ev_capacity_wh,
+            "max_power_w": connector.ev_max_power_w,
+            "taper_soc": profile["taper_soc"],
+            "min_ratio": profile["min_power_ratio"],
+            "is_dc": float(is_dc),
+            "voltage": profile.get("voltage", 0.0),
+            "voltage_min": profile.get("voltage_min", 0.0),
+            "voltage_max": profile.get("voltage_max", 0.0),
+            "phases": profile.get("phases", 1),
+            "last_t": self.clock.time(),
+        }
+        for name, value in values.items():
+            self._cols[name][row] = value
+        self._rows.append((client, connector))
+        connector.meter_row = row
+        if self._event is None:
+            self._event = shared_scheduler().call_later(self.interval, self._tick)
+
+    def remove(self, connector) -> None:
+        """Satırı çıkar; sayaç ve SoC connector'a yazılır (Suspended → Charging devam eder)."""
+        row = getattr(connector, "meter_row", None)
+        if row is None:
+            return
+        cols = self._cols
+        connector.meter_wh = float(cols["energy_wh"][row])
+        connector.ev_soc = float(cols["soc"][row])
+        connector.meter_row = None
+        last = self._size - 1
+        if row != last:
+            # Son satırı boşalan yere taşı (O(1) silme)
+            for col in cols.values():
+                col[row] = col[last]
+            moved = self._rows[last]
+            self._rows[row] = moved
+            moved[1].meter_row = row
+        self._rows.pop()
+        self._size = last
+        if not self._size and self._event is not None:
+            self._event.cancel()
+            self._event = None
+
+    # --- Örnekleme ---
+
+    def compute(self, now: float) -> Dict[str, np.ndarray]:
+        """Tüm satırları `now` anına ilerlet; örnek değerlerini diziler olarak döner."""
+        n = self._size
+        c = {name: col[:n] for name, col in self._cols.items()}
+        dt = np.maximum(now - c["last_t"], 0.0)
+        soc = c["soc"]
+
+        # Güç eğrisi: taper_soc'a kadar tam güç, sonra %100'de min_ratio'ya doğrusal düşüş
+        span = np.maximum(100.0 - c["taper_soc"], 1e-6)
+        ratio = 1.0 - (soc - c["taper_soc"]) / span * (1.0 - c["min_ratio"])
+        ratio = np.clip(ratio, c["min_ratio"], 1.0)
+        noise = 1.0 + self._rng.normal(0.0, 0.01, n)
+        power = np.where(soc >= 100.0, 0.0, c["max_power_w"] * ratio * noise)
+
+        energy = power * dt / 3600.0
+        c["energy_wh"] += energy
+        soc += energy / c["capacity_wh"] * 100.0
+        np.minimum(soc, 100.0, out=soc)
+        c["last_t"][:] = now
+
+        dc = c["is_dc"] > 0
+        voltage = np.where(
+            dc,
+            c["voltage_min"] + (c["voltage_max"] - c["voltage_min"]) * soc / 100.0,
+            c["voltage"],
+        ) + self._rng.normal(0.0, 1.0, n)
+        current = power / (voltage * np.where(dc, 1.0, c["phases"]))
+        return {"energy_wh": c["energy_wh"], "power_w": power, "current_a": current,
+                "voltage_v": voltage, "soc": soc}
+
+    def _tick(self) -> None:
+        self._event = None
+        if not self._size:
+            return
+        self.ticks += 1
+        values = self.compute(self.clock.time())
+        timestamp = self.clock.timestamp()
+        # Değerler OCPP'de string; dönüşüm de vektörel
+        energy = np.rint(values["energy_wh"]).astype(np.int64).astype(str).tolist()
+        power = np.round(values["power_w"], 1).astype(str).tolist()
+        current = np.round(values["current_a"], 2).astype(str).tolist()
+        voltage = np.round(values["voltage_v"], 1).astype(str).tolist()
+        soc = np.floor(values["soc"]).astype(np.int64).astype(str).tolist()
+
+        rows = list(self._rows)
+        columns = (energy, power, current, voltage, soc)
+        self._send_batch(rows, columns, timestamp, 0)
+        self._event = shared_scheduler().call_later(self.interval, self._tick)
+
+    def _send_batch(self, rows: list, columns: tuple, timestamp: str, start: int) -> None:
+        # Gönderim task'ları SEND_BATCH'lik parçalarla açılır; loop tek turda kilitlenmez
+        energy, power, current, voltage, soc = columns
+        end = min(start + SEND_BATCH, len(rows))
+        for i in range(start, end):
+            client, connector = rows[i]
+            if connector.meter_row is None:
+                continue  # bu arada şarj bitti
+            if connector.meter_busy:
+                self.skipped += 1
+                continue
+            # Bağlantı yoksa da örneklenir; client offline kuyruğa alır
+            meter_value = {
+                "timestamp": timestamp,
+                "sampledValue": [
+                    {"value": energy[i], "context": "Sample.Periodic",
+                     "measurand": "Energy.Active.Import.Register", "unit": "Wh"},
+                    {"value": power[i], "context": "Sample.Periodic",
+                     "measurand": "Power.Active.Import", "unit": "W"},
+                    {"value": current[i], "context": "Sample.Periodic",
+                     "measurand": "Current.Import", "unit": "A"},
+                    {"value": voltage[i], "context": "Sample.Periodic",
+                     "measurand": "Voltage", "unit": "V"},
+                    {"value": soc[i], "context": "Sample.Periodic",
+                     "measurand": "SoC", "location": "EV", "unit": "Percent"},
+                ],
+            }
+            self._send(client, connector, meter_value)
+        if end < len(rows):
+            asyncio.get_running_loop().call_soon(self._send_batch, rows, columns, timestamp, end)
+
+    def _send(self, client, connector, meter_value: dict) -> None:
+        connector.meter_busy = True
+        self.samples += 1
+        task = asyncio.create_task(client.send_meter_values(connector.connector_id, [meter_value]))
+        self._tasks.add(task)
+
+        def done(t: asyncio.Task) -> None:
+            self._tasks.discard(t)
+            connector.meter_busy = False
+
+        task.add_done_callback(done)
+
+
+_samplers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[float, MeterSampler]]" = weakref.WeakKeyDictionary()
+
+
+def shared_sampler(interval: float = DEFAULT_SAMPLE_INTERVAL) -> MeterSampler:
+    """Çalışan event loop'a ve örnekleme aralığına ait paylaşılan örnekleyici."""
+    loop = asyncio.get_running_loop()
+    by_interval = _samplers.get(loop)
+    if by_interval is None:
+        by_interval = _samplers[loop] = {}
+    sampler = by_interval.get(interval)
+    if sampler is None:
+        sampler = by_interval[interval] = MeterSampler(interval)
+    return sampler
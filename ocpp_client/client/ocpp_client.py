@@ -1,20 +1,26 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
-import ssl
+import time
 import uuid
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
 import websockets
 from websockets.exceptions import ConnectionClosed, ConnectionClosedOK, ConnectionClosedError
 
+from ocpp_client.client.clock import get_clock
 from ocpp_client.client.config import CLIENT_CONFIG
+from ocpp_client.client.latency import LatencyHistogram
 from ocpp_client.client.manuel_controller import ManualController
 from ocpp_client.client.message_templates import MessageTemplates
+from ocpp_client.client.offline_queue import OfflineQueue
+from ocpp_client.client.reconnect import Backoff, ConnectLimiter, ReconnectTracker, TokenBucket
 from ocpp_client.client.status_simulator import StatusSimulator
+from ocpp_client.client import tls
+from ocpp_client.client.timer_wheel import TimerHandle, shared_wheel
+from ocpp_common import codec
 
 # UI'ye canlı bildirim göndermek için (varsa) websocket_manager'ı içe aktar
 try:
@@ -28,50 +34,123 @@ except Exception:
        websocket_manager = None  # UI yoksa sessizce atla
 
 
+DEFAULT_CALL_TIMEOUT = 30.0
+
+
+class OCPPCallError(Exception):
+   """
+   Server bir CALL'a CALLERROR ile cevap verdi.
+   """
+
+   def __init__(self, action: str, code: str, description: str = "", details: Optional[dict] = None) -> None:
+       super().__init__(f"{action}: {code} - {description}")
+       self.action = action
+       self.code = code
+       self.description = description
+       self.details = details or {}
+
+
 class OCPPClient:
    """
    Minimal fakat üretime yakın bir OCPP 1.6 JSON istemcisi.
    - Server'a bağlanır ve BootNotification gönderir
+   - Her CALL, mesaj id'si ile CALLRESULT/CALLERROR'a eşlenir; aynı anda
+     tek bekleyen CALL olur (OCPP 1.6 kuralı), action bazlı timeout uygulanır
    - Server conf 'interval' ile heartbeat periyodunu günceller
-   - Son mesajdan bu yana 'interval' dolduysa Heartbeat gönderir
-   - StatusSimulator durum değişimlerinde StatusNotification yollar
+   - Son mesajdan bu yana 'interval' dolduysa Heartbeat gönderir (süreçteki
+     tüm client'ların paylaştığı timer wheel üzerinden, monotonik saatle)
+   - StatusSimulator durum değişimlerinde StatusNotification, şarj sırasında
+     periyodik MeterValues yollar
    - Server → Client CALL (RemoteStart/RemoteStop) komutlarını işler
    """
 
-   def __init__(self, server_url: str, charge_point_id: str) -> None:
+   def __init__(self, server_url: str, charge_point_id: str, config: Optional[dict] = None) -> None:
        self.server_url = server_url.rstrip("/")
        self.charge_point_id = charge_point_id
        self.websocket: Optional[websockets.WebSocketClientProtocol] = None
+       # Instance'a özel config (fleet modunda her CP'nin kendi config'i olur)
+       self.config = config if config is not None else CLIENT_CONFIG
 
        self.logger = logging.getLogger(f"OCPPClient[{self.charge_point_id}]")
-       self.templates = MessageTemplates()
+       # Simülasyon saati (bkz. clock.py); heartbeat ve zaman damgaları sanal zamanda
+       self.clock = get_clock()
+       self.templates = MessageTemplates(self.config)
        self.simulator = StatusSimulator(self)
        self.manual_controller = ManualController(self)
 
        self.connected = False
        self.connection_accepted = False  # EKLENEN SATIR
-       self.heartbeat_interval: int = CLIENT_CONFIG["default_heartbeat_interval"]
+       self.connection_error: Optional[str] = None
+       self.heartbeat_interval: int = self.config["default_heartbeat_interval"]
        self.last_heartbeat: Optional[datetime] = None
-       self.last_message_time: datetime = datetime.now()
+       self.last_message_at: float = self.clock.time()  # son mesaj (sanal monotonik)
 
+       self._hb_timer: Optional[TimerHandle] = None
        self._hb_task: Optional[asyncio.Task] = None
        self._sim_task: Optional[asyncio.Task] = None
+       self._reader_task: Optional[asyncio.Task] = None
+       self._call_tasks: set = set()
+
+       # msgId -> (action, future, gönderim anı)
+       self._pending: Dict[str, Tuple[str, asyncio.Future, float]] = {}
+       self._call_lock = asyncio.Lock()  # tek bekleyen CALL kuralı
+       self.call_timeouts: Dict[str, float] = dict(self.config.get("call_timeouts", {}))
+       self.call_latency: Dict[str, LatencyHistogram] = {}
+       self.call_timeout_count: Dict[str, int] = {}
+       # /metrics sayaçları (bkz. client_metrics.py); düz alan artırımı, kilit yok
+       self.reconnects = 0
+       self.send_failures: Dict[str, int] = {}
+       # Heartbeat'in vaktinden ne kadar geç gönderildiği (event loop doygunluğu)
+       self.heartbeat_lag = LatencyHistogram()
+       # Yeniden bağlanma (bkz. reconnect.py); limiter/tracker'ı fleet atar
+       self.backoff = Backoff.from_config(self.config.get("reconnect"))
+       self.connect_limiter: Optional[ConnectLimiter] = None
+       self.reconnect_tracker: Optional[ReconnectTracker] = None
+       # Bağlantı yokken StatusNotification/MeterValues (bkz. offline_queue.py);
+       # replay_limiter'ı fleet atar (filo geneli tekrar hızı)
+       self.offline_queue = OfflineQueue.from_config(self.config.get("offline_queue"))
+       self.replay_limiter: Optional[TokenBucket] = None
+       self._replay_task: Optional[asyncio.Task] = None
 
    # Lifecycle
    async def start(self) -> None:
        """
        Sürekli yeniden bağlanma stratejisi ile ana döngü.
+       Her denemeden önce jitter'lı bekleme (bkz. reconnect.Backoff); temiz
+       kapanıştan sonra da beklenir ki server yeniden başlarken tüm filo
+       aynı anda geri gelmesin. Accepted olan oturum backoff'u sıfırlar.
        """
-       backoff = 2
+       attempted = False
        while True:
            try:
+               if attempted:
+                   self.reconnects += 1
+               attempted = True
                await self.connect()
+               self.connection_error = None
                await self.handle_connection()
-               backoff = 2  # başarıyla bağlanınca backoff'u sıfırla
            except Exception as e:
+               self.connection_error = str(e)
                self.logger.error(f"Connection failed: {e}")
-               await asyncio.sleep(backoff)
-               backoff = min(backoff * 2, 30)  # basit backoff: 2→4→8→16→30
+           # Gerçek zaman: yeniden bağlanma simülasyon hızından bağımsız
+           await asyncio.sleep(self.backoff.next())
+
+   async def close(self) -> None:
+       """
+       WebSocket'i kapat (start() görevi iptal edildikten sonra çağrılır).
+       """
+       self.connected = False
+       self.connection_accepted = False
+       # Simülatör bağlantıdan bağımsız yaşar; client ile birlikte durur
+       if self._sim_task is not None:
+           self._sim_task.cancel()
+           with contextlib.suppress(asyncio.CancelledError, Exception):
+               await self._sim_task
+           self._sim_task = None
+       if self.websocket is not None:
+           with contextlib.suppress(Exception):
+               await self.websocket.close()
+           self.websocket = None
 
    async def connect(self) -> None:
        """
@@ -80,17 +159,21 @@ class OCPPClient:
        subprotocol = "ocpp1.6"
        uri = f"{self.server_url}/{self.charge_point_id}"
 
-       # Self-signed sertifikalar için doğrulanmamış context (lokalde pratik)
-       ssl_context = ssl._create_unverified_context()
+       # Süreç geneli context ve TLS oturum devamı (bkz. tls.py);
+       # ws:// adreslerinde ssl verilmez (websockets bunu hata sayar)
+       ssl_context = tls.client_ssl_context() if uri.startswith("wss://") else None
 
        self.logger.info(f"Connecting to {uri} ...")
-       self.websocket = await websockets.connect(
-           uri,
-           subprotocols=[subprotocol],
-           ssl=ssl_context,
-           ping_interval=30,
-           ping_timeout=10,
-       )
+       limiter = self.connect_limiter or contextlib.nullcontext()
+       async with limiter:  # filo: handshake hızı ve eşzamanlılığı sınırlı
+           self.websocket = await websockets.connect(
+               uri,
+               subprotocols=[subprotocol],
+               ssl=ssl_context,
+               ping_interval=30,
+               ping_timeout=10,
+           )
+       tls.remember_session(self.websocket)
        self.connected = True
        self.logger.info("WebSocket connected")
 
@@ -101,34 +184,62 @@ class OCPPClient:
        assert self.websocket is not None
 
        try:
-           # 1) BootNotification
-           await self.send_boot_notification()
-           self.connection_accepted = True  # EKLENEN SATIR
-
-           # 2) Heartbeat & Simulator görevleri
-           self._hb_task = asyncio.create_task(self._heartbeat_loop())
-           self._sim_task = asyncio.create_task(self.simulator.start())
-
-           # 3) Sunucudan gelen mesajları dinle
-           async for raw in self.websocket:
-               await self._handle_incoming(raw)
+           # 1) Sunucudan gelen mesajları dinle (CALL cevapları buradan çözülür)
+           self._reader_task = asyncio.create_task(self._reader_loop())
+
+           # 2) BootNotification: Accepted gelene kadar interval aralıklarla tekrarla
+           while not await self.send_boot_notification():
+               if self._reader_task.done():
+                   break
+               await self.clock.sleep(self.heartbeat_interval)
+
+           # 3) Heartbeat zamanlayıcısı & Simulator görevi
+           if not self._reader_task.done():
+               self.backoff.reset()
+               if self.reconnect_tracker is not None:
+                   self.reconnect_tracker.accepted(self)
+               self._arm_heartbeat()
+               # Simülatör kopuşlarda durmaz (CP offline da çalışır); yeniden
+               # bağlanınca server'ın görünümü güncel durumlarla tazelenir
+               if self._sim_task is None or self._sim_task.done():
+                   self._sim_task = asyncio.create_task(self.simulator.start())
+               else:
+                   for connector in self.simulator.connectors.values():
+                       self.offline_queue.put("StatusNotification", self.templates.status_notification(
+                           connector.connector_id, connector.status.value))
+               if self.offline_queue:
+                   self._replay_task = asyncio.create_task(self._replay_offline())
+
+           await self._reader_task
 
        except (ConnectionClosed, ConnectionClosedOK, ConnectionClosedError):
            self.logger.warning("Connection closed")
        finally:
+           if self.connection_accepted and self.reconnect_tracker is not None:
+               self.reconnect_tracker.lost(self)
            self.connected = False
            self.connection_accepted = False  # EKLENEN SATIR
+           if self._hb_timer is not None:
+               self._hb_timer.cancel()
+               self._hb_timer = None
            # Görevleri iptal et
-           if self._hb_task:
-               self._hb_task.cancel()
-               with contextlib.suppress(Exception):
-                   await self._hb_task
-           if self._sim_task:
-               self._sim_task.cancel()
-               with contextlib.suppress(Exception):
-                   await self._sim_task
+           # (CancelledError Exception değil; yutulmazsa start() döngüsü kırılır)
+           for task in (self._reader_task, self._hb_task, self._replay_task):
+               if task:
+                   task.cancel()
+                   with contextlib.suppress(asyncio.CancelledError, Exception):
+                       await task
+           self._fail_pending(ConnectionError("Connection closed"))
 
    # Incoming frames
+   async def _reader_loop(self) -> None:
+       assert self.websocket is not None
+       try:
+           async for raw in self.websocket:
+               await self._handle_incoming(raw)
+       finally:
+           self._fail_pending(ConnectionError("Connection closed"))
+
    async def _handle_incoming(self, raw_message: str) -> None:
        """
        OCPP çerçevelerini ayrıştır:
@@ -137,13 +248,16 @@ class OCPPClient:
          - CALLERROR  : [4, msgId, errorCode, errorDescription, errorDetails]
        """
        try:
-           message = json.loads(raw_message)
+           message = codec.loads(raw_message)
            msg_type = message[0]
 
            if msg_type == 2:
-               # Server → Client CALL
+               # Server → Client CALL. Ayrı task: handler kendi CALL'unu gönderip
+               # cevabını beklerken okuma döngüsü bloklanmasın
                msg_id, action, payload = message[1], message[2], message[3]
-               await self._handle_call(msg_id, action, payload)
+               task = asyncio.create_task(self._handle_call(msg_id, action, payload))
+               self._call_tasks.add(task)
+               task.add_done_callback(self._call_tasks.discard)
 
            elif msg_type == 3:
                # CALLRESULT
@@ -155,13 +269,19 @@ class OCPPClient:
                msg_id = message[1]
                err_code = message[2] if len(message) > 2 else "Unknown"
                err_desc = message[3] if len(message) > 3 else ""
-               self.logger.error(f"CALLERROR (id={msg_id}): {err_code} - {err_desc}")
+               err_details = message[4] if len(message) > 4 else {}
+               self.logger.error("CALLERROR (id=%s): %s - %s", msg_id, err_code, err_desc)
+               pending = self._pending.pop(msg_id, None)
+               if pending is not None:
+                   action, fut, _ = pending
+                   if not fut.done():
+                       fut.set_exception(OCPPCallError(action, err_code, err_desc, err_details))
 
            # Son mesaj zamanını güncelle
-           self.last_message_time = datetime.now()
+           self.last_message_at = self.clock.time()
 
        except Exception as e:
-           self.logger.error(f"Error handling incoming message: {e}")
+           self.logger.error("Error handling incoming message: %s", e)
 
    async def _handle_call(self, msg_id: str, action: str, payload: dict) -> None:
        """
@@ -197,105 +317,232 @@ class OCPPClient:
 
    async def _handle_call_result(self, msg_id: str, payload: dict) -> None:
        """
-       Client → Server çağrılarının cevapları (özellikle BootNotification.conf).
+       Client → Server çağrılarının cevapları: bekleyen future'ı çöz ve
+       gecikmeyi action histogramına yaz.
        """
-       # BootNotification.conf → {"status": "Accepted", "currentTime": "...", "interval": 60}
-       try:
-           if payload.get("status") == "Accepted" and "interval" in payload:
-               old = self.heartbeat_interval
-               self.heartbeat_interval = int(payload["interval"])
-               self.logger.info(f"Heartbeat interval updated: {old}s -> {self.heartbeat_interval}s")
-
-               # Heartbeat görevini tazele
-               if self._hb_task:
-                   self._hb_task.cancel()
-                   with contextlib.suppress(Exception):
-                       await self._hb_task
-                   self._hb_task = asyncio.create_task(self._heartbeat_loop())
-
-       except Exception as e:
-           self.logger.error(f"Error in CALLRESULT handler: {e}")
+       pending = self._pending.pop(msg_id, None)
+       if pending is None:
+           self.logger.debug("CALLRESULT for unknown/expired id=%s", msg_id)
+           return
+       action, fut, sent_at = pending
+       self._latency(action).observe(time.perf_counter() - sent_at)
+       if not fut.done():
+           fut.set_result(payload)
+
+   def _latency(self, action: str) -> LatencyHistogram:
+       hist = self.call_latency.get(action)
+       if hist is None:
+           hist = self.call_latency[action] = LatencyHistogram()
+       return hist
+
+   def _fail_pending(self, exc: Exception) -> None:
+       pending, self._pending = self._pending, {}
+       for _, fut, _ in pending.values():
+           if not fut.done():
+               fut.set_exception(exc)
+               fut.exception()  # bekleyen yoksa "never retrieved" uyarısı olmasın
+
+   def latency_stats(self) -> Dict[str, dict]:
+       """
+       Action bazlı CALL→CALLRESULT gecikmeleri (saniye) ve timeout sayıları.
+       """
+       return {
+           action: {**hist.snapshot(), "timeouts": self.call_timeout_count.get(action, 0)}
+           for action, hist in self.call_latency.items()
+       }
 
    # Outgoing helpers
    async def _send_raw(self, frame: list) -> None:
        if not self.connected or not self.websocket:
            raise RuntimeError("WebSocket not connected")
-       await self.websocket.send(json.dumps(frame))
+       await self.websocket.send(codec.dumps_text(frame))
 
-   async def send_message(self, action: str, payload: dict) -> Optional[str]:
+   def _timeout_for(self, action: str) -> float:
+       return float(self.call_timeouts.get(action, self.call_timeouts.get("default", DEFAULT_CALL_TIMEOUT)))
+
+   async def call(self, action: str, payload: dict, timeout: Optional[float] = None) -> dict:
        """
-       OCPP CALL gönder: [2, msgId, action, payload]
+       OCPP CALL gönder ve CALLRESULT payload'ını bekle: [2, msgId, action, payload]
+       - CALLERROR → OCPPCallError
+       - Süre aşımı → asyncio.TimeoutError
+       Aynı anda yalnızca bir CALL cevap bekler; diğerleri sırada durur.
+       """
+       if timeout is None:
+           timeout = self._timeout_for(action)
+       # MaxSpeedClock: cevap bekleyen CALL'lar sanal zamanın ilerlemesini frenler
+       self.clock.begin()
+       try:
+           async with self._call_lock:
+               if not self.connected or not self.websocket:
+                   raise RuntimeError("WebSocket not connected")
+               msg_id = str(uuid.uuid4())
+               fut = asyncio.get_running_loop().create_future()
+               self._pending[msg_id] = (action, fut, time.perf_counter())
+               try:
+                   await self.websocket.send(codec.dumps_text([2, msg_id, action, payload]))
+                   self.logger.debug("Sent %s: %s", action, payload, extra={"ocpp_action": action})
+                   # Heartbeat yuvası burada ertelenmez; vakti gelince _on_heartbeat_due
+                   # bu zamana bakıp yuvayı ileri kurar (gönderim başına çark işlemi yok)
+                   self.last_message_at = self.clock.time()
+                   return await asyncio.wait_for(fut, timeout)
+               except asyncio.TimeoutError:
+                   self.call_timeout_count[action] = self.call_timeout_count.get(action, 0) + 1
+                   self.logger.warning("%s timed out after %ss (id=%s)", action, timeout, msg_id)
+                   raise
+               finally:
+                   self._pending.pop(msg_id, None)
+       finally:
+           self.clock.end()
+
+   async def send_message(self, action: str, payload: dict) -> Optional[dict]:
+       """
+       call() etrafında hata yutan yardımcı: conf payload'ını ya da
+       bağlantı yoksa/hata olursa None döner.
        """
        if not self.connected or not self.websocket:
            return None
-       msg_id = str(uuid.uuid4())
-       frame = [2, msg_id, action, payload]
        try:
-           await self.websocket.send(json.dumps(frame))
-           self.logger.debug(f"Sent {action}: {payload}")
-           self.last_message_time = datetime.now()
-           return msg_id
+           return await self.call(action, payload)
        except Exception as e:
-           self.logger.error(f"Failed to send {action}: {e}")
+           self.send_failures[action] = self.send_failures.get(action, 0) + 1
+           self.logger.error("Failed to send %s: %r", action, e)
            return None
 
+   async def send_transactional(self, action: str, payload: dict) -> None:
+       """
+       StatusNotification / MeterValues gönderimi. Accepted bir bağlantı
+       yoksa ya da biriken kuyruk henüz boşalmadıysa (sıra bozulmasın diye)
+       mesaj offline kuyruğa girer; gönderim sırasında bağlantı koptuysa da.
+       """
+       if not self.connection_accepted or self.offline_queue:
+           self.offline_queue.put(action, payload)
+           return
+       if await self.send_message(action, payload) is None and not self.connected:
+           self.offline_queue.put(action, payload)
+
+   async def _replay_offline(self) -> None:
+       """
+       Accepted sonrası kuyruğu sırayla boşalt. Hız client başına
+       replay_rate, fleet'te ayrıca paylaşılan replay_limiter ile sınırlı;
+       toplu yeniden bağlanmada server'a birikmiş mesaj seli gitmez.
+       """
+       queue = self.offline_queue
+       self.logger.info("Replaying %d offline message(s)", len(queue))
+       while queue and self.connection_accepted:
+           if self.replay_limiter is not None:
+               await self.replay_limiter.take()
+           entry = queue.pop()
+           _, action, payload = entry
+           try:
+               await self.call(action, payload)
+           except asyncio.CancelledError:
+               queue.push_front(entry)
+               raise
+           except OCPPCallError as e:
+               # Server mesajı reddetti; tekrar denemek anlamsız
+               queue.replay_failed += 1
+               self.logger.warning("Offline %s rejected: %s", action, e)
+           except Exception as e:
+               queue.push_front(entry)
+               queue.replay_failed += 1
+               self.logger.warning("Offline replay of %s failed: %r", action, e)
+               if not self.connected:
+                   return
+               await asyncio.sleep(1.0)
+           else:
+               queue.replayed += 1
+           if queue.replay_rate > 0:
+               await asyncio.sleep(1.0 / queue.replay_rate)
+
    # Specific messages
-   async def send_boot_notification(self) -> None:
+   async def send_boot_notification(self) -> bool:
+       """
+       BootNotification gönder; conf 'interval' ile heartbeat periyodunu güncelle.
+       Accepted ise True döner.
+       """
        payload = self.templates.boot_notification()
-       await self.send_message("BootNotification", payload)
+       conf = await self.send_message("BootNotification", payload)
        self.logger.info("BootNotification sent")
+       if not conf:
+           return False
+       if "interval" in conf:
+           old = self.heartbeat_interval
+           self.heartbeat_interval = int(conf["interval"]) or old
+           self.logger.info(f"Heartbeat interval updated: {old}s -> {self.heartbeat_interval}s")
+       self.connection_accepted = conf.get("status") == "Accepted"
+       if not self.connection_accepted:
+           self.logger.warning(f"BootNotification not accepted: {conf.get('status')}")
+       return self.connection_accepted
 
    async def send_heartbeat(self) -> None:
        payload = self.templates.heartbeat()
        await self.send_message("Heartbeat", payload)
-       self.last_heartbeat = datetime.now()
-       self.logger.info("Heartbeat sent")
+       self.last_heartbeat = self.clock.now()
+       self.logger.info("Heartbeat sent", extra={"ocpp_action": "Heartbeat"})
 
    async def send_status_notification(
        self, connector_id: int, status: str, error_code: str = "NoError"
    ) -> None:
        payload = self.templates.status_notification(connector_id, status, error_code)
-       await self.send_message("StatusNotification", payload)
-       self.logger.info(f"StatusNotification sent: Connector {connector_id} -> {status}")
+       await self.send_transactional("StatusNotification", payload)
+       self.logger.info("StatusNotification sent: Connector %s -> %s", connector_id, status,
+                        extra={"ocpp_action": "StatusNotification"})
 
-       # UI'ye canlı güncelleme
+       # UI'ye canlı güncelleme; kuyruğa koyar, teslimatı beklemez
        if websocket_manager is not None:
            try:
-               await websocket_manager.broadcast(
+               websocket_manager.publish(
                    {
                        "type": "status_update",
                        "connector_id": connector_id,
                        "status": status,
-                       "timestamp": datetime.now().isoformat(),
+                       "timestamp": self.clock.now().isoformat(),
                    }
                )
            except Exception:
                # UI yoksa sessizce geç
                pass
 
-   # Background loops
-   async def _heartbeat_loop(self) -> None:
+   async def send_meter_values(self, connector_id: int, meter_value: list) -> None:
+       payload = self.templates.meter_values(connector_id, meter_value)
+       await self.send_transactional("MeterValues", payload)
+       self.logger.debug("MeterValues sent: Connector %s", connector_id,
+                         extra={"ocpp_action": "MeterValues"})
+
+   # Heartbeat
+   def _arm_heartbeat(self) -> None:
        """
-       OCPP 1.6 kuralına uygun basit heartbeat:
-       - Son mesaj gönderiminden bu yana 'interval' dolduysa Heartbeat yolla.
+       Heartbeat'i son mesaj + interval anına paylaşılan çarkta kur.
        """
-       while self.connected:
-           try:
-               elapsed = (datetime.now() - self.last_message_time).total_seconds()
-               wait_time = max(self.heartbeat_interval - elapsed, 0)
-               if wait_time > 0:
-                   await asyncio.sleep(wait_time)
-
-               # Süre dolduysa heartbeat gönder
-               if (datetime.now() - self.last_message_time).total_seconds() >= self.heartbeat_interval:
-                   await self.send_heartbeat()
-                   self.last_message_time = datetime.now()
+       self._hb_timer = shared_wheel().call_at(self.last_message_at + self.heartbeat_interval, self._on_heartbeat_due)
 
-           except asyncio.CancelledError:
-               break
-           except Exception as e:
-               self.logger.error(f"Heartbeat loop error: {e}")
-               await asyncio.sleep(1)
+   def _on_heartbeat_due(self) -> None:
+       """
+       OCPP 1.6: son mesajdan bu yana 'interval' dolduysa Heartbeat yolla;
+       arada mesaj gönderildiyse yuvayı yeni vakte ertele.
+       """
+       self._hb_timer = None
+       if not self.connected:
+           return
+       overdue = self.clock.time() - (self.last_message_at + self.heartbeat_interval)
+       if overdue < 0:
+           self._arm_heartbeat()
+           return
+       self.heartbeat_lag.observe(overdue)
+       self._hb_task = asyncio.create_task(self.send_heartbeat())
+       self._hb_task.add_done_callback(self._on_heartbeat_sent)
+
+   def _on_heartbeat_sent(self, task: asyncio.Task) -> None:
+       self._hb_task = None
+       if task.cancelled():
+           return
+       if task.exception() is not None:
+           self.logger.error("Heartbeat failed: %s", task.exception())
+       if not self.connected:
+           return
+       # Gönderim başarısız olsa da bir sonraki deneme bir interval sonra
+       self.last_message_at = self.clock.time()
+       self._arm_heartbeat()
 
 
 # İç kullanım: contextlib.suppress için yerel, standart import
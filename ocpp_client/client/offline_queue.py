@@ -0,0 +1,101 @@
+"""
+Bağlantı yokken üretilen işlem mesajları için sınırlı kuyruk.
+
+WebSocket düştüğünde (ya da BootNotification henüz Accepted değilken)
+StatusNotification / MeterValues kaybolmasın diye burada tutulur ve
+Accepted sonrası sırayla, hız sınırlı olarak yeniden gönderilir (bkz.
+OCPPClient._replay_offline). Kurallar:
+
+    - Aynı connector için bekleyen StatusNotification yenisiyle değişir;
+      en son durum, en son sırada gönderilir (ara durumlar gereksiz)
+    - Kuyruk doluysa önce en eski MeterValues, o yoksa en eski mesaj düşer
+    - Payload'lar üretildikleri anın zaman damgasını taşır
+
+Client config'inde (opsiyonel):
+
+    "offline_queue": {"max_messages": 1000, "replay_rate": 10}
+
+max_messages=0 kuyruğu kapatır (eski davranış: mesaj düşer).
+"""
+from __future__ import annotations
+
+import itertools
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+# Connector başına yalnızca son hali anlamlı olan mesajlar
+COALESCED_ACTIONS = frozenset({"StatusNotification"})
+
+Entry = Tuple[Hashable, str, dict]
+
+
+class OfflineQueue:
+    def __init__(self, max_messages: int = 1000, replay_rate: float = 10.0) -> None:
+        self.max_messages = max_messages
+        self.replay_rate = replay_rate  # client başına mesaj/sn (0: sınırsız)
+        self._entries: "OrderedDict[Hashable, Tuple[str, dict]]" = OrderedDict()
+        self._seq = itertools.count()
+        # Sayaçlar (bkz. client_metrics.py)
+        self.buffered = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.replayed = 0
+        self.replay_failed = 0
+
+    @classmethod
+    def from_config(cls, config: Optional[dict]) -> "OfflineQueue":
+        config = config or {}
+        return cls(max_messages=int(config.get("max_messages", 1000)),
+                   replay_rate=float(config.get("replay_rate", 10.0)))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _key(self, action: str, payload: dict) -> Hashable:
+        if action in COALESCED_ACTIONS:
+            return (action, payload.get("connectorId"))
+        return (action, next(self._seq))
+
+    def put(self, action: str, payload: dict) -> None:
+        if self.max_messages <= 0:
+            self.dropped += 1
+            return
+        key = self._key(action, payload)
+        if self._entries.pop(key, None) is not None:
+            self.coalesced += 1
+        self._entries[key] = (action, payload)
+        self.buffered += 1
+        self._trim()
+
+    def pop(self) -> Entry:
+        key, (action, payload) = self._entries.popitem(last=False)
+        return key, action, payload
+
+    def push_front(self, entry: Entry) -> None:
+        """Gönderilemeyen mesajı başa geri koy (aynı connector'ın daha yeni durumu geldiyse at)."""
+        key, action, payload = entry
+        if key in self._entries:
+            self.coalesced += 1
+            return
+        self._entries[key] = (action, payload)
+        self._entries.move_to_end(key, last=False)
+        self._trim()
+
+    def _trim(self) -> None:
+        while len(self._entries) > self.max_messages:
+            victim = next((key for key in self._entries if key[0] not in COALESCED_ACTIONS), None)
+            if victim is None:
+                victim = next(iter(self._entries))
+            del self._entries[victim]
+            self.dropped += 1
+
+    def stats(self) -> dict:
+        return {
+            "depth": len(self._entries),
+            "max_messages": self.max_messages,
+            "buffered": self.buffered,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "replayed": self.replayed,
+            "replay_failed": self.replay_failed,
+        }
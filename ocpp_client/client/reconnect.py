@@ -0,0 +1,178 @@
+"""
+Yeniden bağlanma fırtınası kontrolü.
+
+Server yeniden başladığında tüm CP'ler aynı anda düşer; sabit 2→4→8→16→30
+backoff ile hepsi aynı dalgalarda geri gelip TLS handshake ve
+BootNotification yolunu ezer. Buradaki parçalar:
+
+    Backoff          jitter'lı bekleme ("full" varsayılan, "decorrelated")
+    TokenBucket      paylaşılan hız sınırı (izin/sn)
+    ConnectLimiter   süreç içi filo için token bucket (handshake/sn) +
+                     eşzamanlı handshake semaforu
+    ReconnectTracker filo genelinde kesinti → herkes yeniden Accepted
+                     süresi (time-to-full-reconnect)
+
+Client config'inde (opsiyonel):
+
+    "reconnect": {"mode": "full", "base": 1, "cap": 30}
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from typing import Optional
+
+from ocpp_client.client.latency import LatencyHistogram
+
+# Kesinti süreleri saniyeler-dakikalar mertebesinde
+RECOVERY_BUCKETS = (0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+
+class Backoff:
+    """
+    decorrelated: sleep = min(cap, uniform(base, önceki * 3))
+    full        : sleep = uniform(0, min(cap, base * 2^deneme))
+
+    Varsayılan "full", base=1: denemeler dağılır, tepe yükü ConnectLimiter
+    sınırlar; "decorrelated" daha hızlı büyür (daha az deneme, daha geç
+    toparlanma).
+    """
+
+    MODES = ("decorrelated", "full")
+
+    def __init__(self, base: float = 1.0, cap: float = 30.0, mode: str = "full",
+                 rng: Optional[random.Random] = None):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown backoff mode: {mode}")
+        self.base = base
+        self.cap = cap
+        self.mode = mode
+        self._rng = rng or random.Random()
+        self.reset()
+
+    @classmethod
+    def from_config(cls, config: Optional[dict]) -> "Backoff":
+        config = config or {}
+        return cls(base=float(config.get("base", 1.0)), cap=float(config.get("cap", 30.0)),
+                   mode=config.get("mode", "full"))
+
+    def reset(self) -> None:
+        self.attempt = 0
+        self._prev = self.base
+
+    def next(self) -> float:
+        if self.mode == "full":
+            delay = self._rng.uniform(0, min(self.cap, self.base * 2 ** self.attempt))
+        else:
+            delay = min(self.cap, self._rng.uniform(self.base, self._prev * 3))
+            self._prev = delay
+        self.attempt += 1
+        return delay
+
+
+class TokenBucket:
+    """
+    Saniyede en fazla `rate` izin (burst kadar birikebilir); rate <= 0
+    sınırsız. Bekleyenler sırayla geçer. ConnectLimiter handshake'leri,
+    fleet offline kuyruk tekrarını (bkz. offline_queue.py) bununla sınırlar.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.burst = float(burst if burst is not None else max(1, int(rate)))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def take(self) -> None:
+        if self.rate <= 0:
+            return  # sınırsız
+        async with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._tokens = 1.0
+                self._updated = time.monotonic()
+            self._tokens -= 1
+
+
+class ConnectLimiter:
+    """
+    Handshake kapısı: saniyede en fazla `rate` yeni bağlantı (burst kadar
+    birikebilir) ve aynı anda en fazla `concurrency` süren handshake.
+
+        async with limiter:
+            ws = await websockets.connect(...)
+    """
+
+    def __init__(self, rate: float = 200.0, burst: Optional[int] = None, concurrency: int = 100):
+        self.rate = rate
+        self._bucket = TokenBucket(rate, burst)
+        self._sem = asyncio.Semaphore(concurrency)
+        self.concurrency = concurrency
+        # Gözlem
+        self.waiting = 0
+        self.in_flight = 0
+        self.admitted = 0
+
+    async def __aenter__(self) -> "ConnectLimiter":
+        self.waiting += 1
+        try:
+            await self._bucket.take()
+            await self._sem.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        self.admitted += 1
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.in_flight -= 1
+        self._sem.release()
+
+
+class ReconnectTracker:
+    """
+    Kayıtlı client'lardan biri Accepted durumunu kaybedince kesinti başlar;
+    kayıtlı client'ların hepsi yeniden Accepted olunca süre histograma
+    yazılır. İlk açılış (ramp) kesinti sayılmaz.
+    """
+
+    def __init__(self) -> None:
+        self.clients: set = set()
+        self.accepted_clients: set = set()
+        self.outage_started: Optional[float] = None
+        self.recovery = LatencyHistogram(RECOVERY_BUCKETS)
+        self.last_recovery: Optional[float] = None
+        self.outages = 0
+
+    def register(self, client) -> None:
+        self.clients.add(client)
+
+    def unregister(self, client) -> None:
+        self.clients.discard(client)
+        self.accepted_clients.discard(client)
+        self._check_recovered()
+
+    def accepted(self, client) -> None:
+        self.accepted_clients.add(client)
+        self._check_recovered()
+
+    def lost(self, client) -> None:
+        self.accepted_clients.discard(client)
+        if self.outage_started is None and client in self.clients:
+            self.outage_started = time.monotonic()
+            self.outages += 1
+
+    def outage_seconds(self) -> float:
+        """Süren kesintinin yaşı (yoksa 0)."""
+        return time.monotonic() - self.outage_started if self.outage_started is not None else 0.0
+
+    def _check_recovered(self) -> None:
+        if self.outage_started is not None and len(self.accepted_clients) >= len(self.clients):
+            self.last_recovery = time.monotonic() - self.outage_started
+            self.recovery.observe(self.last_recovery)
+            self.outage_started = None
@@ -1,9 +1,11 @@
 import asyncio
 import random
 import logging
-from datetime import datetime
 from enum import Enum
-from ocpp_client.client.config import CLIENT_CONFIG
+
+from ocpp_client.client.clock import get_clock
+from ocpp_client.client.event_scheduler import shared_scheduler
+from ocpp_client.client.meter_sampler import sample_interval, shared_sampler
 
 class ChargePointStatus(Enum):
     AVAILABLE = "Available"
@@ -21,96 +23,205 @@ class ConnectorState:
         self.connector_id = connector_id
         self.status = ChargePointStatus.AVAILABLE
         self.session_active = False
-        self.last_status_change = datetime.now()
+        self.last_status_change = get_clock().now()
+        self.event = None   # zamanlayıcıdaki sıradaki olay (varsa)
+        self.busy = False   # StatusNotification gönderimi sürüyor
+        # MeterValues (bkz. meter_sampler.py)
+        self.meter_row = None     # örnekleyicideki satır (şarj ederken)
+        self.meter_busy = False   # MeterValues cevap bekliyor
+        self.meter_wh = 0.0       # Energy.Active.Import.Register
+        self.ev_soc = None        # bağlı aracın SoC'u; oturum yoksa None
+        self.ev_capacity_wh = 0.0
+        self.ev_max_power_w = 0.0
+        self.version = 0          # son değiştiği simülatör sürümü (bkz. mark_changed)
 
 class StatusSimulator:
+    """
+    Otomatik modda connector geçişleri paylaşılan EventScheduler'da olay
+    olarak tutulur (bkz. event_scheduler.py): connector başına uyuyan
+    coroutine yoktur, yalnızca durum değişince kısa ömürlü bir gönderim
+    task'ı açılır. Manuel modda hiç olay kurulmaz.
+    """
+
     def __init__(self, client):
         self.client = client
         self.connectors = {}
         self.logger = logging.getLogger("StatusSimulator")
         self.running = False
-        self.manual_mode = True  # Default to manual mode
+        self._manual_mode = True  # Default to manual mode
+        self._scheduler = None
+        self._tasks = set()
+        self._meter = None
+        # Görünür durum (connector status/session, manual_mode) her değiştiğinde
+        # artar; control panel API'si snapshot önbelleği ve delta için kullanır
+        self.version = 0
         
-        for i in range(1, CLIENT_CONFIG["connector_count"] + 1):
+        for i in range(1, client.config["connector_count"] + 1):
             self.connectors[i] = ConnectorState(i)
+
+    @property
+    def manual_mode(self) -> bool:
+        return self._manual_mode
+
+    @manual_mode.setter
+    def manual_mode(self, value: bool) -> None:
+        value = bool(value)
+        if value == self._manual_mode:
+            return
+        self._manual_mode = value
+        self.mark_changed()
+        if not self.running:
+            return
+        for connector in self.connectors.values():
+            if value:
+                # Yarım kalan oturum adımı (ör. Preparing → Charging) tamamlansın
+                if connector.event is not None and connector.event.callback == self._on_tick:
+                    connector.event.cancel()
+                    connector.event = None
+            elif connector.event is None and not connector.busy:
+                self._schedule_tick(connector)
             
     async def start(self):
         self.running = True
+        self._scheduler = shared_scheduler()
+        self._meter = shared_sampler(sample_interval(self.client.config))
         
-        await asyncio.sleep(2)
+        await get_clock().sleep(2)
         for connector in self.connectors.values():
             await self.client.send_status_notification(
                 connector.connector_id, 
                 connector.status.value
             )
-            
-        tasks = []
-        for connector_id in self.connectors.keys():
-            task = asyncio.create_task(self.simulate_connector(connector_id))
-            tasks.append(task)
-            
-        await asyncio.gather(*tasks, return_exceptions=True)
-        
-    async def simulate_connector(self, connector_id: int):
-        connector = self.connectors[connector_id]
-        
-        while self.running:
-            try:
-                if not self.manual_mode:
-                    await self.process_connector_state(connector)
-                await asyncio.sleep(random.randint(10, 20))
-                
-            except Exception as e:
-                self.logger.error(f"Connector {connector_id} simulation error: {e}")
-                await asyncio.sleep(5)
-                
-    async def process_connector_state(self, connector: ConnectorState):
-        config = CLIENT_CONFIG["simulation"]
+
+        if not self._manual_mode:
+            for connector in self.connectors.values():
+                if connector.event is None:
+                    self._schedule_tick(connector)
+        try:
+            await asyncio.Future()  # stop: task iptal edilir
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        self.running = False
+        for connector in self.connectors.values():
+            if self._meter is not None:
+                self._meter.remove(connector)
+            if connector.event is not None:
+                connector.event.cancel()
+                connector.event = None
+        for task in list(self._tasks):
+            task.cancel()
+
+    # --- Zamanlama ---
+
+    def _schedule(self, connector: ConnectorState, delay: float, callback, *args) -> None:
+        connector.event = self._scheduler.call_later(delay, callback, connector, *args)
+
+    def _schedule_tick(self, connector: ConnectorState) -> None:
+        if self.running and not self._manual_mode:
+            self._schedule(connector, random.randint(10, 20), self._on_tick)
+
+    def _on_tick(self, connector: ConnectorState) -> None:
+        connector.event = None
+        if not self.running or self._manual_mode:
+            return
+        steps = self.pick_transition(connector)
+        if steps:
+            self._spawn(self._run_steps(connector, steps))
+        else:
+            self._schedule_tick(connector)
+
+    def _on_step(self, connector: ConnectorState, steps: list) -> None:
+        connector.event = None
+        if self.running:
+            self._spawn(self._run_steps(connector, steps))
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_steps(self, connector: ConnectorState, steps: list) -> None:
+        """
+        steps: [(durum, sonraki adıma kadar bekleme sn), ...]. İlk adım hemen
+        gönderilir, kalanlar zamanlayıcıya olay olarak yazılır.
+        """
+        status, delay = steps[0]
+        connector.busy = True
+        try:
+            await self.change_status(connector, status)
+            if status == ChargePointStatus.CHARGING:
+                connector.session_active = True
+                self.mark_changed(connector)
+            elif status == ChargePointStatus.AVAILABLE:
+                connector.session_active = False
+                self.mark_changed(connector)
+        except Exception as e:
+            self.logger.error(f"Connector {connector.connector_id} simulation error: {e}")
+        finally:
+            connector.busy = False
+        if len(steps) > 1:
+            self._schedule(connector, delay, self._on_step, steps[1:])
+        else:
+            self._schedule_tick(connector)
+
+    def pick_transition(self, connector: ConnectorState) -> list:
+        """
+        Olasılıklara göre sıradaki geçişi seç (gönderim yapmaz).
+        Dönüş: adım listesi; değişiklik yoksa boş liste.
+        """
+        config = self.client.config["simulation"]
         
         if random.random() < config["status_change_probability"]:
             if connector.status == ChargePointStatus.AVAILABLE:
-                await self.start_charging_session(connector)
+                return self.charging_session_steps()
             elif connector.status == ChargePointStatus.CHARGING:
                 if random.random() < 0.2:
-                    await self.suspend_charging(connector)
+                    return self.suspend_steps()
                 elif random.random() < 0.3:
-                    await self.finish_charging(connector)
+                    return self.finish_steps()
             elif connector.status in [ChargePointStatus.SUSPENDED_EV, ChargePointStatus.SUSPENDED_EVSE]:
                 if random.random() < 0.6:
-                    await self.resume_charging(connector)
+                    return [(ChargePointStatus.CHARGING, 0)]
                 else:
-                    await self.finish_charging(connector)
+                    return self.finish_steps()
             elif connector.status == ChargePointStatus.FINISHING:
-                await self.make_available(connector)
+                return [(ChargePointStatus.AVAILABLE, 0)]
+        return []
                 
-    async def start_charging_session(self, connector: ConnectorState):
-        await self.change_status(connector, ChargePointStatus.PREPARING)
-        await asyncio.sleep(random.randint(3, 8))
-        await self.change_status(connector, ChargePointStatus.CHARGING)
-        connector.session_active = True
-        
-    async def suspend_charging(self, connector: ConnectorState):
-        status = random.choice([ChargePointStatus.SUSPENDED_EV, ChargePointStatus.SUSPENDED_EVSE])
-        await self.change_status(connector, status)
+    def charging_session_steps(self) -> list:
+        return [(ChargePointStatus.PREPARING, random.randint(3, 8)), (ChargePointStatus.CHARGING, 0)]
         
-    async def resume_charging(self, connector: ConnectorState):
-        await self.change_status(connector, ChargePointStatus.CHARGING)
+    def suspend_steps(self) -> list:
+        return [(random.choice([ChargePointStatus.SUSPENDED_EV, ChargePointStatus.SUSPENDED_EVSE]), 0)]
         
-    async def finish_charging(self, connector: ConnectorState):
-        await self.change_status(connector, ChargePointStatus.FINISHING)
-        await asyncio.sleep(random.randint(2, 5))
-        await self.make_available(connector)
-        
-    async def make_available(self, connector: ConnectorState):
-        await self.change_status(connector, ChargePointStatus.AVAILABLE)
-        connector.session_active = False
+    def finish_steps(self) -> list:
+        return [(ChargePointStatus.FINISHING, random.randint(2, 5)), (ChargePointStatus.AVAILABLE, 0)]
         
     async def change_status(self, connector: ConnectorState, new_status: ChargePointStatus):
         if connector.status != new_status:
             connector.status = new_status
-            connector.last_status_change = datetime.now()
+            connector.last_status_change = get_clock().now()
+            self.mark_changed(connector)
+            self._update_meter(connector)
             
             await self.client.send_status_notification(
                 connector.connector_id,
                 new_status.value
             )
+
+    def mark_changed(self, connector: ConnectorState = None) -> None:
+        self.version += 1
+        if connector is not None:
+            connector.version = self.version
+
+    def _update_meter(self, connector: ConnectorState) -> None:
+        if self._meter is None:
+            return
+        if connector.status == ChargePointStatus.CHARGING:
+            self._meter.add(self.client, connector)
+            return
+        self._meter.remove(connector)
+        if connector.status not in (ChargePointStatus.SUSPENDED_EV, ChargePointStatus.SUSPENDED_EVSE):
+            connector.ev_soc = None  # araç ayrıldı; sonraki oturum yeni araçla
@@ -0,0 +1,234 @@
+"""
+Süreç içindeki tüm client'ların paylaştığı hiyerarşik zamanlayıcı çarkı.
+
+Fleet modunda binlerce client'ın her biri kendi heartbeat coroutine'ini
+uyutursa event loop'un timer heap'inde binlerce kayıt ve uyanma olur.
+Burada tüm zamanlayıcılar tek bir çarkta tutulur ve loop'ta en fazla tek
+bir call_at kaydı bulunur:
+
+    seviye 0: 256 yuva × tick          (tick=0.1 sn → 25.6 sn)
+    seviye 1:  64 yuva × 256 tick      (~27 dk)
+    seviye 2:  64 yuva × 16384 tick    (~29 saat)
+    seviye 3:  64 yuva × 1048576 tick  (daha uzaklar sona kıstırılır)
+
+Ekleme ve iptal O(1). Her tick'te yalnızca o tick'in yuvası toplu olarak
+boşaltılır; seviye 0 dönünce üst seviyenin ilgili yuvası aşağı dağıtılır
+(Linux'un klasik timer wheel'i gibi). Seviye 0 boşken bir sonraki
+basamaklama anına kadar uyanılmaz.
+
+Zamanlayıcılar hiçbir zaman erken, en fazla bir tick geç çalışır. Süre
+simülasyon saatinden okunur (bkz. clock.py; varsayılan monotonik gerçek
+zaman, wall-clock değişimlerinden etkilenmez).
+
+    wheel = shared_wheel()
+    handle = wheel.call_at(wheel.clock.time() + 60, on_due, client)
+    handle.cancel()
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import sys
+import weakref
+from typing import Callable, List, Optional
+
+from ocpp_client.client.clock import Clock, get_clock
+
+LEVEL_BITS = (8, 6, 6, 6)
+DEFAULT_TICK = 0.1
+
+
+class TimerHandle:
+    __slots__ = ("deadline", "expires", "callback", "args", "slot", "level", "cancelled", "_wheel")
+
+    def __init__(self, wheel: "TimerWheel", deadline: float, expires: int, callback: Callable, args: tuple):
+        self._wheel = wheel
+        self.deadline = deadline
+        self.expires = expires
+        self.callback = callback
+        self.args = args
+        self.slot: Optional[dict] = None
+        self.level = 0
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        if self.cancelled:
+            return
+        self.cancelled = True
+        wheel = self._wheel
+        if self.slot is not None:
+            del self.slot[self]
+            wheel._level_counts[self.level] -= 1
+            self.slot = None
+        wheel._count -= 1
+
+
+class TimerWheel:
+    def __init__(self, tick: float = DEFAULT_TICK, clock: Optional[Clock] = None,
+                 loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.tick = tick
+        self.clock = clock or get_clock()
+        self._loop = loop
+        self._origin = self.clock.time()
+        self._current = 0  # sıradaki işlenecek tick
+        self._wheels: List[List[dict]] = [[{} for _ in range(1 << bits)] for bits in LEVEL_BITS]
+        self._masks = [(1 << bits) - 1 for bits in LEVEL_BITS]
+        self._shifts = []
+        self._limits = []  # seviyenin kapsadığı en uzak delta (hariç)
+        shift = 0
+        for bits in LEVEL_BITS:
+            self._shifts.append(shift)
+            shift += bits
+            self._limits.append(1 << shift)
+        self._span = 1 << shift  # çarkın kapsadığı en uzak tick
+        self._level_counts = [0] * len(LEVEL_BITS)
+        self._count = 0
+        self._handle = None  # saatin call_at handle'ı
+        self._wake_tick: Optional[int] = None
+        self._running = False
+        # Gözlem sayaçları (benchmark / metrik için)
+        self.wakeups = 0
+        self.fired = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _tick_of(self, when: float) -> int:
+        return max(math.ceil((when - self._origin) / self.tick), self._current)
+
+    # --- Zamanlama ---
+
+    def call_at(self, deadline: float, callback: Callable, *args) -> TimerHandle:
+        """deadline: self.clock.time() cinsinden mutlak zaman."""
+        timer = TimerHandle(self, deadline, self._tick_of(deadline), callback, args)
+        self._insert(timer)
+        self._count += 1
+        # _run içindeki eklemeler için uyanma _run sonunda bir kez kurulur
+        if not self._running and (self._wake_tick is None or timer.expires < self._wake_tick):
+            self._schedule_wake(timer.expires)
+        return timer
+
+    def call_later(self, delay: float, callback: Callable, *args) -> TimerHandle:
+        return self.call_at(self.clock.time() + delay, callback, *args)
+
+    def _insert(self, timer: TimerHandle) -> None:
+        expires = timer.expires
+        delta = expires - self._current
+        if delta >= self._span:
+            # Çarkın ötesi: son seviyenin en uzak yuvasına koy; orada yeniden eklenir
+            expires = self._current + self._span - 1
+            delta = self._span - 1
+        level = 0
+        while delta >= self._limits[level]:
+            level += 1
+        slot = self._wheels[level][(expires >> self._shifts[level]) & self._masks[level]]
+        slot[timer] = None
+        timer.slot = slot
+        timer.level = level
+        self._level_counts[level] += 1
+
+    # --- Tick işleme ---
+
+    def _cascade(self, level: int) -> int:
+        index = (self._current >> self._shifts[level]) & self._masks[level]
+        slot = self._wheels[level][index]
+        if slot:
+            self._wheels[level][index] = {}
+            self._level_counts[level] -= len(slot)
+            for timer in slot:
+                self._insert(timer)
+        return index
+
+    def _advance(self, until_tick: int) -> List[TimerHandle]:
+        expired: List[TimerHandle] = []
+        wheel0 = self._wheels[0]
+        mask0 = self._masks[0]
+        while self._current <= until_tick:
+            index = self._current & mask0
+            if index == 0:
+                level = 1
+                while level < len(LEVEL_BITS) and self._cascade(level) == 0:
+                    level += 1
+            if not self._level_counts[0]:
+                # Seviye 0 boş: bir sonraki basamaklama anına atla
+                self._current = min((self._current | mask0) + 1, until_tick + 1)
+                continue
+            slot = wheel0[index]
+            self._current += 1
+            if slot:
+                wheel0[index] = {}
+                self._level_counts[0] -= len(slot)
+                for timer in slot:
+                    timer.slot = None
+                expired.extend(slot)
+        return expired
+
+    def _next_wake_tick(self) -> int:
+        mask0 = self._masks[0]
+        boundary = (self._current + mask0) & ~mask0  # henüz işlenmemiş ilk basamaklama tick'i
+        if self._level_counts[0]:
+            wheel0 = self._wheels[0]
+            for tick in range(self._current, boundary):
+                if wheel0[tick & mask0]:
+                    return tick
+        return boundary  # basamaklama noktası
+
+    def _run(self) -> None:
+        wake_tick = self._wake_tick
+        self._handle = None
+        self._wake_tick = None
+        self.wakeups += 1
+        self._running = True
+        try:
+            now_tick = int((self.clock.time() - self._origin) / self.tick)
+            if wake_tick is not None:
+                # origin + k*tick anında uyandık; bölmedeki yuvarlama k-1 verebilir
+                # (MaxSpeedClock'ta zaman bu ana sabitlenir, k hiç işlenmez)
+                now_tick = max(now_tick, wake_tick)
+            expired = self._advance(now_tick)
+            for timer in expired:
+                if timer.cancelled:
+                    continue
+                if (timer.deadline > self.clock.time() + 1e-9
+                        and math.ceil((timer.deadline - self._origin) / self.tick) > now_tick):
+                    # Çarkın ötesinden gelen, henüz vakti dolmamış kayıt
+                    timer.expires = self._tick_of(timer.deadline)
+                    self._insert(timer)
+                    continue
+                self._count -= 1
+                timer.cancelled = True
+                self.fired += 1
+                try:
+                    timer.callback(*timer.args)
+                except Exception:
+                    (self._loop or asyncio.get_running_loop()).call_exception_handler({
+                        "message": "TimerWheel callback failed", "exception": sys.exc_info()[1],
+                    })
+        finally:
+            self._running = False
+        if self._count:
+            self._schedule_wake(self._next_wake_tick())
+
+    def _schedule_wake(self, tick: int) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+        self._wake_tick = tick
+        self._handle = self.clock.call_at(self._origin + tick * self.tick, self._run)
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        self._wake_tick = None
+
+
+_wheels: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, TimerWheel]" = weakref.WeakKeyDictionary()
+
+
+def shared_wheel() -> TimerWheel:
+    """Çalışan event loop'a ait paylaşılan çark (yoksa oluşturulur)."""
+    loop = asyncio.get_running_loop()
+    wheel = _wheels.get(loop)
+    if wheel is None:
+        wheel = _wheels[loop] = TimerWheel(loop=loop)
+    return wheel
@@ -0,0 +1,85 @@
+"""
+Süreç geneli client TLS context'i ve oturum devamı (session resumption).
+
+Eskiden her bağlantı denemesi ssl._create_unverified_context() ile yeni bir
+context kurup tam TLS handshake yapıyordu. Burada:
+
+    client_ssl_context()  tek, önbellekli (doğrulamasız) context
+    remember_session(ws)  handshake sonrası oturumu/bileti host'a göre saklar;
+                          aynı host'a giden sonraki bağlantı (yeniden
+                          bağlanma ya da filodaki başka bir CP) onu sunar
+
+asyncio handshake'i SSLContext.wrap_bio() ile başlatır ve session
+parametresi geçmez; _ResumingContext.wrap_bio saklı oturumu ekler.
+
+OCPP_TLS_RESUME=0 ile oturum devamı kapatılır (context yine paylaşılır).
+"""
+from __future__ import annotations
+
+import os
+import ssl
+from typing import Dict, Optional
+
+
+class _ResumingContext(ssl.SSLContext):
+    """wrap_bio'da server_hostname için saklanan oturumu sunar."""
+
+    def wrap_bio(self, incoming, outgoing, server_side=False, server_hostname=None, session=None):
+        if session is None and not server_side and _resume_enabled:
+            session = _sessions.get(server_hostname)
+        return super().wrap_bio(incoming, outgoing, server_side=server_side,
+                                server_hostname=server_hostname, session=session)
+
+
+_context: Optional[_ResumingContext] = None
+_sessions: Dict[Optional[str], ssl.SSLSession] = {}
+_resume_enabled = os.environ.get("OCPP_TLS_RESUME", "1") != "0"
+
+
+class _Stats:
+    handshakes = 0  # tamamlanan TLS handshake'leri
+    resumed = 0     # bunlardan oturum devamı ile kısalanlar
+
+
+stats = _Stats()
+
+
+def client_ssl_context() -> ssl.SSLContext:
+    """
+    Self-signed sertifikalar için doğrulanmamış context (lokalde pratik);
+    süreç başına bir kez kurulur.
+    """
+    global _context
+    if _context is None:
+        ctx = _ResumingContext(ssl.PROTOCOL_TLS_CLIENT)
+        ctx.check_hostname = False
+        ctx.verify_mode = ssl.CERT_NONE
+        _context = ctx
+    return _context
+
+
+def set_resumption(enabled: bool) -> None:
+    """Oturum devamını aç/kapat (benchmark karşılaştırması için); saklı oturumlar silinir."""
+    global _resume_enabled
+    _resume_enabled = enabled
+    _sessions.clear()
+
+
+def remember_session(websocket) -> None:
+    """
+    websockets.connect() dönünce çağrılır. TLS 1.3 biletleri server
+    Finished'ından hemen sonra gelir; HTTP upgrade cevabı okunduğunda
+    oturum bileti çoktan işlenmiştir.
+    """
+    transport = getattr(websocket, "transport", None)
+    ssl_object = transport.get_extra_info("ssl_object") if transport is not None else None
+    if ssl_object is None:
+        return  # ws://
+    stats.handshakes += 1
+    if ssl_object.session_reused:
+        stats.resumed += 1
+    if not _resume_enabled:
+        return
+    session = ssl_object.session
+    if session is not None and (session.has_ticket or ssl_object.version() != "TLSv1.3"):
+        _sessions[ssl_object.server_hostname] = session
@@ -0,0 +1,77 @@
+"""
+OCPP-J çerçeveleri için ortak JSON codec'i.
+
+orjson kuruluysa onu, değilse stdlib json'u kullanır; OCPP_JSON_CODEC
+ortam değişkeni ile ("orjson" / "json") seçim zorlanabilir.
+
+    loads(data)       -> str, bytes, bytearray veya memoryview kabul eder
+    dumps(obj)        -> bytes (soket / HTTP gövdesi / NDJSON satırı)
+    dumps_text(obj)   -> str   (websocket text frame; OCPP-J text frame ister)
+
+Çıktı kompakttır (boşluksuz) ve ASCII'ye kaçışlanmaz.
+"""
+import json
+import os
+
+try:
+    import orjson
+except ImportError:  # opsiyonel bağımlılık
+    orjson = None
+
+
+class JsonCodec:
+    name = "json"
+    DecodeError = json.JSONDecodeError
+
+    def __init__(self):
+        encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+        decoder = json.JSONDecoder()
+        self.dumps_text = encoder.encode
+        self._decode = decoder.decode
+
+    def loads(self, data):
+        if not isinstance(data, str):
+            data = bytes(data).decode("utf-8")
+        return self._decode(data)
+
+    def dumps(self, obj) -> bytes:
+        return self.dumps_text(obj).encode("utf-8")
+
+
+class OrjsonCodec:
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("orjson is not installed")
+        self.DecodeError = orjson.JSONDecodeError  # ValueError alt sınıfı
+        self.loads = orjson.loads
+        self.dumps = orjson.dumps
+
+    def dumps_text(self, obj) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+
+
+BACKENDS = {"json": JsonCodec, "orjson": OrjsonCodec}
+
+
+def get_codec(name: str = None):
+    """
+    İsimle codec oluştur; isim verilmezse orjson varsa o, yoksa stdlib.
+    """
+    if not name:
+        name = "orjson" if orjson is not None else "json"
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown JSON codec: {name}") from None
+
+
+codec = get_codec(os.environ.get("OCPP_JSON_CODEC"))
+
+# Sıcak yolda attribute araması olmasın diye modül seviyesinde bağlı fonksiyonlar
+loads = codec.loads
+dumps = codec.dumps
+dumps_text = codec.dumps_text
+DecodeError = codec.DecodeError
+BACKEND = codec.name
@@ -0,0 +1,223 @@
+"""
+OCPP sıcak yolu için event loop'u bloklamayan log hattı.
+
+    event loop ──LogRecord──> ActionSampler ──> LazyQueueHandler ──queue──>
+        QueueListener (thread) ──> Formatter (text / NDJSON) ──> stream / dosya
+
+- Kayıtlar loop içinde formatlanmaz; mesaj birleştirme ve I/O listener
+  thread'inde yapılır. Bu yüzden çağıranlar %-stil argüman geçmeli
+  (logger.info("x %s", y)), f-string değil.
+- Sıcak yol kayıtları extra={"ocpp_action": action, "cp_id": cp_id} taşır;
+  ActionSampler bunlara action bazlı örnekleme ve saniyelik limit uygular.
+  WARNING ve üstü hiçbir zaman örneklenmez.
+- Kuyruk sınırlıdır; doluysa kayıt düşürülür ve sayılır (loop beklemez).
+
+Ortam değişkenleri (setup_logging varsayılanları):
+    LOG_LEVEL        INFO
+    LOG_FORMAT       text | json (NDJSON)
+    LOG_FILE         boşsa stderr
+    LOG_ASYNC        1 (0: klasik senkron handler)
+    LOG_QUEUE_SIZE   10000
+    LOG_SAMPLE       örn: "Heartbeat=0.01,StatusNotification=0.1,*=1"
+    LOG_RATE_LIMIT   örn: "Heartbeat=5,*=100" (action başına kayıt/sn, 0: sınırsız)
+    LOG_CALLER       0 (1: dosya/satır/thread/süreç bilgisi toplanır; kayıt başına pahalı)
+"""
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import time
+from typing import Dict, Optional
+
+from ocpp_common import codec
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# LogRecord'un standart alanları; geri kalanlar extra olarak NDJSON'a yazılır
+_RECORD_FIELDS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+def parse_action_map(spec: Optional[str], cast=float) -> Dict[str, float]:
+    """'Heartbeat=0.01,*=1' -> {"Heartbeat": 0.01, "*": 1.0}"""
+    result = {}
+    for part in (spec or "").split(","):
+        if "=" in part:
+            key, value = part.split("=", 1)
+            result[key.strip()] = cast(value.strip())
+    return result
+
+
+class ActionSampler(logging.Filter):
+    """
+    ocpp_action taşıyan INFO/DEBUG kayıtlarını action bazında örnekler:
+    - sample: 0.01 → her 100 kayıttan 1'i (deterministik sayaç, random yok)
+    - rate_limit: saniyede en fazla N kayıt (1 sn'lik pencere)
+    """
+
+    def __init__(self, sample: Dict[str, float] = None, rate_limit: Dict[str, float] = None):
+        super().__init__()
+        self.sample = dict(sample or {})
+        self.rate_limit = dict(rate_limit or {})
+        self.suppressed: Dict[str, int] = {}
+        self._seen: Dict[str, int] = {}
+        self._window: Dict[str, list] = {}  # action -> [pencere başı, sayaç]
+
+    def _setting(self, table: Dict[str, float], action: str, default: float) -> float:
+        value = table.get(action)
+        return table.get("*", default) if value is None else value
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        action = getattr(record, "ocpp_action", None)
+        if action is None or record.levelno >= logging.WARNING:
+            return True
+
+        rate = self._setting(self.sample, action, 1.0)
+        if rate < 1.0:
+            seen = self._seen.get(action, 0)
+            self._seen[action] = seen + 1
+            if rate <= 0 or seen % max(1, round(1 / rate)):
+                return self._suppress(action)
+
+        limit = self._setting(self.rate_limit, action, 0)
+        if limit > 0:
+            now = time.monotonic()
+            window = self._window.get(action)
+            if window is None or now - window[0] >= 1.0:
+                window = self._window[action] = [now, 0]
+            if window[1] >= limit:
+                return self._suppress(action)
+            window[1] += 1
+        return True
+
+    def _suppress(self, action: str) -> bool:
+        self.suppressed[action] = self.suppressed.get(action, 0) + 1
+        return False
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler.prepare() kaydı loop içinde formatlar; burada atlanır ve
+    kayıt olduğu gibi kuyruğa konur. Formatlama listener thread'inde olur.
+    """
+
+    def __init__(self, queue_):
+        super().__init__(queue_)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class NDJSONFormatter(logging.Formatter):
+    """Satır başına bir JSON nesnesi: ts, level, logger, msg (+ extra alanlar)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return codec.dumps_text(entry)
+
+
+class LogPipeline:
+    def __init__(self, listener: Optional[logging.handlers.QueueListener],
+                 handler: logging.Handler, sampler: ActionSampler):
+        self.listener = listener
+        self.handler = handler
+        self.sampler = sampler
+
+    def stats(self) -> dict:
+        return {
+            "async": self.listener is not None,
+            "queue_depth": self.handler.queue.qsize() if self.listener is not None else 0,
+            "dropped": getattr(self.handler, "dropped", 0),
+            "suppressed": dict(self.sampler.suppressed),
+        }
+
+    def stop(self) -> None:
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+
+_pipeline: Optional[LogPipeline] = None
+
+
+def get_pipeline() -> Optional[LogPipeline]:
+    return _pipeline
+
+
+def setup_logging(level: str = None, fmt: str = None, log_file: str = None,
+                  use_queue: bool = None, queue_size: int = None,
+                  sample: str = None, rate_limit: str = None,
+                  text_format: str = TEXT_FORMAT, caller_info: bool = None) -> LogPipeline:
+    """
+    Root logger'ı hat ile yapılandır (önceki handler'lar kaldırılır).
+    Fork edilmiş çocuk süreçte yeniden çağrılmalı: listener thread'i fork'ta kopyalanmaz.
+    Parametre verilmezse ilgili ortam değişkeni kullanılır.
+    """
+    global _pipeline
+    env = os.environ.get
+    level = (level or env("LOG_LEVEL", "INFO")).upper()
+    fmt = fmt or env("LOG_FORMAT", "text")
+    log_file = log_file if log_file is not None else env("LOG_FILE", "")
+    if use_queue is None:
+        use_queue = env("LOG_ASYNC", "1") != "0"
+    queue_size = queue_size or int(env("LOG_QUEUE_SIZE", "10000"))
+    if caller_info is None:
+        caller_info = env("LOG_CALLER", "0") == "1"
+
+    # logging HOWTO "Optimization": kullanılmayan kayıt alanlarını toplama
+    # (findCaller her kayıtta stack yürür)
+    if not caller_info:
+        logging._srcfile = None
+        logging.logThreads = logging.logProcesses = logging.logMultiprocessing = False
+
+    if _pipeline is not None:
+        _pipeline.stop()
+
+    sink = logging.FileHandler(log_file, encoding="utf-8") if log_file else logging.StreamHandler()
+    sink.setFormatter(NDJSONFormatter() if fmt == "json" else logging.Formatter(text_format))
+    sampler = ActionSampler(
+        parse_action_map(sample if sample is not None else env("LOG_SAMPLE")),
+        parse_action_map(rate_limit if rate_limit is not None else env("LOG_RATE_LIMIT")),
+    )
+
+    listener = None
+    if use_queue:
+        handler = LazyQueueHandler(queue.Queue(queue_size))
+        listener = logging.handlers.QueueListener(handler.queue, sink, respect_handler_level=True)
+        listener.start()
+    else:
+        handler = sink
+    handler.addFilter(sampler)
+
+    root = logging.getLogger()
+    for old in root.handlers[:]:
+        root.removeHandler(old)
+    root.addHandler(handler)
+    root.setLevel(getattr(logging, level, logging.INFO))
+
+    _pipeline = LogPipeline(listener, handler, sampler)
+    return _pipeline
+
+
+@atexit.register
+def _flush_on_exit() -> None:
+    # Kuyrukta kalan kayıtlar yazılsın
+    if _pipeline is not None:
+        _pipeline.stop()
@@ -0,0 +1,260 @@
+"""
+Bağımlılıksız, kilitsiz Prometheus metrikleri (text exposition format 0.0.4).
+
+    FRAMES = Counter("ocpp_frames_received_total", "Received CALL frames", ["action"])
+    FRAMES.labels("Heartbeat").inc()
+    QUEUE = Gauge("ocpp_rest_queue_depth", "REST forward queue depth")
+    QUEUE.set_function(lambda: forwarder.queue_depth)   # scrape anında okunur
+    text = REGISTRY.render()
+
+Güncellemeler düz attribute artırımıdır; kilit yoktur. Event loop içinde
+(tek thread) kesindir. Thread havuzundan güncellenen sayaçlarda GIL
+altında nadiren bir artış kaybolabilir; metrik için kabul edilebilir.
+Sıcak yolda labels() çağrısı tek dict araması yapar; etiket değerleri str
+olmalıdır (dönüştürme yapılmaz).
+
+Dağınık sayaçları (ör. client başına int alanlar) scrape anında okumak
+için register_collector() ile MetricFamily listesi döndüren bir fonksiyon
+kaydedilebilir.
+"""
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+INF = float("inf")
+
+
+class Sample(NamedTuple):
+    suffix: str
+    labels: Dict[str, str]
+    value: float
+
+
+class MetricFamily(NamedTuple):
+    name: str
+    type: str
+    documentation: str
+    samples: List[Sample]
+
+
+def histogram_samples(buckets: Sequence[float], counts: Sequence[int], total: float,
+                      count: int, labels: Optional[Dict[str, str]] = None) -> List[Sample]:
+    """
+    Kova başına (kümülatif olmayan) sayaçlardan Prometheus histogram örnekleri.
+    counts'un son elemanı +Inf kovasıdır (latency.LatencyHistogram ile aynı düzen).
+    """
+    labels = labels or {}
+    samples = []
+    cumulative = 0
+    for upper, n in zip(buckets, counts):
+        cumulative += n
+        samples.append(Sample("_bucket", {**labels, "le": _format_value(upper)}, cumulative))
+    samples.append(Sample("_bucket", {**labels, "le": "+Inf"}, count))
+    samples.append(Sample("_sum", labels, total))
+    samples.append(Sample("_count", labels, count))
+    return samples
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 registry: Optional["Registry"] = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[tuple, object] = {}
+        self._function: Optional[Callable[[], float]] = None
+        if not self.labelnames:
+            self._default = self._children[()] = self._new_child()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._children[values] = self._new_child()
+        return child
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Değer scrape anında function() ile okunur (etiketsiz metrikler)."""
+        self._function = function
+
+    def _child_samples(self, labels: Dict[str, str], child) -> List[Sample]:
+        return [Sample("", labels, child.value)]
+
+    def collect(self) -> MetricFamily:
+        if self._function is not None:
+            samples = [Sample("", {}, self._function())]
+        else:
+            samples = []
+            for values, child in list(self._children.items()):
+                samples.extend(self._child_samples(dict(zip(self.labelnames, values)), child))
+        return MetricFamily(self.name, self.type, self.documentation, samples)
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.value += amount
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float) -> None:
+        self._default.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default.value -= amount
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, registry: Optional["Registry"] = None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default.observe(value)
+
+    def _child_samples(self, labels: Dict[str, str], child) -> List[Sample]:
+        return histogram_samples(child.buckets, child.counts, child.sum, child.count, labels)
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[MetricFamily]]] = []
+
+    def register(self, metric: _Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Duplicate metric: {metric.name}")
+        self._metrics[metric.name] = metric
+
+    def register_collector(self, collector: Callable[[], Iterable[MetricFamily]]) -> None:
+        self._collectors.append(collector)
+
+    def unregister_collector(self, collector: Callable[[], Iterable[MetricFamily]]) -> None:
+        if collector in self._collectors:
+            self._collectors.remove(collector)
+
+    def collect(self) -> List[MetricFamily]:
+        families = [metric.collect() for metric in self._metrics.values()]
+        for collector in self._collectors:
+            families.extend(collector())
+        return families
+
+    def render(self) -> str:
+        return render(self.collect())
+
+
+REGISTRY = Registry()
+
+
+def _format_value(value: float) -> str:
+    if value == INF:
+        return "+Inf"
+    if value == -INF:
+        return "-Inf"
+    if value != value:
+        return "NaN"
+    if float(value).is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def merge_families(groups: Dict[str, List[MetricFamily]], label: str) -> List[MetricFamily]:
+    """
+    Birden çok kaynağın (ör. cluster worker'ları) ailelerini isim bazında birleştir;
+    her örneğe kaynağı gösteren bir etiket eklenir.
+    """
+    merged: Dict[str, MetricFamily] = {}
+    for source, families in groups.items():
+        for family in families:
+            name, kind, documentation, samples = family
+            target = merged.get(name)
+            if target is None:
+                target = merged[name] = MetricFamily(name, kind, documentation, [])
+            for suffix, labels, value in samples:
+                target.samples.append(Sample(suffix, {label: source, **labels}, value))
+    return list(merged.values())
+
+
+def render(families: Iterable[MetricFamily]) -> str:
+    lines = []
+    for name, kind, documentation, samples in families:
+        lines.append(f"# HELP {name} {_escape(documentation)}")
+        lines.append(f"# TYPE {name} {kind}")
+        for suffix, labels, value in samples:
+            if labels:
+                label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+                lines.append(f"{name}{suffix}{{{label_text}}} {_format_value(value)}")
+            else:
+                lines.append(f"{name}{suffix} {_format_value(value)}")
+    lines.append("")
+    return "\n".join(lines)
@@ -0,0 +1,153 @@
+"""
+Charge point yetkilendirme deposu.
+
+İzinli CP'ler bir metin dosyasından (AUTH_FILE, varsayılan
+server/authorized_cp_ids.txt) yüklenir; satır başına bir kural:
+
+    VESTEL-EVC-001      # birebir id
+    CP-IZMIR-*          # önek (yalnızca sonda tek '*')
+    LOAD-?????          # glob (fnmatch: * ? [...])
+    *                   # herkese izin
+
+Birebir id'ler hash set'te, önekler uzunluğa göre gruplanmış set'lerde
+tutulur; sorgu O(1) + farklı önek uzunluğu sayısı kadar dilim araması.
+Genel glob kuralları tek bir derlenmiş regex'te birleştirilir.
+
+Dosya mtime/boyut ile yoklanır; değişince yeni indeks thread'de kurulur ve
+tek atama ile değiştirilir (bağlantı kabulü hiç beklemez). Hatalı yükleme
+eski indeksi korur.
+"""
+import asyncio
+import contextlib
+import fnmatch
+import logging
+import os
+import re
+import time
+from typing import Iterable, Optional
+
+GLOB_CHARS = re.compile(r"[*?\[]")
+
+
+class AuthIndex:
+    __slots__ = ("exact", "prefixes", "glob", "rule_count")
+
+    def __init__(self, rules: Iterable[str] = ()):
+        exact = set()
+        prefixes = {}
+        globs = []
+        count = 0
+        for rule in rules:
+            count += 1
+            if not GLOB_CHARS.search(rule):
+                exact.add(rule)
+            elif rule.endswith("*") and not GLOB_CHARS.search(rule[:-1]):
+                prefix = rule[:-1]
+                prefixes.setdefault(len(prefix), set()).add(prefix)
+            else:
+                globs.append(fnmatch.translate(rule))
+        self.exact = frozenset(exact)
+        # (uzunluk, önek kümesi) çiftleri; kısa önekler önce
+        self.prefixes = tuple((length, frozenset(items)) for length, items in sorted(prefixes.items()))
+        self.glob = re.compile("|".join(globs)) if globs else None
+        self.rule_count = count
+
+    def __contains__(self, cp_id: str) -> bool:
+        if cp_id in self.exact:
+            return True
+        for length, items in self.prefixes:
+            if len(cp_id) >= length and cp_id[:length] in items:
+                return True
+        return self.glob is not None and self.glob.match(cp_id) is not None
+
+    def stats(self) -> dict:
+        return {
+            "rules": self.rule_count,
+            "exact": len(self.exact),
+            "prefixes": sum(len(items) for _, items in self.prefixes),
+            "globs": 0 if self.glob is None else self.glob.pattern.count("|") + 1,
+        }
+
+
+def parse_rules(text: str) -> list:
+    rules = []
+    for line in text.splitlines():
+        rule = line.split("#", 1)[0].strip()
+        if rule:
+            rules.append(rule)
+    return rules
+
+
+class AuthorizationStore:
+    def __init__(self, path: str, reload_interval: float = 2.0):
+        self.path = path
+        self.reload_interval = reload_interval
+        self.logger = logging.getLogger("AuthorizationStore")
+        self.index = AuthIndex()
+        self.reloads = 0
+        self.loaded_at: Optional[float] = None
+        self._signature = None
+        self._task: Optional[asyncio.Task] = None
+        self.load()
+
+    def _stat_signature(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _build(self) -> AuthIndex:
+        with open(self.path, encoding="utf-8") as f:
+            return AuthIndex(parse_rules(f.read()))
+
+    def load(self) -> bool:
+        """Dosyayı senkron yükle (başlangıçta). Dosya yoksa kimseye izin verilmez."""
+        signature = self._stat_signature()
+        if signature is None:
+            self.logger.warning(f"Authorization file {self.path} not found; all charge points will be rejected")
+            self._signature = None
+            return False
+        self._swap(self._build(), signature)
+        return True
+
+    def _swap(self, index: AuthIndex, signature) -> None:
+        self.index = index
+        self._signature = signature
+        self.loaded_at = time.time()
+        self.reloads += 1
+        self.logger.info(f"Loaded {index.rule_count} authorization rule(s) from {self.path}")
+
+    def is_authorized(self, cp_id: str) -> bool:
+        return cp_id in self.index
+
+    async def reload_if_changed(self) -> bool:
+        signature = self._stat_signature()
+        if signature is None or signature == self._signature:
+            return False
+        try:
+            index = await asyncio.to_thread(self._build)
+        except (OSError, UnicodeDecodeError) as e:
+            self.logger.error(f"Authorization reload failed, keeping previous rules: {e}")
+            return False
+        self._swap(index, signature)
+        return True
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            await self.reload_if_changed()
+
+    def start(self) -> None:
+        if self._task is None and self.reload_interval > 0:
+            self._task = asyncio.create_task(self._watch(), name="auth-store-watch")
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def stats(self) -> dict:
+        return {"path": self.path, "reloads": self.reloads, "loaded_at": self.loaded_at, **self.index.stats()}
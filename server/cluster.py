@@ -0,0 +1,121 @@
+"""
+MockOCPPServer'ı N worker süreçle çalıştırır. Worker'lar aynı portu
+SO_REUSEPORT ile dinler; çekirdek her yeni bağlantıyı bir worker'a dağıtır.
+Hangi CP'nin hangi worker'da olduğu ortak ConnectionRegistry'de (SQLite)
+tutulur; başka worker'daki CP'ye giden komutlar PeerServer üzerinden iletilir.
+
+    python cluster.py --workers 4 --port 8080
+    python cluster.py --workers 4 --port 8080 --no-ssl
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import time
+
+from registry import ConnectionRegistry
+from server import MockOCPPServer, build_ssl_context
+from ocpp_common.log_pipeline import setup_logging
+
+
+def _run_worker(worker_id, args, ssl_context):
+    # Ctrl+C'yi ana süreç yönetir; worker'lar SIGTERM ile kapanır
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Ebeveynin log listener thread'i fork ile gelmez; worker kendi hattını kurar
+    setup_logging()
+    registry = ConnectionRegistry(args.registry)
+    server = MockOCPPServer(
+        host=args.host,
+        port=args.port,
+        use_ssl=not args.no_ssl,
+        ssl_context=ssl_context,
+        worker_id=worker_id,
+        reuse_port=True,
+        registry=registry,
+        peer_port=args.peer_base_port + worker_id,
+        control_port=args.control_port,
+    )
+    try:
+        asyncio.run(server.start())
+    finally:
+        registry.close()
+
+
+class ServerCluster:
+    def __init__(self, args):
+        if not hasattr(socket, "SO_REUSEPORT"):
+            raise RuntimeError("SO_REUSEPORT is not supported on this platform")
+        self.args = args
+        self.logger = logging.getLogger("ServerCluster")
+        self._ctx = multiprocessing.get_context("fork")
+        self.procs = {}
+        self._stopping = False
+        # Fork'tan önce kurulur: worker'lar (yeniden başlatılanlar dahil) aynı
+        # TLS bilet anahtarlarını paylaşır, oturum devamı worker'dan bağımsız
+        self.ssl_context = None if args.no_ssl else build_ssl_context()
+
+    def _spawn(self, worker_id):
+        proc = self._ctx.Process(
+            target=_run_worker, args=(worker_id, self.args, self.ssl_context),
+            name=f"ocpp-worker-{worker_id}", daemon=True,
+        )
+        proc.start()
+        self.procs[worker_id] = proc
+        self.logger.info(f"Worker {worker_id} started (pid={proc.pid})")
+
+    def start(self):
+        ConnectionRegistry.create(self.args.registry).close()
+        for worker_id in range(self.args.workers):
+            self._spawn(worker_id)
+
+    def supervise(self):
+        """Çöken worker'ı aynı id ile yeniden başlat (registry kayıtları devralınmaz)."""
+        while not self._stopping:
+            time.sleep(1.0)
+            for worker_id, proc in list(self.procs.items()):
+                if not proc.is_alive() and not self._stopping:
+                    self.logger.warning(f"Worker {worker_id} exited with {proc.exitcode}; restarting")
+                    self._spawn(worker_id)
+
+    def stop(self):
+        self._stopping = True
+        for proc in self.procs.values():
+            proc.terminate()
+        for proc in self.procs.values():
+            proc.join(5)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Multi-process MockOCPPServer (SO_REUSEPORT)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--no-ssl", action="store_true")
+    parser.add_argument("--registry", default="connections.db", help="Paylaşılan SQLite registry dosyası")
+    parser.add_argument("--peer-base-port", type=int, default=8180,
+                        help="Worker i, 127.0.0.1:(peer_base_port + i) üzerinde dinler")
+    parser.add_argument("--control-port", type=int, default=int(os.environ.get("CONTROL_PORT", "8090") or 0),
+                        help="Kontrol API portu, tüm worker'lar SO_REUSEPORT ile paylaşır (0: kapalı)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    setup_logging()
+    cluster = ServerCluster(args)
+    cluster.start()
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        cluster.supervise()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        cluster.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+MockOCPPServer yerel kontrol API'si (aiohttp.web, varsayılan 127.0.0.1:8090).
+
+    GET  /clients   -> bağlı CP'ler (cluster modunda tüm worker'lar)
+    GET  /stats     -> bağlantı, yetkilendirme, REST forwarder ve log hattı sayaçları
+    GET  /metrics   -> Prometheus text formatı (cluster modunda worker etiketiyle)
+    POST /commands  -> CP'lere server kaynaklı CALL gönder
+
+/commands gövdesi:
+    {
+      "action": "RemoteStartTransaction",
+      "payload": {"connectorId": 1, "idTag": "OPS"},
+      "cp_ids": ["VESTEL-EVC-001"],     # veya
+      "prefix": "CP-IZMIR-",            # veya
+      "pattern": "CP-*-00?",            # hiçbiri yoksa tüm filo
+      "concurrency": 500,               # worker başına eşzamanlı CALL
+      "timeout": 10,                    # CP başına CALLRESULT bekleme (sn)
+      "validate": true,                 # payload OCPP 1.6 şemasına uymalı
+      "detail": false                   # true: CP bazlı sonuçları da döndür
+    }
+
+Yanıt: accepted / rejected / timeout / error / offline sayıları, zaman aşımına
+uğrayan CP'ler (stragglers) ve hata veren CP'ler.
+
+Cluster modunda worker'lar kontrol portunu da SO_REUSEPORT ile paylaşır;
+isteği alan worker hedefleri registry'ye göre gruplar ve diğer worker'lara
+PeerServer üzerinden tek bir toplu istek gönderir.
+"""
+import fnmatch
+import logging
+import time
+
+from aiohttp import web
+
+from ocpp_common import codec
+from ocpp_common.log_pipeline import get_pipeline
+from ocpp_common.metrics import CONTENT_TYPE, Counter, render
+from ocpp_schemas import CENTRAL_SYSTEM_REQUEST_SCHEMAS
+from validation import ValidationError, compile_schemas
+
+# CP bazlı sonuçlar
+ACCEPTED = "accepted"
+REJECTED = "rejected"
+TIMEOUT = "timeout"
+ERROR = "error"
+OFFLINE = "offline"
+OUTCOMES = (ACCEPTED, REJECTED, TIMEOUT, ERROR, OFFLINE)
+
+DEFAULT_CONCURRENCY = 500
+DEFAULT_TIMEOUT = 10.0
+MAX_LISTED = 1000  # yanıtta listelenen straggler / hata sayısı üst sınırı
+
+COMMAND_VALIDATORS = compile_schemas(CENTRAL_SYSTEM_REQUEST_SCHEMAS)
+
+COMMANDS = Counter("ocpp_commands_total", "Server-initiated CALL outcomes", ["action", "outcome"])
+
+
+def summarize(action: str, outcomes: dict, elapsed: float, detail: bool = False) -> dict:
+    """
+    {cp_id: [outcome, detail]} -> toplu sonuç.
+    """
+    counts = dict.fromkeys(OUTCOMES, 0)
+    stragglers = []
+    errors = {}
+    for cp_id, (outcome, info) in outcomes.items():
+        counts[outcome] += 1
+        if outcome == TIMEOUT:
+            stragglers.append(cp_id)
+        elif outcome == ERROR and len(errors) < MAX_LISTED:
+            errors[cp_id] = info
+    stragglers.sort()
+    result = {
+        "action": action,
+        "targets": len(outcomes),
+        "counts": counts,
+        "stragglers": stragglers[:MAX_LISTED],
+        "errors": errors,
+        "elapsed_ms": round(elapsed * 1000, 1),
+    }
+    if detail:
+        result["results"] = outcomes
+    return result
+
+
+def _json(data, status: int = 200) -> web.Response:
+    return web.json_response(data, status=status, dumps=codec.dumps_text)
+
+
+class ControlAPI:
+    def __init__(self, server, port: int, host: str = "127.0.0.1", reuse_port: bool = False):
+        self.server = server
+        self.host = host
+        self.port = port
+        self.reuse_port = reuse_port
+        self.logger = logging.getLogger("ControlAPI")
+        self.app = web.Application()
+        self.app.add_routes([
+            web.get("/clients", self.get_clients),
+            web.get("/stats", self.get_stats),
+            web.get("/metrics", self.get_metrics),
+            web.post("/commands", self.post_commands),
+        ])
+        self._runner = None
+
+    async def start(self) -> None:
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port, reuse_port=self.reuse_port or None)
+        await site.start()
+        self.logger.info(f"Control API listening on http://{self.host}:{self.port}")
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def get_clients(self, request: web.Request) -> web.Response:
+        return _json(await self.server.cluster_status())
+
+    async def get_stats(self, request: web.Request) -> web.Response:
+        return _json({
+            "worker_id": self.server.worker_id,
+            "connected": len(self.server.connected_clients),
+            "pending_calls": self.server.pending_call_count(),
+            "auth": self.server.auth_store.stats(),
+            "rest": self.server.rest_forwarder.stats(),
+            "logging": get_pipeline().stats() if get_pipeline() is not None else None,
+        })
+
+    async def get_metrics(self, request: web.Request) -> web.Response:
+        text = render(await self.server.collect_cluster_metrics())
+        return web.Response(body=text.encode("utf-8"), headers={"Content-Type": CONTENT_TYPE})
+
+    def _select_targets(self, body: dict):
+        """
+        Açık cp_ids listesi aynen döner (bağlı olmayanlar offline sayılır);
+        prefix / pattern bağlı CP'ler üzerinde filtrelenir; hiçbiri yoksa None (tüm filo).
+        """
+        if "cp_ids" in body:
+            cp_ids = body["cp_ids"]
+            if not isinstance(cp_ids, list) or not all(isinstance(c, str) for c in cp_ids):
+                raise ValueError("cp_ids must be a list of strings")
+            return list(dict.fromkeys(cp_ids))
+        prefix = body.get("prefix")
+        pattern = body.get("pattern")
+        if prefix is None and pattern is None:
+            return None
+        connected = self.server.connected_cp_ids()
+        if prefix is not None:
+            connected = [c for c in connected if c.startswith(prefix)]
+        if pattern is not None:
+            connected = fnmatch.filter(connected, pattern)
+        return connected
+
+    async def post_commands(self, request: web.Request) -> web.Response:
+        try:
+            body = codec.loads(await request.read())
+        except ValueError as e:
+            return _json({"error": f"invalid JSON: {e}"}, status=400)
+        if not isinstance(body, dict):
+            return _json({"error": "body must be an object"}, status=400)
+
+        action = body.get("action")
+        payload = body.get("payload", {})
+        if not isinstance(action, str) or not isinstance(payload, dict):
+            return _json({"error": "action (string) and payload (object) are required"}, status=400)
+        if body.get("validate", True):
+            validator = COMMAND_VALIDATORS.get(action)
+            if validator is None:
+                return _json({"error": f"unknown Central System action: {action}"}, status=400)
+            try:
+                validator(payload)
+            except ValidationError as e:
+                return _json({"error": str(e), "code": e.code}, status=400)
+
+        try:
+            cp_ids = self._select_targets(body)
+            concurrency = int(body.get("concurrency", DEFAULT_CONCURRENCY))
+            timeout = float(body.get("timeout", DEFAULT_TIMEOUT))
+        except (TypeError, ValueError) as e:
+            return _json({"error": str(e)}, status=400)
+        if concurrency < 1 or timeout <= 0:
+            return _json({"error": "concurrency must be >= 1 and timeout > 0"}, status=400)
+
+        started = time.perf_counter()
+        outcomes = await self.server.dispatch_command(action, payload, cp_ids, concurrency, timeout)
+        result = summarize(action, outcomes, time.perf_counter() - started, bool(body.get("detail")))
+        for outcome, count in result["counts"].items():
+            if count:
+                COMMANDS.labels(action, outcome).inc(count)
+        self.logger.info(f"Command {action} -> {result['targets']} CP(s): {result['counts']} in {result['elapsed_ms']} ms")
+        return _json(result)
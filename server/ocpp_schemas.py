@@ -0,0 +1,156 @@
+"""
+OCPP 1.6 JSON şemaları (Core profile, request payload'ları).
+
+Resmi OCPP 1.6 JSON şema dosyalarındaki type / required / enum / maxLength /
+format / additionalProperties kuralları birebir alınmıştır; validation.py
+bunları açılışta bir kez derler.
+"""
+
+
+def _string(max_length=None, **extra):
+    schema = {"type": "string"}
+    if max_length is not None:
+        schema["maxLength"] = max_length
+    schema.update(extra)
+    return schema
+
+
+def _object(properties, required=()):
+    return {
+        "type": "object",
+        "properties": properties,
+        "additionalProperties": False,
+        "required": list(required),
+    }
+
+
+DATE_TIME = {"type": "string", "format": "date-time"}
+INTEGER = {"type": "integer"}
+ID_TAG = _string(20)
+
+READING_CONTEXTS = [
+    "Interruption.Begin", "Interruption.End", "Sample.Clock", "Sample.Periodic",
+    "Transaction.Begin", "Transaction.End", "Trigger", "Other",
+]
+MEASURANDS = [
+    "Energy.Active.Export.Register", "Energy.Active.Import.Register",
+    "Energy.Reactive.Export.Register", "Energy.Reactive.Import.Register",
+    "Energy.Active.Export.Interval", "Energy.Active.Import.Interval",
+    "Energy.Reactive.Export.Interval", "Energy.Reactive.Import.Interval",
+    "Power.Active.Export", "Power.Active.Import", "Power.Offered",
+    "Power.Reactive.Export", "Power.Reactive.Import", "Power.Factor",
+    "Current.Import", "Current.Export", "Current.Offered",
+    "Voltage", "Frequency", "Temperature", "SoC", "RPM",
+]
+PHASES = ["L1", "L2", "L3", "N", "L1-N", "L2-N", "L3-N", "L1-L2", "L2-L3", "L3-L1"]
+LOCATIONS = ["Cable", "EV", "Inlet", "Outlet", "Body"]
+UNITS = [
+    "Wh", "kWh", "varh", "kvarh", "W", "kW", "VA", "kVA", "var", "kvar",
+    "A", "V", "K", "Celcius", "Celsius", "Fahrenheit", "Percent",
+]
+
+METER_VALUE = _object({
+    "timestamp": DATE_TIME,
+    "sampledValue": {
+        "type": "array",
+        "items": _object({
+            "value": {"type": "string"},
+            "context": {"type": "string", "enum": READING_CONTEXTS},
+            "format": {"type": "string", "enum": ["Raw", "SignedData"]},
+            "measurand": {"type": "string", "enum": MEASURANDS},
+            "phase": {"type": "string", "enum": PHASES},
+            "location": {"type": "string", "enum": LOCATIONS},
+            "unit": {"type": "string", "enum": UNITS},
+        }, required=["value"]),
+    },
+}, required=["timestamp", "sampledValue"])
+
+CHARGE_POINT_ERROR_CODES = [
+    "ConnectorLockFailure", "EVCommunicationError", "GroundFailure", "HighTemperature",
+    "InternalError", "LocalListConflict", "NoError", "OtherError", "OverCurrentFailure",
+    "PowerMeterFailure", "PowerSwitchFailure", "ReaderFailure", "ResetFailure",
+    "UnderVoltage", "OverVoltage", "WeakSignal",
+]
+CHARGE_POINT_STATUSES = [
+    "Available", "Preparing", "Charging", "SuspendedEVSE", "SuspendedEV",
+    "Finishing", "Reserved", "Unavailable", "Faulted",
+]
+STOP_REASONS = [
+    "EmergencyStop", "EVDisconnected", "HardReset", "Local", "Other", "PowerLoss",
+    "Reboot", "Remote", "SoftReset", "UnlockCommand", "DeAuthorized",
+]
+
+# Charge Point → Central System (server'ın cevapladığı CALL'lar)
+REQUEST_SCHEMAS = {
+    "Authorize": _object({"idTag": ID_TAG}, required=["idTag"]),
+    "BootNotification": _object({
+        "chargePointVendor": _string(20),
+        "chargePointModel": _string(20),
+        "chargePointSerialNumber": _string(25),
+        "chargeBoxSerialNumber": _string(25),
+        "firmwareVersion": _string(50),
+        "iccid": _string(20),
+        "imsi": _string(20),
+        "meterType": _string(25),
+        "meterSerialNumber": _string(25),
+    }, required=["chargePointVendor", "chargePointModel"]),
+    "DataTransfer": _object({
+        "vendorId": _string(255),
+        "messageId": _string(50),
+        "data": {"type": "string"},
+    }, required=["vendorId"]),
+    "Heartbeat": _object({}),
+    "MeterValues": _object({
+        "connectorId": INTEGER,
+        "transactionId": INTEGER,
+        "meterValue": {"type": "array", "items": METER_VALUE},
+    }, required=["connectorId", "meterValue"]),
+    "StartTransaction": _object({
+        "connectorId": INTEGER,
+        "idTag": ID_TAG,
+        "meterStart": INTEGER,
+        "reservationId": INTEGER,
+        "timestamp": DATE_TIME,
+    }, required=["connectorId", "idTag", "meterStart", "timestamp"]),
+    "StatusNotification": _object({
+        "connectorId": INTEGER,
+        "errorCode": {"type": "string", "enum": CHARGE_POINT_ERROR_CODES},
+        "info": _string(50),
+        "status": {"type": "string", "enum": CHARGE_POINT_STATUSES},
+        "timestamp": DATE_TIME,
+        "vendorId": _string(255),
+        "vendorErrorCode": _string(50),
+    }, required=["connectorId", "errorCode", "status"]),
+    "StopTransaction": _object({
+        "idTag": ID_TAG,
+        "meterStop": INTEGER,
+        "timestamp": DATE_TIME,
+        "transactionId": INTEGER,
+        "reason": {"type": "string", "enum": STOP_REASONS},
+        "transactionData": {"type": "array", "items": METER_VALUE},
+    }, required=["transactionId", "timestamp", "meterStop"]),
+}
+
+# Central System → Charge Point (server'ın gönderdiği komutlar)
+CENTRAL_SYSTEM_REQUEST_SCHEMAS = {
+    "ChangeAvailability": _object({
+        "connectorId": INTEGER,
+        "type": {"type": "string", "enum": ["Inoperative", "Operative"]},
+    }, required=["connectorId", "type"]),
+    "ChangeConfiguration": _object({
+        "key": _string(50),
+        "value": _string(500),
+    }, required=["key", "value"]),
+    "ClearCache": _object({}),
+    "GetConfiguration": _object({
+        "key": {"type": "array", "items": _string(50)},
+    }),
+    "RemoteStartTransaction": _object({
+        "connectorId": INTEGER,
+        "idTag": ID_TAG,
+        "chargingProfile": {"type": "object"},
+    }, required=["idTag"]),
+    "RemoteStopTransaction": _object({"transactionId": INTEGER}, required=["transactionId"]),
+    "Reset": _object({"type": {"type": "string", "enum": ["Hard", "Soft"]}}, required=["type"]),
+    "UnlockConnector": _object({"connectorId": INTEGER}, required=["connectorId"]),
+}
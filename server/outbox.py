@@ -0,0 +1,213 @@
+import logging
+import os
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from ocpp_common import codec
+
+
+class CircuitBreaker:
+    """
+    Basit closed → open → half_open devre kesici.
+    - closed   : istekler serbest
+    - open     : backend ölü kabul edilir, reset_timeout dolana kadar istek yok
+    - half_open: reset_timeout doldu, tek bir deneme isteğine izin verilir
+                 (diğerleri False alır); başarı devreyi kapatır, hata
+                 tekrar açar. Sonucu hiç raporlanmayan deneme reset_timeout
+                 sonra yenisine yer açar
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 10.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0  # kaç kez açıldı
+        self._probe_at: Optional[float] = None  # half_open'da uçuştaki denemenin başlangıcı
+
+    def allow(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        now = time.monotonic()
+        if self.state == self.OPEN:
+            if now - self.opened_at < self.reset_timeout:
+                return False
+            self.state = self.HALF_OPEN
+        elif self._probe_at is not None and now - self._probe_at < self.reset_timeout:
+            return False  # deneme uçuşta; diğerleri outbox'a
+        self._probe_at = now
+        return True
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.state = self.CLOSED
+        self._probe_at = None
+
+    def record_failure(self) -> None:
+        self._probe_at = None
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.trips += 1
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+
+class Outbox:
+    """
+    Segment tabanlı, sadece-ekleme (append-only) disk kuyruğu.
+    Her satır bir kayıt: {"e": endpoint, "p": payload}
+    - Aktif segment segment_bytes'a ulaşınca yenisine geçilir
+    - Toplam boyut max_bytes'ı aşarsa en eski segment silinir (dropped sayacı)
+    - Süreç yeniden başlarsa dizindeki segmentler backlog olarak okunur
+    """
+
+    PREFIX = "segment-"
+    SUFFIX = ".ndjson"
+    DEAD_LETTER = "dead-letter.ndjson"  # segment glob'una uymaz; replay edilmez
+
+    def __init__(self, directory: str, segment_bytes: int = 4 * 1024 * 1024,
+                 max_bytes: int = 256 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        self.logger = logging.getLogger("Outbox")
+
+        self._segments: List[Path] = sorted(self.directory.glob(f"{self.PREFIX}*{self.SUFFIX}"))
+        self._seq = self._segment_seq(self._segments[-1]) + 1 if self._segments else 1
+        self._active: Optional[Path] = None
+        self._pinned: Optional[Path] = None  # replay edilen segment; limit onu silmez
+        self._fh = None
+        self._active_size = 0
+        self._total_bytes = sum(p.stat().st_size for p in self._segments)
+
+        self.appended = 0  # diske yazılan toplam kayıt
+        self.dropped = 0   # disk limiti yüzünden silinen kayıt
+
+        if self._segments:
+            self.logger.info(f"[OUTBOX] Recovered {len(self._segments)} segment(s), {self._total_bytes} bytes")
+
+    @classmethod
+    def _segment_seq(cls, path: Path) -> int:
+        return int(path.name[len(cls.PREFIX):-len(cls.SUFFIX)])
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def has_backlog(self) -> bool:
+        return self._total_bytes > 0
+
+    def stats(self) -> dict:
+        return {
+            "segments": len(self._segments),
+            "bytes": self._total_bytes,
+            "appended": self.appended,
+            "dropped": self.dropped,
+        }
+
+    def append(self, endpoint: str, records: list) -> None:
+        if not records:
+            return
+        data = b"".join(codec.dumps({"e": endpoint, "p": r}) + b"\n" for r in records)
+        if self._fh is None or self._active_size >= self.segment_bytes:
+            self._rotate()
+        self._fh.write(data)
+        self._fh.flush()
+        self._active_size += len(data)
+        self._total_bytes += len(data)
+        self.appended += len(records)
+        self._enforce_limit()
+
+    def _rotate(self) -> None:
+        self._close_active()
+        self._active = self.directory / f"{self.PREFIX}{self._seq:08d}{self.SUFFIX}"
+        self._seq += 1
+        self._fh = open(self._active, "ab")
+        self._active_size = 0
+        self._segments.append(self._active)
+
+    def _close_active(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        self._active = None
+
+    def _enforce_limit(self) -> None:
+        # Aktif ve replay edilen segment hariç en eskiden başlayarak sil
+        while self._total_bytes > self.max_bytes:
+            oldest = next((p for p in self._segments if p != self._active and p != self._pinned), None)
+            if oldest is None:
+                break
+            self._segments.remove(oldest)
+            size = oldest.stat().st_size
+            with open(oldest, "rb") as f:
+                lost = sum(1 for _ in f)
+            oldest.unlink()
+            self._total_bytes -= size
+            self.dropped += lost
+            self.logger.warning(f"[OUTBOX] Disk limit reached, dropped {lost} record(s) from {oldest.name}")
+
+    def oldest_segment(self) -> Optional[Path]:
+        """
+        Replay için en eski segmenti döner. Sadece aktif segment kaldıysa
+        kapatılır ki yeni yazımlar ayrı bir segmente gitsin.
+        """
+        if not self._segments:
+            return None
+        if self._segments[0] == self._active:
+            self._close_active()
+        return self._segments[0]
+
+    def dead_letter(self, endpoint: str, payload: dict, reason: str) -> None:
+        """Backend'in sürekli reddettiği kaydı backlog'dan çıkarıp ayrı dosyaya yaz."""
+        row = {"e": endpoint, "p": payload, "reason": reason, "at": time.time()}
+        with open(self.directory / self.DEAD_LETTER, "ab") as f:
+            f.write(codec.dumps(row) + b"\n")
+
+    def pin(self, path: Optional[Path]) -> None:
+        """Replay süresince segmenti disk limiti silmesine karşı koru (None: bırak)."""
+        self._pinned = path
+
+    def read_segment(self, path: Path) -> List[Tuple[str, dict]]:
+        records = []
+        with open(path, "rb") as f:
+            for line in f:
+                try:
+                    row = codec.loads(line)
+                    records.append((row["e"], row["p"]))
+                except (ValueError, KeyError):
+                    continue  # yarım yazılmış son satır vb.
+        return records
+
+    def complete(self, path: Path) -> None:
+        """Segment tamamen gönderildi: diskten sil."""
+        if path in self._segments:
+            self._segments.remove(path)
+        try:
+            self._total_bytes -= path.stat().st_size
+        except FileNotFoundError:
+            return  # zaten silinmiş; sayımdan da düşülmüştür
+        path.unlink(missing_ok=True)
+
+    def rewrite(self, path: Path, remaining: List[Tuple[str, dict]]) -> None:
+        """Kısmen gönderilmiş segmenti kalan kayıtlarla atomik olarak değiştir."""
+        if path not in self._segments or not path.exists():
+            return  # silinmiş segmenti yeniden yaratma (sayılmayan yetim dosya olurdu)
+        old_size = path.stat().st_size
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            for endpoint, payload in remaining:
+                f.write(codec.dumps({"e": endpoint, "p": payload}) + b"\n")
+        os.replace(tmp, path)
+        self._total_bytes += path.stat().st_size - old_size
+
+    def close(self) -> None:
+        self._close_active()
@@ -0,0 +1,63 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+from ocpp_common import codec
+
+# Worker'lar arası istek/yanıt: 127.0.0.1 üzerinde tek satır JSON
+PeerHandler = Callable[[dict], Awaitable[dict]]
+
+
+class PeerServer:
+    """
+    Her server worker'ının diğer worker'lardan istek aldığı yerel kanal.
+    Başka worker'a bağlı bir CP'ye komut ya da durum sorgusu buradan iletilir.
+    """
+
+    def __init__(self, handler: PeerHandler, port: int, host: str = "127.0.0.1"):
+        self.handler = handler
+        self.host = host
+        self.port = port
+        self.logger = logging.getLogger("PeerServer")
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, limit=16 * 1024 * 1024)
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    response = await self.handler(codec.loads(line))
+                except Exception as e:
+                    self.logger.error(f"Peer request failed: {e}")
+                    response = {"ok": False, "error": str(e)}
+                writer.write(codec.dumps(response) + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def peer_request(port: int, payload: dict, timeout: float = 30.0, host: str = "127.0.0.1") -> dict:
+    reader, writer = await asyncio.wait_for(
+        asyncio.open_connection(host, port, limit=16 * 1024 * 1024), timeout
+    )
+    try:
+        writer.write(codec.dumps(payload) + b"\n")
+        await writer.drain()
+        line = await asyncio.wait_for(reader.readline(), timeout)
+        if not line:
+            raise ConnectionError(f"peer on port {port} closed the connection")
+        return codec.loads(line)
+    finally:
+        writer.close()
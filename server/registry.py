@@ -0,0 +1,81 @@
+import os
+import sqlite3
+import time
+from typing import Dict, Optional, Tuple
+
+
+class ConnectionRegistry:
+    """
+    Çok süreçli (SO_REUSEPORT) server modunda hangi CP'nin hangi worker'a
+    bağlı olduğunu tüm worker'ların görebildiği SQLite (WAL) tablosu.
+
+    Yazma sadece bağlanma/kopma anında olur (mesaj başına değil), bu yüzden
+    senkron sqlite çağrıları event loop için yeterince ucuz.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._db = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=OFF")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS workers ("
+            " worker_id INTEGER PRIMARY KEY, pid INTEGER, peer_port INTEGER, started_at REAL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS connections ("
+            " cp_id TEXT PRIMARY KEY, worker_id INTEGER NOT NULL, connected_at REAL)"
+        )
+
+    @classmethod
+    def create(cls, path: str) -> "ConnectionRegistry":
+        """Cluster başlarken önceki çalıştırmadan kalan kayıtları temizle."""
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.remove(path + suffix)
+            except FileNotFoundError:
+                pass
+        return cls(path)
+
+    def register_worker(self, worker_id: int, pid: int, peer_port: int) -> None:
+        self._db.execute(
+            "INSERT OR REPLACE INTO workers VALUES (?, ?, ?, ?)",
+            (worker_id, pid, peer_port, time.time()),
+        )
+        # Aynı worker id ile yeniden başlayan süreç eski bağlantıları devralmaz
+        self._db.execute("DELETE FROM connections WHERE worker_id = ?", (worker_id,))
+
+    def register(self, cp_id: str, worker_id: int) -> None:
+        self._db.execute(
+            "INSERT OR REPLACE INTO connections VALUES (?, ?, ?)",
+            (cp_id, worker_id, time.time()),
+        )
+
+    def unregister(self, cp_id: str, worker_id: int) -> None:
+        # CP bu arada başka worker'a yeniden bağlandıysa o kaydı silme
+        self._db.execute(
+            "DELETE FROM connections WHERE cp_id = ? AND worker_id = ?",
+            (cp_id, worker_id),
+        )
+
+    def owner(self, cp_id: str) -> Optional[Tuple[int, int]]:
+        """(worker_id, peer_port) ya da bağlı değilse None."""
+        row = self._db.execute(
+            "SELECT c.worker_id, w.peer_port FROM connections c"
+            " JOIN workers w ON w.worker_id = c.worker_id WHERE c.cp_id = ?",
+            (cp_id,),
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def connections(self) -> Dict[str, int]:
+        return dict(self._db.execute("SELECT cp_id, worker_id FROM connections"))
+
+    def workers(self) -> Dict[int, int]:
+        """worker_id -> peer_port"""
+        return dict(self._db.execute("SELECT worker_id, peer_port FROM workers"))
+
+    def counts(self) -> Dict[int, int]:
+        return dict(self._db.execute("SELECT worker_id, COUNT(*) FROM connections GROUP BY worker_id"))
+
+    def close(self) -> None:
+        self._db.close()
@@ -0,0 +1,346 @@
+import asyncio
+import logging
+from typing import Dict, Iterable, List, Optional
+
+import aiohttp
+
+from ocpp_common import codec
+from outbox import CircuitBreaker, Outbox
+
+# _post sonuçları
+SENT = "sent"          # 2xx/3xx
+REJECTED = "rejected"  # 4xx: veri hatası, tekrar denemenin anlamı yok
+RETRY = "retry"        # bağlantı hatası / timeout: outbox'a alınabilir
+FAILED = "failed"      # 5xx: backend yanıt verdi ama işleyemedi; tekrar denenir, kayıt kaynaklı olabilir
+
+# Gövde codec ile tek seferde bytes'a serialize edilir (aiohttp json= yerine)
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+class RestForwarder:
+    """
+    MockOCPPServer'ın REST'e yaptığı POST'ları tek bir uzun ömürlü
+    aiohttp.ClientSession üzerinden yollar.
+    - Keep-alive bağlantı havuzu (her mesajda yeni TCP/DNS yok)
+    - Sınırlı kuyruk: dolarsa kayıt düşürülür, event loop şişmez
+    - Sabit sayıda worker ile eşzamanlılık limiti
+    - Batch modu: seçili endpoint'lerin kayıtları biriktirilir ve boyut
+      (batch_size) ya da süre (batch_interval) eşiğinde tek bir dizi olarak
+      "<endpoint>/bulk" adresine gönderilir
+    - Outbox + devre kesici: backend ulaşılamazken kayıtlar beklemeden diske
+      yazılır; backend dönünce drainer bunları hız limitli bulk olarak yollar
+    - Zehirli kayıt: backlog başındaki chunk poison_threshold kez üst üste
+      5xx alırsa tek tek denenir; tek başına da o kadar 5xx alan kayıt
+      dead-letter dosyasına taşınır, backlog tıkanmaz
+    """
+
+    def __init__(self, base_url: str, concurrency: int = 16, queue_size: int = 10000,
+                 timeout: float = 5.0, keepalive_timeout: float = 30.0,
+                 batch_size: int = 500, batch_interval: float = 0.2,
+                 batch_endpoints: Iterable[str] = ("/heartbeat", "/status-notification", "/bootnotification",
+                                                  "/meter-values"),
+                 outbox: Optional[Outbox] = None, breaker: Optional[CircuitBreaker] = None,
+                 replay_rate: float = 2000.0, drain_interval: float = 1.0, poison_threshold: int = 3):
+        self.base_url = base_url.rstrip("/")
+        self.concurrency = max(1, concurrency)
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.keepalive_timeout = keepalive_timeout
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        # batch_size <= 1 ise batch kapalı: her kayıt tek POST
+        self.batch_endpoints = set(batch_endpoints) if batch_size > 1 else set()
+        self.outbox = outbox
+        self.breaker = breaker or CircuitBreaker()
+        self.replay_rate = replay_rate  # replay sırasında saniyede en fazla bu kadar kayıt
+        self.drain_interval = drain_interval
+        self.poison_threshold = max(1, poison_threshold)
+        self._head_failures = 0  # backlog başındaki chunk'ın üst üste 5xx sayısı
+        self._isolate = 0        # başta tek tek gönderilecek kayıt sayısı (bölünmüş chunk)
+        self.logger = logging.getLogger("RestForwarder")
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._workers: list = []
+        self._flusher: Optional[asyncio.Task] = None
+        self._drainer: Optional[asyncio.Task] = None
+        self._buffers: Dict[str, List[dict]] = {}
+        self._pending = 0    # buffer + kuyruktaki, henüz worker'a geçmemiş kayıt sayısı
+
+        # Sayaçlar
+        self.queued = 0      # kuyruğa alınan toplam kayıt
+        self.in_flight = 0   # şu an REST'e giden istek sayısı
+        self.sent = 0        # başarıyla gönderilen
+        self.failed = 0      # HTTP >= 400 veya bağlantı hatası
+        self.dropped = 0     # kuyruk dolu olduğu için düşürülen
+        self.batches = 0     # gönderilen bulk istek sayısı
+        self.spilled = 0     # outbox'a yazılan
+        self.replayed = 0    # outbox'tan gönderilen
+        self.dead_lettered = 0  # sürekli 5xx aldığı için dead-letter'a taşınan
+
+    @property
+    def queue_depth(self) -> int:
+        return self._pending
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.queued,
+            "queue_depth": self.queue_depth,
+            "in_flight": self.in_flight,
+            "sent": self.sent,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "spilled": self.spilled,
+            "replayed": self.replayed,
+            "dead_lettered": self.dead_lettered,
+            "breaker": self.breaker.state,
+            "outbox": self.outbox.stats() if self.outbox else None,
+        }
+
+    async def start(self) -> None:
+        if self._session is not None:
+            return
+        # Sınır kayıt sayısı üzerinden (_pending) uygulanır; kuyrukta batch'ler durur
+        self._queue = asyncio.Queue()
+        connector = aiohttp.TCPConnector(
+            limit=self.concurrency,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=300,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"rest-forwarder-{i}")
+            for i in range(self.concurrency)
+        ]
+        if self.batch_endpoints:
+            self._flusher = asyncio.create_task(self._flush_loop(), name="rest-forwarder-flush")
+        if self.outbox is not None:
+            self._drainer = asyncio.create_task(self._drain_loop(), name="rest-forwarder-drain")
+        self.logger.info(
+            f"[REST] Forwarder started (concurrency={self.concurrency}, queue={self.queue_size}, "
+            f"batch={self.batch_size}/{int(self.batch_interval * 1000)}ms)"
+        )
+
+    async def close(self) -> None:
+        for task in (self._flusher, self._drainer):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+        self._flusher = self._drainer = None
+        # Buffer'da kalanları kuyruğa at ve kısa bir süre boşalmasını bekle
+        self.flush()
+        if self._queue is not None and self._workers:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=self.timeout)
+            except asyncio.TimeoutError:
+                self.logger.warning(f"[REST] {self._pending} record(s) not delivered before close")
+                self._spill_pending()
+        for task in self._workers:
+            task.cancel()
+        for task in self._workers:
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._workers = []
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self.outbox is not None:
+            self.outbox.close()
+        self.logger.info(f"[REST] Forwarder closed {self.stats()}")
+
+    def submit(self, endpoint: str, payload: dict) -> bool:
+        """
+        Kaydı kuyruğa (ya da batch buffer'ına) at, beklemeden dön.
+        Bekleyen kayıt sayısı queue_size'a ulaştıysa False döner.
+        """
+        if self._queue is None:
+            self.dropped += 1
+            self.logger.warning(f"[REST] Forwarder not started, dropping {endpoint}")
+            return False
+        # Backend ölü ya da kuyruk dolu: outbox varsa beklemeden diske yaz
+        if self.outbox is not None and (
+            self.breaker.state == CircuitBreaker.OPEN or self._pending >= self.queue_size
+        ):
+            self._spill(endpoint, [payload])
+            return True
+        if self._pending >= self.queue_size:
+            self.dropped += 1
+            self.logger.warning(f"[REST] Queue full ({self.queue_size}), dropping {endpoint}")
+            return False
+
+        self._pending += 1
+        self.queued += 1
+        if endpoint in self.batch_endpoints:
+            buf = self._buffers.setdefault(endpoint, [])
+            buf.append(payload)
+            if len(buf) >= self.batch_size:
+                self._flush_endpoint(endpoint)
+        else:
+            self._queue.put_nowait((endpoint, payload, 1))
+        return True
+
+    def flush(self) -> None:
+        """Tüm batch buffer'larını kuyruğa aktar."""
+        for endpoint in list(self._buffers):
+            self._flush_endpoint(endpoint)
+
+    def _flush_endpoint(self, endpoint: str) -> None:
+        buf = self._buffers.pop(endpoint, None)
+        if buf and self._queue is not None:
+            self._queue.put_nowait((endpoint, buf, len(buf)))
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.batch_interval)
+            self.flush()
+
+    async def _worker(self) -> None:
+        assert self._queue is not None
+        while True:
+            endpoint, body, count = await self._queue.get()
+            self._pending -= count
+            try:
+                if self.outbox is not None and not self.breaker.allow():
+                    # Devre açık: 5 sn timeout beklemeden doğrudan diske
+                    self._spill(endpoint, body if isinstance(body, list) else [body])
+                    continue
+                result = await self._post(endpoint, body, count)
+                if result in (RETRY, FAILED) and self.outbox is not None:
+                    self._spill(endpoint, body if isinstance(body, list) else [body])
+            finally:
+                self._queue.task_done()
+
+    def _spill(self, endpoint: str, records: list) -> None:
+        try:
+            self.outbox.append(endpoint, records)
+            self.spilled += len(records)
+        except OSError as e:
+            self.dropped += len(records)
+            self.logger.error(f"[OUTBOX] Write failed, dropping {len(records)} record(s): {e}")
+
+    def _spill_pending(self) -> None:
+        """Kapanışta gönderilemeyen kuyruk içeriğini outbox'a aktar."""
+        if self.outbox is None or self._queue is None:
+            return
+        while not self._queue.empty():
+            endpoint, body, count = self._queue.get_nowait()
+            self._pending -= count
+            self._spill(endpoint, body if isinstance(body, list) else [body])
+            self._queue.task_done()
+
+    async def _drain_loop(self) -> None:
+        """
+        Outbox backlog'unu backend sağlıklıyken en eskiden başlayarak yollar.
+        Hız replay_rate ile sınırlanır; hata olursa segment kalan kayıtlarla
+        yeniden yazılır ve devre kesici tekrar açılır.
+        """
+        while True:
+            await asyncio.sleep(self.drain_interval)
+            try:
+                while self.outbox.has_backlog() and self.breaker.allow():
+                    segment = self.outbox.oldest_segment()
+                    if segment is None:
+                        break
+                    if not await self._replay_segment(segment):
+                        break
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"[OUTBOX] Drain error: {e}")
+
+    async def _replay_segment(self, segment) -> bool:
+        # Replay sürerken yeni yazımlar disk limitini aşarsa bu segment silinmesin
+        self.outbox.pin(segment)
+        try:
+            return await self._replay_pinned(segment)
+        finally:
+            self.outbox.pin(None)
+
+    async def _replay_pinned(self, segment) -> bool:
+        records = self.outbox.read_segment(segment)
+        chunk_size = self.batch_size if self.batch_size > 1 else 1
+        i = 0
+        while i < len(records):
+            # Aynı endpoint'e ait ardışık kayıtları tek chunk'ta topla (sıra korunur)
+            endpoint = records[i][0]
+            limit = chunk_size if endpoint in self.batch_endpoints and not self._isolate else 1
+            j = i
+            while j < len(records) and j - i < limit and records[j][0] == endpoint:
+                j += 1
+            chunk = [p for _, p in records[i:j]]
+            body = chunk if endpoint in self.batch_endpoints else chunk[0]
+            result = await self._post(endpoint, body, len(chunk))
+            if result == FAILED:
+                self._head_failures += 1
+                if self._head_failures >= self.poison_threshold:
+                    self._head_failures = 0
+                    if len(chunk) > 1:
+                        # Hatanın kaynağı tek bir satır olabilir: bundan sonrası tek tek
+                        self._isolate = len(chunk)
+                        self.logger.warning(f"[OUTBOX] {endpoint} chunk keeps failing, retrying {len(chunk)} record(s) one by one")
+                    else:
+                        self.outbox.dead_letter(endpoint, chunk[0], f"{self.poison_threshold} consecutive 5xx")
+                        self.dead_lettered += 1
+                        self._isolate = max(0, self._isolate - 1)
+                        self.logger.error(f"[OUTBOX] Moved poison {endpoint} record to dead-letter: {chunk[0]}")
+                        i = j
+                        continue
+            if result in (RETRY, FAILED):
+                self.outbox.rewrite(segment, records[i:])
+                self.logger.warning(f"[OUTBOX] Replay paused, {len(records) - i} record(s) left in {segment.name}")
+                return False
+            if result == SENT:
+                self.replayed += len(chunk)
+            self._head_failures = 0
+            self._isolate = max(0, self._isolate - len(chunk))
+            i = j
+            if self.replay_rate > 0:
+                await asyncio.sleep(len(chunk) / self.replay_rate)
+        self.outbox.complete(segment)
+        self.logger.info(f"[OUTBOX] Replayed {len(records)} record(s) from {segment.name}")
+        return True
+
+    async def _post(self, endpoint: str, payload, count: int = 1) -> str:
+        """
+        Tek kayıt (dict) ya da bulk (list) POST. Sayaçlar kayıt bazında tutulur.
+        5xx ve bağlantı hataları devre kesiciye yazılır; 4xx veri hatasıdır.
+        """
+        path = endpoint.strip("/")
+        if isinstance(payload, list):
+            path += "/bulk"
+        url = f"{self.base_url}/{path}"
+        self.in_flight += 1
+        try:
+            async with self._session.post(url, data=codec.dumps(payload), headers=JSON_HEADERS) as resp:
+                if resp.status >= 400:
+                    text = await resp.text()
+                    self.failed += count
+                    if resp.status >= 500:
+                        self.breaker.record_failure()
+                    else:
+                        self.breaker.record_success()  # backend yanıt veriyor; half_open denemesi biter
+                    self.logger.error(f"[REST] {endpoint} -> {resp.status} {text}")
+                    return FAILED if resp.status >= 500 else REJECTED
+                await resp.read()  # bağlantı havuza dönebilsin diye gövdeyi tüket
+                self.breaker.record_success()
+                self.sent += count
+                if isinstance(payload, list):
+                    self.batches += 1
+                self.logger.debug("[REST] OK %s (%d) -> %s", endpoint, count, resp.status)
+                return SENT
+        except Exception as e:
+            self.failed += count
+            self.breaker.record_failure()
+            self.logger.error(f"[REST] POST {endpoint} failed: {e}")
+            return RETRY
+        finally:
+            self.in_flight -= 1
@@ -1,121 +1,347 @@
 import asyncio
-import json
 import logging
 import websockets
 from datetime import datetime
 from pathlib import Path
 import ssl
-import aiohttp
 import os
-from collections import OrderedDict  # cpId'yi "en başa" koymak için
+import sys
+import uuid
+import itertools
+import time
+from collections import OrderedDict, defaultdict  # cpId'yi "en başa" koymak için
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+# server/ betik dizini olarak çalışır; ortak modüller (ocpp_common) repo kökünde
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from ocpp_common import codec
+from ocpp_common.log_pipeline import setup_logging
+from ocpp_common.metrics import REGISTRY, Counter, Histogram, MetricFamily, DEFAULT_BUCKETS, Sample, merge_families
+from auth_store import AuthorizationStore
+from control_api import ACCEPTED, ERROR, OFFLINE, REJECTED, TIMEOUT, ControlAPI
+from ocpp_schemas import CENTRAL_SYSTEM_REQUEST_SCHEMAS, REQUEST_SCHEMAS
+from outbox import CircuitBreaker, Outbox
+from peer_link import PeerServer, peer_request
+from rest_forwarder import RestForwarder
+from validation import (
+    FORMATION_VIOLATION, INTERNAL_ERROR, NOT_IMPLEMENTED, NOT_SUPPORTED,
+    ValidationError, compile_schemas,
 )
 
-ALLOWED_CP_IDS = ["VESTEL-EVC-001","VESTEL-EVC-002","VESTEL-EVC-003","VESTEL-EVC-004","VESTEL-EVC-005","VESTEL-EVC-006","VESTEL-EVC-007","VESTEL-EVC-008"]
+# İzinli CP kuralları (bkz. auth_store.py); dosya değişince otomatik yeniden yüklenir
+DEFAULT_AUTH_FILE = Path(__file__).resolve().parent / "authorized_cp_ids.txt"
+
+# Şemalar süreç başına bir kez derlenir (bkz. validation.py)
+REQUEST_VALIDATORS = compile_schemas(REQUEST_SCHEMAS)
+
+# Süreç geneli metrikler (bkz. ocpp_common/metrics.py, /metrics kontrol API'de).
+# Etiketler yalnızca bilinen action'lar / hata kodlarıdır; kardinalite sınırlı.
+FRAMES_RECEIVED = Counter("ocpp_frames_received_total", "OCPP CALL frames received from charge points", ["action"])
+CALL_ERRORS_SENT = Counter("ocpp_call_errors_sent_total", "CALLERROR frames sent to charge points", ["code"])
+CALL_DURATION = Histogram("ocpp_process_call_seconds", "CALL validation + handler time", ["action"],
+                          buckets=(0.00005, 0.0001, 0.00025) + DEFAULT_BUCKETS)
+CONNECTIONS_REJECTED = Counter("ocpp_connections_rejected_total", "Connections rejected by authorization")
+UNKNOWN_ACTION = "_unknown"
+
+
+def build_ssl_context(cert_file=None, key_file=None, num_tickets=None):
+    """
+    Server TLS context'i. TLS 1.3 oturum biletleri açıkça etkin: client'lar
+    yeniden bağlanırken tam handshake yerine bileti sunar (bkz.
+    ocpp_client/client/tls.py). TLS_NUM_TICKETS=0 ile bilet verilmez.
+
+    Bilet anahtarları context kurulurken rastgele üretilir; cluster.py
+    context'i fork'tan önce kurar ki tüm worker'lar aynı anahtarları
+    paylaşsın ve SO_REUSEPORT başka worker'a düşen bağlantıyı da devam
+    ettirebilsin.
+    """
+    ssl_cert = Path(cert_file or os.environ.get("TLS_CERT_FILE", "cert.pem"))
+    ssl_key = Path(key_file or os.environ.get("TLS_KEY_FILE", "key.pem"))
+    if not ssl_cert.exists() or not ssl_key.exists():
+        raise FileNotFoundError(f"{ssl_cert} or {ssl_key} not found.")
+    ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    ssl_context.load_cert_chain(str(ssl_cert), str(ssl_key))
+    if num_tickets is None:
+        num_tickets = int(os.environ.get("TLS_NUM_TICKETS", "2"))
+    if num_tickets > 0:
+        ssl_context.options &= ~ssl.OP_NO_TICKET
+        ssl_context.num_tickets = num_tickets
+    else:
+        ssl_context.options |= ssl.OP_NO_TICKET
+        ssl_context.num_tickets = 0
+    return ssl_context
+
+
+class OCPPCallError(Exception):
+    """Server'ın gönderdiği CALL'a CP CALLERROR ile cevap verdi."""
+
+    def __init__(self, action: str, code: str, description: str = "", details: dict = None):
+        super().__init__(f"{action}: {code} - {description}")
+        self.action = action
+        self.code = code
+        self.description = description
+        self.details = details or {}
+
+
+class ChargePointOffline(Exception):
+    pass
+
+
+def _utc_now() -> str:
+    return datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+# OCPP şemasına dokunmadan, REST'e giderken cpId / clientId eklenir.
+# REST tarafındaki model formatına göre payload hazırlanır.
+def _boot_notification_body(cp_id: str, payload: dict) -> OrderedDict:
+    return OrderedDict([
+        ("chargePointVendor",       payload.get("chargePointVendor")),
+        ("chargePointModel",        payload.get("chargePointModel")),
+        ("chargePointSerialNumber", payload.get("chargePointSerialNumber")),
+        ("chargeBoxSerialNumber",   payload.get("chargeBoxSerialNumber")),
+        ("firmwareVersion",         payload.get("firmwareVersion")),
+        ("iccid",                   payload.get("iccid")),
+        ("imsi",                    payload.get("imsi")),
+        ("meterType",               payload.get("meterType")),
+        ("meterSerialNumber",       payload.get("meterSerialNumber")),
+        ("clientId",                cp_id),  # REST modeli bunu bekliyor
+    ])
+
+
+def _heartbeat_body(cp_id: str, payload: dict) -> OrderedDict:
+    return OrderedDict([
+        # Heartbeat.req boş; batch/outbox gecikmesine karşı alınma anı damgalanır
+        ("createdAt",               _utc_now()),
+        ("clientId",                cp_id),
+    ])
+
+
+def _status_notification_body(cp_id: str, payload: dict) -> OrderedDict:
+    return OrderedDict([
+        ("connectorId",             payload.get("connectorId")),
+        ("status",                  payload.get("status")),
+        ("errorCode",               payload.get("errorCode")),
+        ("info",                    payload.get("info")),
+        ("timestamp",               payload.get("timestamp")),
+        ("vendorId",                payload.get("vendorId")),
+        ("vendorErrorCode",         payload.get("vendorErrorCode")),
+        ("clientId",                cp_id),  # REST modeli bunu bekliyor
+    ])
+
+
+def _meter_values_body(cp_id: str, payload: dict) -> OrderedDict:
+    # meterValue dizisi olduğu gibi gider; backend sampledValue başına satır yazar
+    return OrderedDict([
+        ("connectorId",             payload.get("connectorId")),
+        ("transactionId",           payload.get("transactionId")),
+        ("meterValue",              payload.get("meterValue")),
+        ("clientId",                cp_id),
+    ])
+
+
+# action -> (REST endpoint, gövde oluşturucu)
+REST_ROUTES = {
+    "BootNotification":   ("/bootnotification",    _boot_notification_body),
+    "Heartbeat":          ("/heartbeat",           _heartbeat_body),
+    "MeterValues":        ("/meter-values",        _meter_values_body),
+    "StatusNotification": ("/status-notification", _status_notification_body),
+}
 
 
 class MockOCPPServer:
-    def __init__(self, host="localhost", port=8080, use_ssl=True):
+    def __init__(self, host="localhost", port=8080, use_ssl=True, auth_store=None,
+                 worker_id=None, reuse_port=False, registry=None, peer_port=None,
+                 control_port=None, ssl_context=None):
         self.host = host
         self.port = port
         self.use_ssl = use_ssl
-        self.logger = logging.getLogger("MockOCPPServer")
+        # Cluster modunda ebeveynin kurduğu context (ortak bilet anahtarları)
+        self.ssl_context = ssl_context
+        # AUTH_FILE ile farklı bir kural dosyası verilebilir
+        self.auth_store = auth_store if auth_store is not None else AuthorizationStore(
+            os.environ.get("AUTH_FILE", str(DEFAULT_AUTH_FILE)),
+            reload_interval=float(os.environ.get("AUTH_RELOAD_INTERVAL", "2")),
+        )
+        # Çok süreçli mod (bkz. cluster.py): aynı portu SO_REUSEPORT ile paylaşan
+        # worker'lar, ortak ConnectionRegistry ve worker'lar arası PeerServer
+        self.worker_id = worker_id
+        self.reuse_port = reuse_port
+        self.registry = registry
+        self.peer_port = peer_port
+        self._peer_server = None
+        # Yerel kontrol API'si (bkz. control_api.py); CONTROL_PORT=0 ile kapatılır
+        self.control_port = control_port if control_port is not None else int(os.environ.get("CONTROL_PORT", "8090") or 0)
+        self.control_host = os.environ.get("CONTROL_HOST", "127.0.0.1")
+        self._control_api = None
+        name = "MockOCPPServer" if worker_id is None else f"MockOCPPServer[w{worker_id}]"
+        self.logger = logging.getLogger(name)
         self.connected_clients = {}
+        # Server kaynaklı CALL'lar: cp_id -> {message_id: (action, future)}
+        self._pending_calls = {}
+        # OCPP_VALIDATE=0 ile şema doğrulaması kapatılabilir (ölçüm için)
+        self.validate_payloads = os.environ.get("OCPP_VALIDATE", "1") != "0"
+        # Worker'lar farklı aralıklardan transactionId verir (int32 sınırı içinde)
+        self._transaction_ids = itertools.count((worker_id or 0) * 100_000_000 + 1)
+        # action -> handler(cp_id, payload) -> CALLRESULT payload
+        self.handlers = {
+            "Authorize":          self.on_authorize,
+            "BootNotification":   self.on_boot_notification,
+            "DataTransfer":       self.on_data_transfer,
+            "Heartbeat":          self.on_heartbeat,
+            "MeterValues":        self.on_meter_values,
+            "StartTransaction":   self.on_start_transaction,
+            "StatusNotification": self.on_status_notification,
+            "StopTransaction":    self.on_stop_transaction,
+        }
         # REST API kök adresi (ENV ile değiştirilebilir)
         self.rest_base = os.environ.get("REST_API_BASE", "http://localhost:3000")
+        # Backend düşükken kayıtlar diske (outbox) yazılır; REST_OUTBOX_DIR="" ile kapatılır
+        outbox_dir = os.environ.get("REST_OUTBOX_DIR", "outbox")
+        if outbox_dir and worker_id is not None:
+            outbox_dir = os.path.join(outbox_dir, f"worker-{worker_id}")  # segmentler worker'a özel
+        outbox = Outbox(
+            outbox_dir,
+            segment_bytes=int(os.environ.get("REST_OUTBOX_SEGMENT_MB", "4")) * 1024 * 1024,
+            max_bytes=int(os.environ.get("REST_OUTBOX_MAX_MB", "256")) * 1024 * 1024,
+        ) if outbox_dir else None
+        # Tek session + bağlantı havuzu + sınırlı kuyruk ile REST forward
+        self.rest_forwarder = RestForwarder(
+            self.rest_base,
+            concurrency=int(os.environ.get("REST_CONCURRENCY", "16")),
+            queue_size=int(os.environ.get("REST_QUEUE_SIZE", "10000")),
+            batch_size=int(os.environ.get("REST_BATCH_SIZE", "500")),
+            batch_interval=int(os.environ.get("REST_BATCH_INTERVAL_MS", "200")) / 1000,
+            outbox=outbox,
+            breaker=CircuitBreaker(
+                failure_threshold=int(os.environ.get("REST_BREAKER_THRESHOLD", "5")),
+                reset_timeout=float(os.environ.get("REST_BREAKER_RESET", "10")),
+            ),
+            replay_rate=float(os.environ.get("REST_REPLAY_RATE", "2000")),
+            poison_threshold=int(os.environ.get("REST_POISON_THRESHOLD", "3")),
+        )
+
+    def collect_metrics(self) -> list:
+        """Scrape anında okunan gauge'lar ve REST forwarder sayaçları."""
+        forwarder = self.rest_forwarder
+        return [
+            MetricFamily("ocpp_connected_charge_points", "gauge", "Charge points connected to this worker",
+                         [Sample("", {}, len(self.connected_clients))]),
+            MetricFamily("ocpp_pending_calls", "gauge", "Server-initiated CALLs awaiting a reply",
+                         [Sample("", {}, self.pending_call_count())]),
+            MetricFamily("ocpp_rest_queue_depth", "gauge", "Records waiting in the REST forward queue",
+                         [Sample("", {}, forwarder.queue_depth)]),
+            MetricFamily("ocpp_rest_in_flight", "gauge", "REST requests in flight",
+                         [Sample("", {}, forwarder.in_flight)]),
+            MetricFamily("ocpp_rest_records_total", "counter", "REST forward records by result", [
+                Sample("", {"result": "sent"}, forwarder.sent),
+                Sample("", {"result": "failed"}, forwarder.failed),
+                Sample("", {"result": "dropped"}, forwarder.dropped),
+                Sample("", {"result": "spilled"}, forwarder.spilled),
+                Sample("", {"result": "replayed"}, forwarder.replayed),
+                Sample("", {"result": "dead_lettered"}, forwarder.dead_lettered),
+            ]),
+            MetricFamily("ocpp_rest_breaker_open", "gauge", "1 while the REST circuit breaker is open",
+                         [Sample("", {}, int(forwarder.breaker.state == CircuitBreaker.OPEN))]),
+        ] + self._tls_families()
+
+    def _tls_families(self) -> list:
+        if self.ssl_context is None:
+            return []
+        # OpenSSL sayaçları: accept_good tamamlanan, hits oturum devamı ile kısalan handshake'ler
+        stats = self.ssl_context.session_stats()
+        return [
+            MetricFamily("ocpp_tls_handshakes_total", "counter", "Completed server TLS handshakes", [
+                Sample("", {"resumed": "true"}, stats["hits"]),
+                Sample("", {"resumed": "false"}, max(0, stats["accept_good"] - stats["hits"])),
+            ]),
+        ]
+
+    async def collect_cluster_metrics(self) -> list:
+        """
+        Cluster modunda tüm worker'ların metrikleri worker etiketiyle birleştirilir
+        (kontrol portu paylaşıldığından scrape herhangi bir worker'a düşebilir).
+        """
+        local = REGISTRY.collect()
+        if self.registry is None:
+            return local
+        groups = {str(self.worker_id): local}
+        for worker_id, port in self.registry.workers().items():
+            if worker_id == self.worker_id:
+                continue
+            try:
+                resp = await peer_request(port, {"op": "metrics"}, timeout=5.0)
+            except (OSError, asyncio.TimeoutError, ValueError) as e:
+                self.logger.warning(f"Worker {worker_id} unreachable for metrics: {e}")
+                continue
+            groups[str(worker_id)] = [
+                MetricFamily(name, kind, doc, [Sample(*sample) for sample in samples])
+                for name, kind, doc, samples in resp.get("families", [])
+            ]
+        return merge_families(groups, "worker")
 
     async def _post_to_rest(self, endpoint: str, payload: dict):
         """
         REST'e POST. payload, cpId'yi de içeren zarf (OrderedDict) olmalı.
+        Gönderim RestForwarder kuyruğu üzerinden, paylaşılan session ile yapılır.
         """
-        url = f"{self.rest_base.rstrip('/')}/{endpoint.lstrip('/')}"
-        self.logger.info(f"[REST] POST payload to {endpoint}: {payload}")  # <- payload logu
-        try:
-            timeout = aiohttp.ClientTimeout(total=5)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(url, json=payload) as resp:
-                    text = await resp.text()
-                    if resp.status >= 400:
-                        try:
-                            error_json = await resp.json()
-                            self.logger.error(f"[REST] {endpoint} -> {resp.status} {error_json}")
-                        except Exception:
-                            self.logger.error(f"[REST] {endpoint} -> {resp.status} {text}")
-                    else:
-                        self.logger.info(f"[REST] OK {endpoint} -> {resp.status}")
-        except Exception as e:
-            self.logger.error(f"[REST] POST {endpoint} failed: {e}")
-
+        self.logger.debug("[REST] Queue payload for %s: %s", endpoint, payload)
+        self.rest_forwarder.submit(endpoint, payload)
 
     async def _log_action_to_rest(self, cp_id: str, action: str, payload: dict):
         """
-        OCPP şemasına dokunmadan, REST'e giderken cpId / clientId eklenir.
-        REST tarafındaki model formatına göre payload hazırlanır.
-        """
-        if action == "BootNotification":
-            body = OrderedDict([
-                ("chargePointVendor",       payload.get("chargePointVendor")),
-                ("chargePointModel",        payload.get("chargePointModel")),
-                ("chargePointSerialNumber", payload.get("chargePointSerialNumber")),
-                ("chargeBoxSerialNumber",   payload.get("chargeBoxSerialNumber")),
-                ("firmwareVersion",         payload.get("firmwareVersion")),
-                ("iccid",                   payload.get("iccid")),
-                ("imsi",                    payload.get("imsi")),
-                ("meterType",               payload.get("meterType")),
-                ("meterSerialNumber",       payload.get("meterSerialNumber")),
-                ("clientId",                cp_id),  # REST modeli bunu bekliyor
-            ])
-            await self._post_to_rest("/bootnotification", body)
-
-        elif action == "Heartbeat":
-            body = OrderedDict([
-                ("createdAt",               payload.get("currentTime")),  # REST modeli DateTime bekliyor
-                ("clientId",                cp_id),
-            ])
-            await self._post_to_rest("/heartbeat", body)
-
-        elif action == "StatusNotification":
-            body = OrderedDict([
-                ("connectorId",             payload.get("connectorId")),
-                ("status",                  payload.get("status")),
-                ("errorCode",               payload.get("errorCode")),
-                ("info",                    payload.get("info")),
-                ("timestamp",               payload.get("timestamp")),
-                ("vendorId",                payload.get("vendorId")),
-                ("vendorErrorCode",         payload.get("vendorErrorCode")),
-                ("clientId",                cp_id),  # REST modeli bunu bekliyor
-            ])
-            await self._post_to_rest("/status-notification", body)
-
-        else:
-            self.logger.debug(f"[REST] No route mapped for action: {action}")
+        REST_ROUTES tablosundan action'a karşılık gelen endpoint ve gövdeyi bul.
+        """
+        route = REST_ROUTES.get(action)
+        if route is None:
+            self.logger.debug("[REST] No route mapped for action: %s", action)
+            return
+        endpoint, build_body = route
+        await self._post_to_rest(endpoint, build_body(cp_id, payload))
 
     async def start(self):
         protocol = "wss" if self.use_ssl else "ws"
         self.logger.info(f"Starting mock OCPP server on {protocol}://{self.host}:{self.port}")
 
-        ssl_context = None
-        if self.use_ssl:
-            ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
-            ssl_cert = Path("cert.pem")
-            ssl_key  = Path("key.pem")
-            if not ssl_cert.exists() or not ssl_key.exists():
+        ssl_context = self.ssl_context
+        if self.use_ssl and ssl_context is None:
+            try:
+                ssl_context = self.ssl_context = build_ssl_context()
+            except FileNotFoundError:
                 self.logger.error("SSL certificate or key file not found!")
-                raise FileNotFoundError("cert.pem or key.pem not found in current directory.")
-            ssl_context.load_cert_chain(str(ssl_cert), str(ssl_key))
-
-        async with websockets.serve(
-            self.handle_client,
-            self.host,
-            self.port,
-            subprotocols=["ocpp1.6"],
-            ssl=ssl_context
-        ):
-            self.logger.info(f"Mock server started on {protocol}://{self.host}:{self.port}")
-            await asyncio.Future()  # Run forever
+                raise
+
+        await self.rest_forwarder.start()
+        self.auth_store.start()
+        REGISTRY.register_collector(self.collect_metrics)
+        if self.peer_port is not None:
+            self._peer_server = PeerServer(self._handle_peer, self.peer_port)
+            await self._peer_server.start()
+        if self.control_port:
+            self._control_api = ControlAPI(self, self.control_port, self.control_host, reuse_port=self.reuse_port)
+            await self._control_api.start()
+        if self.registry is not None:
+            self.registry.register_worker(self.worker_id, os.getpid(), self.peer_port)
+        try:
+            async with websockets.serve(
+                self.handle_client,
+                self.host,
+                self.port,
+                subprotocols=["ocpp1.6"],
+                ssl=ssl_context,
+                reuse_port=self.reuse_port or None,
+            ):
+                self.logger.info(f"Mock server started on {protocol}://{self.host}:{self.port}")
+                await asyncio.Future()  # Run forever
+        finally:
+            if self._control_api is not None:
+                await self._control_api.close()
+            if self._peer_server is not None:
+                await self._peer_server.close()
+            await self.auth_store.close()
+            await self.rest_forwarder.close()
+            REGISTRY.unregister_collector(self.collect_metrics)
 
     async def handle_client(self, websocket, path):
         charge_point_id = path.strip('/')  # cp_id'yi URL'den alıyoruz
@@ -123,66 +349,339 @@ class MockOCPPServer:
 
         # Bağlantıyı kabul etmeden önce cp_id kontrolü yapalım
         # handle_client metodunda, bağlantı reddedildiğinde:
-        if charge_point_id not in ALLOWED_CP_IDS:
+        if not self.auth_store.is_authorized(charge_point_id):
+            CONNECTIONS_REJECTED.inc()
             await websocket.close(code=1008, reason="Charge point not authorized")  # 1008: Policy Violation
-            self.logger.warning(f"❌ Connection REJECTED: {charge_point_id} is NOT in allowed list")
+            self.logger.warning(f"❌ Connection REJECTED: {charge_point_id} is NOT authorized")
             return
         
-        self.logger.info(f"Client connected: {charge_point_id} from {client_addr}")
+        self.logger.info("Client connected: %s from %s", charge_point_id, client_addr)
         self.connected_clients[charge_point_id] = websocket
+        if self.registry is not None:
+            self.registry.register(charge_point_id, self.worker_id)
 
         try:
             async for message in websocket:
                 await self.handle_message(websocket, charge_point_id, message)
         except websockets.exceptions.ConnectionClosed:
-            self.logger.info(f"Client disconnected: {charge_point_id}")
+            self.logger.info("Client disconnected: %s", charge_point_id)
         finally:
-            self.connected_clients.pop(charge_point_id, None)
+            # Aynı CP yeniden bağlandıysa yeni websocket'i silme
+            if self.connected_clients.get(charge_point_id) is websocket:
+                self.connected_clients.pop(charge_point_id, None)
+                self._fail_pending_calls(charge_point_id)
+                if self.registry is not None:
+                    self.registry.unregister(charge_point_id, self.worker_id)
+
+    async def send_to_cp(self, charge_point_id: str, frame: list) -> bool:
+        """
+        CP'ye ham OCPP çerçevesi gönder. CP başka bir worker'a bağlıysa
+        registry'den sahibini bulup PeerServer üzerinden iletir.
+        """
+        websocket = self.connected_clients.get(charge_point_id)
+        if websocket is not None:
+            await websocket.send(codec.dumps_text(frame))
+            return True
+        if self.registry is None:
+            return False
+        owner = self.registry.owner(charge_point_id)
+        if owner is None or owner[0] == self.worker_id:
+            return False
+        resp = await peer_request(owner[1], {"op": "send", "cp_id": charge_point_id, "frame": frame})
+        return bool(resp.get("ok"))
+
+    async def cluster_status(self) -> dict:
+        """
+        Tüm worker'ların bağlı CP'leri. Tek süreçli modda sadece yerel liste.
+        """
+        if self.registry is None:
+            return {"workers": {"0": sorted(self.connected_clients)}, "total": len(self.connected_clients)}
+        workers = {str(self.worker_id): sorted(self.connected_clients)}
+        for worker_id, port in self.registry.workers().items():
+            if worker_id == self.worker_id:
+                continue
+            try:
+                resp = await peer_request(port, {"op": "status"}, timeout=5.0)
+                workers[str(worker_id)] = resp.get("connected", [])
+            except (OSError, asyncio.TimeoutError, ValueError) as e:
+                self.logger.warning(f"Worker {worker_id} unreachable: {e}")
+        return {"workers": workers, "total": sum(len(v) for v in workers.values())}
+
+    async def _handle_peer(self, request: dict) -> dict:
+        op = request.get("op")
+        if op == "status":
+            return {"ok": True, "worker_id": self.worker_id, "connected": sorted(self.connected_clients)}
+        if op == "send":
+            websocket = self.connected_clients.get(request.get("cp_id"))
+            if websocket is None:
+                return {"ok": False, "error": "not connected"}
+            await websocket.send(codec.dumps_text(request["frame"]))
+            return {"ok": True}
+        if op == "calls":
+            outcomes = await self.call_many(
+                request["action"], request.get("payload", {}), request.get("cp_ids"),
+                request.get("concurrency", 500), request.get("timeout", 10.0),
+            )
+            return {"ok": True, "outcomes": outcomes}
+        if op == "metrics":
+            # NamedTuple'lar her codec backend'inde seri hale gelmez; düz listeye çevrilir
+            families = [[name, kind, doc, [list(sample) for sample in samples]]
+                        for name, kind, doc, samples in REGISTRY.collect()]
+            return {"ok": True, "families": families}
+        return {"ok": False, "error": f"unknown op: {op}"}
+
+    # --- Server kaynaklı CALL'lar ---
+
+    async def call(self, charge_point_id: str, action: str, payload: dict, timeout: float = 30.0) -> dict:
+        """
+        Bu worker'a bağlı CP'ye CALL gönder ve CALLRESULT payload'ını bekle.
+        - CP bağlı değil → ChargePointOffline
+        - CALLERROR      → OCPPCallError
+        - Süre aşımı     → asyncio.TimeoutError
+        """
+        websocket = self.connected_clients.get(charge_point_id)
+        if websocket is None:
+            raise ChargePointOffline(charge_point_id)
+        message_id = str(uuid.uuid4())
+        fut = asyncio.get_running_loop().create_future()
+        pending = self._pending_calls.setdefault(charge_point_id, {})
+        pending[message_id] = (action, fut)
+        try:
+            await websocket.send(codec.dumps_text([2, message_id, action, payload]))
+            return await asyncio.wait_for(fut, timeout)
+        finally:
+            pending.pop(message_id, None)
+            if not pending and self._pending_calls.get(charge_point_id) is pending:
+                del self._pending_calls[charge_point_id]
+
+    def _resolve_reply(self, charge_point_id: str, message: list) -> None:
+        pending = self._pending_calls.get(charge_point_id)
+        entry = pending.pop(message[1], None) if pending else None
+        if entry is None:
+            self.logger.debug("[%s] Reply for unknown/expired id=%s", charge_point_id, message[1])
+            return
+        action, fut = entry
+        if fut.done():
+            return
+        if message[0] == 3:
+            payload = message[2] if isinstance(message[2], dict) else {}
+            fut.set_result(payload)
+        else:
+            code = message[2]
+            description = message[3] if len(message) > 3 else ""
+            details = message[4] if len(message) > 4 else {}
+            fut.set_exception(OCPPCallError(action, code, description, details))
+
+    def _fail_pending_calls(self, charge_point_id: str) -> None:
+        for _, fut in self._pending_calls.pop(charge_point_id, {}).values():
+            if not fut.done():
+                fut.set_exception(ConnectionError(f"{charge_point_id} disconnected"))
+
+    def pending_call_count(self) -> int:
+        return sum(len(p) for p in self._pending_calls.values())
+
+    def connected_cp_ids(self) -> list:
+        """Bağlı CP'ler; cluster modunda registry'deki tüm worker'lar dahil."""
+        if self.registry is None:
+            return list(self.connected_clients)
+        return list(set(self.registry.connections()) | set(self.connected_clients))
+
+    async def call_many(self, action: str, payload: dict, cp_ids=None,
+                        concurrency: int = 500, timeout: float = 10.0) -> dict:
+        """
+        Bu worker'daki CP'lere aynı CALL'u en fazla `concurrency` eşzamanlı
+        istekle gönder. cp_ids=None: bu worker'a bağlı tüm CP'ler.
+        Dönüş: {cp_id: [outcome, detay]} (outcome'lar control_api'de)
+        """
+        targets = list(self.connected_clients) if cp_ids is None else cp_ids
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(cp_id):
+            async with semaphore:
+                try:
+                    conf = await self.call(cp_id, action, payload, timeout)
+                except ChargePointOffline:
+                    return cp_id, [OFFLINE, None]
+                except asyncio.TimeoutError:
+                    return cp_id, [TIMEOUT, None]
+                except OCPPCallError as e:
+                    return cp_id, [ERROR, f"{e.code}: {e.description}"]
+                except (ConnectionError, websockets.exceptions.ConnectionClosed) as e:
+                    return cp_id, [ERROR, f"connection lost: {e}"]
+            status = conf.get("status")
+            # status alanı olmayan conf'lar (ör. GetConfiguration) kabul sayılır
+            return cp_id, [ACCEPTED if status in (None, "Accepted") else REJECTED, status]
+
+        return dict(await asyncio.gather(*(one(cp_id) for cp_id in targets)))
+
+    async def dispatch_command(self, action: str, payload: dict, cp_ids=None,
+                               concurrency: int = 500, timeout: float = 10.0) -> dict:
+        """
+        call_many'nin cluster farkında hali: hedefler sahibi olan worker'lara
+        gruplanır, her worker kendi payını paralel gönderir.
+        """
+        if self.registry is None:
+            return await self.call_many(action, payload, cp_ids, concurrency, timeout)
+
+        workers = self.registry.workers()
+        counts = self.registry.counts()
+        if cp_ids is None:
+            groups = {worker_id: None for worker_id in workers}
+            groups[self.worker_id] = None
+            outcomes = {}
+        else:
+            owners = self.registry.connections()
+            groups = defaultdict(list)
+            outcomes = {}
+            for cp_id in cp_ids:
+                worker_id = self.worker_id if cp_id in self.connected_clients else owners.get(cp_id)
+                if worker_id is None or (worker_id != self.worker_id and worker_id not in workers):
+                    outcomes[cp_id] = [OFFLINE, None]
+                else:
+                    groups[worker_id].append(cp_id)
+
+        async def run_group(worker_id, group):
+            if worker_id == self.worker_id:
+                return await self.call_many(action, payload, group, concurrency, timeout)
+            # Worker kendi payını `concurrency`'lik dalgalar halinde gönderir
+            size = len(group) if group is not None else counts.get(worker_id, 0)
+            waves = max(1, -(-size // concurrency))
+            try:
+                resp = await peer_request(workers[worker_id], {
+                    "op": "calls", "action": action, "payload": payload, "cp_ids": group,
+                    "concurrency": concurrency, "timeout": timeout,
+                }, timeout=timeout * waves + 30.0)
+                return resp.get("outcomes", {})
+            except (OSError, asyncio.TimeoutError, ValueError) as e:
+                self.logger.warning(f"Worker {worker_id} unreachable for {action}: {e}")
+                return {cp_id: [ERROR, f"worker {worker_id} unreachable"] for cp_id in group or ()}
+
+        for result in await asyncio.gather(*(run_group(w, g) for w, g in groups.items())):
+            outcomes.update(result)
+        return outcomes
+
+
+    async def _send_call_error(self, websocket, message_id, code: str, description: str, details: dict = None):
+        CALL_ERRORS_SENT.labels(code).inc()
+        await websocket.send(codec.dumps_text([4, message_id, code, description, details or {}]))
+        self.logger.warning("Sent CALLERROR %s for %s: %s", code, message_id, description)
 
-            
     async def handle_message(self, websocket, charge_point_id, raw_message):
         try:
-            message = json.loads(raw_message)
-            message_type = message[0]
-            message_id   = message[1]
-            action       = message[2]
-            payload      = message[3] if len(message) > 3 else {}
+            message = codec.loads(raw_message)
+        except ValueError as e:
+            # Mesaj id'si okunamadığı için CALLERROR ile cevaplanamaz
+            self.logger.warning("[%s] Invalid JSON frame: %s", charge_point_id, e)
+            return
 
-            self.logger.info(f"[{charge_point_id}] Received {action}: {payload}")
+        if not isinstance(message, list) or len(message) < 3 or not isinstance(message[1], str):
+            self.logger.warning("[%s] Malformed OCPP frame dropped: %.200r", charge_point_id, raw_message)
+            return
 
+        message_type = message[0]
+        message_id   = message[1]
+        try:
             if message_type == 2:  # CALL
-                response = await self.process_call(action, payload)
-                response_message = [3, message_id, response]
+                await self.handle_call(websocket, charge_point_id, message)
+            elif message_type in (3, 4):
+                self._resolve_reply(charge_point_id, message)
+            else:
+                await self._send_call_error(websocket, message_id, FORMATION_VIOLATION,
+                                            f"Unknown message type: {message_type!r}")
+        except websockets.exceptions.ConnectionClosed:
+            raise
+        except Exception as e:
+            self.logger.error("Error processing message from %s: %s", charge_point_id, e)
+
+    async def handle_call(self, websocket, charge_point_id, message):
+        message_id = message[1]
+        if len(message) != 4 or not isinstance(message[2], str) or not isinstance(message[3], dict):
+            await self._send_call_error(websocket, message_id, FORMATION_VIOLATION,
+                                        "CALL must be [2, uniqueId, action, payload]")
+            return
+        action  = message[2]
+        payload = message[3]
 
-                await websocket.send(json.dumps(response_message))
-                self.logger.info(f"[{charge_point_id}] Sent response: {response}")
+        # Lazy %-stil: örneklenen / seviyesi kapalı kayıtlar hiç formatlanmaz (bkz. log_pipeline)
+        log_extra = {"ocpp_action": action, "cp_id": charge_point_id}
+        self.logger.info("[%s] Received %s: %s", charge_point_id, action, payload, extra=log_extra)
 
-                # REST'e cpId eklenmiş zarfı gönder (asenkron)
-                asyncio.create_task(self._log_action_to_rest(charge_point_id, action, payload))
+        handler = self.handlers.get(action)
+        FRAMES_RECEIVED.labels(action if handler is not None else UNKNOWN_ACTION).inc()
+        if handler is None:
+            # Bilinen ama CP'den gelmemesi gereken action'lar NotSupported
+            code = NOT_SUPPORTED if action in CENTRAL_SYSTEM_REQUEST_SCHEMAS else NOT_IMPLEMENTED
+            await self._send_call_error(websocket, message_id, code, f"Unknown action: {action}")
+            return
 
-            # (CALLRESULT ve CALLERROR'ı özel forward etmek istersen burada ekleyebilirsin)
+        started = time.perf_counter()
+        if self.validate_payloads:
+            try:
+                REQUEST_VALIDATORS[action](payload)
+            except ValidationError as e:
+                await self._send_call_error(websocket, message_id, e.code, str(e), {"path": e.path})
+                return
 
+        try:
+            response = await handler(charge_point_id, payload)
         except Exception as e:
-            self.logger.error(f"Error processing message from {charge_point_id}: {e}")
-
-    async def process_call(self, action, payload):
-        if action == "BootNotification":
-            return {
-                "status": "Accepted",
-                "currentTime": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
-                "interval": 60  # Heartbeat interval (saniye)
-            }
-        elif action == "Heartbeat":
-            return {
-                "currentTime": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.%fZ")
-            }
-        elif action == "StatusNotification":
-            return {}
-        else:
-            self.logger.warning(f"Unknown action: {action}")
-            return {}
+            self.logger.exception("[%s] %s handler failed", charge_point_id, action)
+            await self._send_call_error(websocket, message_id, INTERNAL_ERROR, str(e))
+            return
+        CALL_DURATION.labels(action).observe(time.perf_counter() - started)
+
+        await websocket.send(codec.dumps_text([3, message_id, response]))
+        self.logger.info("[%s] Sent response: %s", charge_point_id, response, extra=log_extra)
+
+        # REST'e cpId eklenmiş zarfı forwarder kuyruğuna bırak (beklemeden)
+        await self._log_action_to_rest(charge_point_id, action, payload)
+
+    async def process_call(self, action, payload, charge_point_id=None):
+        """
+        Doğrulama yapmadan handler tablosundan cevap üret. Bilinmeyen action -> None.
+        """
+        handler = self.handlers.get(action)
+        if handler is None:
+            self.logger.warning("Unknown action: %s", action)
+            return None
+        return await handler(charge_point_id, payload)
+
+    # --- OCPP 1.6 Core: Charge Point -> Central System ---
+
+    async def on_authorize(self, cp_id, payload):
+        return {"idTagInfo": {"status": "Accepted"}}
+
+    async def on_boot_notification(self, cp_id, payload):
+        return {
+            "status": "Accepted",
+            "currentTime": _utc_now(),
+            "interval": 60  # Heartbeat interval (saniye)
+        }
+
+    async def on_data_transfer(self, cp_id, payload):
+        # Vendor'a özel mesaj tanımı yok
+        return {"status": "UnknownVendorId"}
+
+    async def on_heartbeat(self, cp_id, payload):
+        return {"currentTime": _utc_now()}
+
+    async def on_meter_values(self, cp_id, payload):
+        return {}
+
+    async def on_start_transaction(self, cp_id, payload):
+        return {
+            "transactionId": next(self._transaction_ids),
+            "idTagInfo": {"status": "Accepted"},
+        }
+
+    async def on_status_notification(self, cp_id, payload):
+        return {}
+
+    async def on_stop_transaction(self, cp_id, payload):
+        return {"idTagInfo": {"status": "Accepted"}} if "idTag" in payload else {}
 
 async def main():
+    setup_logging()
     server = MockOCPPServer()
     await server.start()
 
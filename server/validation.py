@@ -0,0 +1,134 @@
+"""
+OCPP 1.6 JSON şema doğrulayıcısı.
+
+Şemalar (bkz. ocpp_schemas.py) açılışta bir kez iç içe closure'lara derlenir;
+mesaj başına şema sözlüğü yorumlanmaz. Derlenmiş doğrulayıcı geçerli payload
+için None döner, ihlalde OCPP-J CALLERROR koduyla ValidationError fırlatır.
+
+Desteklenen anahtar kelimeler OCPP 1.6 şemalarında kullanılanlarla sınırlıdır:
+type, properties, required, additionalProperties, items, enum, maxLength,
+format (date-time).
+"""
+import re
+
+# OCPP-J 1.6 CALLERROR kodları (yazım hatası spesifikasyondan geliyor: Occurence)
+FORMATION_VIOLATION = "FormationViolation"
+NOT_IMPLEMENTED = "NotImplemented"
+NOT_SUPPORTED = "NotSupported"
+INTERNAL_ERROR = "InternalError"
+PROTOCOL_ERROR = "ProtocolError"
+OCCURENCE_CONSTRAINT_VIOLATION = "OccurenceConstraintViolation"
+PROPERTY_CONSTRAINT_VIOLATION = "PropertyConstraintViolation"
+TYPE_CONSTRAINT_VIOLATION = "TypeConstraintViolation"
+
+# Saat dilimi eki opsiyonel: mevcut client'lar naive zaman damgası da gönderiyor
+_DATE_TIME = re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?(Z|[+-]\d{2}:?\d{2})?")
+
+
+class ValidationError(Exception):
+    def __init__(self, code: str, path: str, message: str):
+        super().__init__(f"{path}: {message}")
+        self.code = code
+        self.path = path
+
+
+def _is_integer(value):
+    return type(value) is int
+
+
+def _is_number(value):
+    return type(value) in (int, float)
+
+
+_TYPE_CHECKS = {
+    "string": lambda value: type(value) is str,
+    "integer": _is_integer,
+    "number": _is_number,
+    "boolean": lambda value: type(value) is bool,
+    "object": lambda value: type(value) is dict,
+    "array": lambda value: type(value) is list,
+}
+
+
+def _compile_object(schema: dict, path: str):
+    properties = {
+        name: compile_schema(sub, f"{path}.{name}")
+        for name, sub in schema.get("properties", {}).items()
+    }
+    required = tuple(schema.get("required", ()))
+    closed = schema.get("additionalProperties", True) is False
+
+    def validate(value):
+        if type(value) is not dict:
+            raise ValidationError(TYPE_CONSTRAINT_VIOLATION, path, "expected object")
+        for name in required:
+            if name not in value:
+                raise ValidationError(OCCURENCE_CONSTRAINT_VIOLATION, f"{path}.{name}", "required property missing")
+        for name, item in value.items():
+            check = properties.get(name)
+            if check is not None:
+                check(item)
+            elif closed:
+                raise ValidationError(FORMATION_VIOLATION, f"{path}.{name}", "unexpected property")
+
+    return validate
+
+
+def _compile_array(schema: dict, path: str):
+    items = compile_schema(schema["items"], f"{path}[]") if "items" in schema else None
+
+    def validate(value):
+        if type(value) is not list:
+            raise ValidationError(TYPE_CONSTRAINT_VIOLATION, path, "expected array")
+        if items is not None:
+            for item in value:
+                items(item)
+
+    return validate
+
+
+def _compile_scalar(schema: dict, path: str):
+    kind = schema.get("type")
+    type_check = _TYPE_CHECKS.get(kind)
+    enum = frozenset(schema["enum"]) if "enum" in schema else None
+    max_length = schema.get("maxLength")
+    date_time = schema.get("format") == "date-time"
+
+    # Sadece tip kontrolü olan alanlar (çoğunluk) için en kısa yol
+    if enum is None and max_length is None and not date_time:
+        def validate(value):
+            if not type_check(value):
+                raise ValidationError(TYPE_CONSTRAINT_VIOLATION, path, f"expected {kind}")
+        return validate
+
+    def validate(value):
+        if type_check is not None and not type_check(value):
+            raise ValidationError(TYPE_CONSTRAINT_VIOLATION, path, f"expected {kind}")
+        if enum is not None and value not in enum:
+            raise ValidationError(PROPERTY_CONSTRAINT_VIOLATION, path, f"{value!r} is not an allowed value")
+        if max_length is not None and len(value) > max_length:
+            raise ValidationError(PROPERTY_CONSTRAINT_VIOLATION, path, f"longer than {max_length} characters")
+        if date_time and _DATE_TIME.fullmatch(value) is None:
+            raise ValidationError(PROPERTY_CONSTRAINT_VIOLATION, path, "not a valid date-time")
+
+    return validate
+
+
+def compile_schema(schema: dict, path: str = "$"):
+    """
+    Şemayı doğrulayıcı fonksiyona derle. Tip kontrolleri, zorunlu alanlar ve
+    enum kümeleri derleme anında hazırlanır.
+    """
+    kind = schema.get("type")
+    if kind == "object":
+        return _compile_object(schema, path)
+    if kind == "array":
+        return _compile_array(schema, path)
+    if kind is None:
+        return lambda value: None
+    return _compile_scalar(schema, path)
+
+
+def compile_schemas(schemas: dict) -> dict:
+    """action -> derlenmiş doğrulayıcı"""
+    return {action: compile_schema(schema) for action, schema in schemas.items()}
@@ -1,21 +1,24 @@
 #   uvicorn sim_manager.app:app --port 9000
 from __future__ import annotations
 
-import os
+import asyncio
+import json
 import sys
-import socket
 import logging
 from pathlib import Path
-from subprocess import Popen
 from typing import Optional, List
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 
 from pydantic import BaseModel, Field, model_validator
 
-from .process_store import store, ClientProcess
+from ocpp_common.metrics import CONTENT_TYPE, REGISTRY, Counter, Gauge, Histogram, merge_families, render
+from .process_store import store
+from .supervisor import STOP_TIMEOUT, supervisor
+from . import spawn_jobs, worker_pool
 
 # ------------------------------------------------------------
 # Genel ayar
@@ -34,15 +37,28 @@ STATIC_DIR = BASE_DIR / "static"
 app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
 templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
 
+# ------------------------------------------------------------
+# Metrikler (GET /metrics, Prometheus text)
+# ------------------------------------------------------------
+UI_CLIENTS = Gauge("sim_ui_clients", "UI client processes tracked by the manager")
+FLEET_CLIENTS = Gauge("sim_fleet_clients", "Headless clients hosted by fleet workers")
+WORKERS = Gauge("sim_fleet_workers", "Fleet worker processes")
+UI_CLIENTS.set_function(lambda: len(store.clients))
+FLEET_CLIENTS.set_function(lambda: len(store.fleet_clients))
+WORKERS.set_function(lambda: len(store.workers))
+SPAWN_SECONDS = Histogram("sim_spawn_request_seconds", "Duration of a /clients/spawn request", ["mode"])
+SPAWNED = Counter("sim_clients_spawned_total", "Clients started", ["mode"])
+SPAWN_FAILURES = Counter("sim_spawn_failures_total", "Failed spawn requests", ["mode"])
+SPAWN_THROUGHPUT = Gauge("sim_spawn_clients_per_second", "Throughput of the last completed spawn job", ["mode"])
+REGISTRY.register_collector(supervisor.collect_metrics)
+
 # ------------------------------------------------------------
 # Yardımcılar
 # ------------------------------------------------------------
-def _client_entry_module(ui: bool) -> list[str]:
+def _client_entry_module() -> list[str]:
     # UI'li client'ı paket olarak çalıştır (import sorunlarını çözmek için -m kullanıyoruz)
-    if ui:
-        return [sys.executable, "-m", "ocpp_client.backend.main"]
-    else:
-        return [sys.executable, "-m", "ocpp_client.run_client"]  # headless kullanırsan ekleyebilirsin
+    # Headless client'lar worker_pool üzerinden fleet worker'larında çalışır
+    return [sys.executable, "-m", "ocpp_client.backend.main"]
 
 def _client_scheme() -> str:
     """
@@ -52,24 +68,6 @@ def _client_scheme() -> str:
     key  = ROOT_DIR / "ocpp_client" / "backend" / "key.pem"
     return "https" if cert.exists() and key.exists() else "http"
 
-def _port_in_use(port: int, host: str = "127.0.0.1") -> bool:
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        s.settimeout(0.2)
-        return s.connect_ex((host, port)) == 0
-
-def _next_free_port(start_from: int) -> int:
-    p = start_from
-    while _port_in_use(p):
-        p += 1
-    return p
-
-def _is_alive(pid: int) -> bool:
-    try:
-        os.kill(pid, 0)
-        return True
-    except Exception:
-        return False
-
 def _ui_url(port: int, cp_id: str) -> str:
     """
     Client UI linkinde CP_ID görünsün diye query param ekler.
@@ -81,10 +79,14 @@ def _ui_url(port: int, cp_id: str) -> str:
 # ------------------------------------------------------------
 # Modeller
 # ------------------------------------------------------------
+# Her UI'li client ayrı süreç (uvicorn + FastAPI); bu yüzden ayrı bir üst sınır
+MAX_UI_CLIENTS = 200
+MAX_FLEET_CLIENTS = 50_000
+
 class SpawnReq(BaseModel):
     # 1) prefix + count ile üretim
     prefix: Optional[str] = Field(None, max_length=64, description="Örn: CP-IZMIR")
-    count: Optional[int]  = Field(None, ge=1, le=200)
+    count: Optional[int]  = Field(None, ge=1, le=MAX_FLEET_CLIENTS)
     start_index: int      = Field(1, ge=1)
 
     # 2) veya doğrudan id listesi
@@ -94,7 +96,8 @@ class SpawnReq(BaseModel):
     city: Optional[str] = Field(None, max_length=64)
     server_url: str     = Field("wss://localhost:8080", description="OCPP server adresi (wss:// veya ws://)")
     base_port: int      = Field(8101, description="İlk UI portu (otomatik artar)")
-    ui: bool            = Field(True, description="True: UI'li client")
+    ui: bool            = Field(True, description="True: UI'li client (CP başına süreç), False: headless fleet worker'ları")
+    wait: bool          = Field(True, description="False: hemen job_id dön, ilerleme /clients/spawn/jobs/{id}")
 
     @model_validator(mode="after")
     def _validate_source(self) -> "SpawnReq":
@@ -102,6 +105,11 @@ class SpawnReq(BaseModel):
             raise ValueError("ids ile prefix/count birlikte verilemez.")
         if not self.ids and not (self.prefix and self.count):
             raise ValueError("Ya ids verin ya da prefix + count verin.")
+        total = len(self.ids) if self.ids else self.count
+        if self.ui and total > MAX_UI_CLIENTS:
+            raise ValueError(f"UI'li client en fazla {MAX_UI_CLIENTS}; daha fazlası için ui=false (fleet) kullanın.")
+        if total > MAX_FLEET_CLIENTS:
+            raise ValueError(f"Tek istekte en fazla {MAX_FLEET_CLIENTS} client.")
         return self
 
 class SpawnResult(BaseModel):
@@ -109,6 +117,7 @@ class SpawnResult(BaseModel):
     pid: int
     ui: Optional[str] = None
     city: Optional[str] = None
+    worker: Optional[int] = None
 
 # ------------------------------------------------------------
 # UI
@@ -117,17 +126,30 @@ class SpawnResult(BaseModel):
 def dashboard(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
 
+@app.on_event("shutdown")
+def shutdown():
+    # Çocuklar kendi süreç gruplarında; Ctrl+C onlara ulaşmaz, burada kapatılır
+    supervisor.shutdown(graceful=True)
+
 @app.get("/health")
 def health():
-    # Ayakta ve kaç client var bilgisi
-    alive = 0
-    for meta in list(store.clients.values()):
-        if _is_alive(meta.pid):
-            alive += 1
-        else:
-            # ölmüşse temizle
-            del store.clients[meta.cp_id]
-    return {"ok": True, "clients": alive, "scheme": _client_scheme(), "base_port": store.base_port}
+    # Ayakta ve kaç client var bilgisi; ölenleri supervisor store'dan zaten düşürür
+    alive = len(store.clients)
+    return {
+        "ok": True,
+        "clients": alive + len(store.fleet_clients),
+        "ui_clients": alive,
+        "fleet_clients": len(store.fleet_clients),
+        "workers": len(store.workers),
+        "scheme": _client_scheme(),
+        "base_port": store.base_port,
+    }
+
+@app.get("/metrics")
+def metrics():
+    # Fleet worker'larının client metrikleri worker etiketiyle eklenir
+    families = REGISTRY.collect() + merge_families(worker_pool.collect_metrics(), "worker")
+    return Response(render(families).encode("utf-8"), headers={"Content-Type": CONTENT_TYPE})
 
 # ------------------------------------------------------------
 # API: Clients
@@ -137,37 +159,48 @@ def list_clients():
     scheme = _client_scheme()
     out = []
     for cp_id, meta in list(store.clients.items()):
-        if not _is_alive(meta.pid):
-            del store.clients[cp_id]
-            continue
         out.append({
             "cp_id": cp_id,
             "pid": meta.pid,
             "ui": _ui_url(meta.port, cp_id), 
             "city": meta.city
         })
+    # Headless CP'ler: sahip worker'lara kontrol kanalından sorulur
+    out.extend(worker_pool.list_clients())
     return out
 
+@app.get("/processes")
+def list_processes():
+    # Supervisor durum tablosu: pid, state (running/backoff), restarts, uptime
+    return supervisor.snapshot()
+
 @app.post("/clients/kill/{cp_id}")
-def kill_client(cp_id: str):
-    meta = store.clients.get(cp_id)
-    if not meta:
+def kill_client(cp_id: str, graceful: bool = False, timeout: float = STOP_TIMEOUT):
+    """graceful=true: önce SIGTERM, timeout saniye sonra hâlâ çalışıyorsa SIGKILL."""
+    if cp_id in store.fleet_clients:
+        try:
+            worker_pool.kill(cp_id)
+        except worker_pool.WorkerError as e:
+            # CP kayıttan düştü; worker'da hâlâ çalışıyor olabilir
+            raise HTTPException(502, f"CP dropped, but {e}")
+        return {"status": "killed", "cp_id": cp_id}
+    if store.clients.pop(cp_id, None) is None:
         raise HTTPException(404, "Client not found")
-    store.kill_pid(meta.pid)
-    del store.clients[cp_id]
+    supervisor.stop("ui", cp_id, graceful=graceful, timeout=timeout)
     return {"status": "killed", "cp_id": cp_id}
 
 @app.post("/clients/kill-all")
-def kill_all():
-    count = 0
-    for cp_id, meta in list(store.clients.items()):
-        store.kill_pid(meta.pid)
-        del store.clients[cp_id]
-        count += 1
+def kill_all(graceful: bool = False, timeout: float = STOP_TIMEOUT):
+    # UI'li client'ların hepsi tek süreç grubunda: tek killpg
+    count = len(store.clients)
+    supervisor.stop_kind("ui", graceful=graceful, timeout=timeout)
+    store.clients.clear()
+    # Worker'lar ayakta kalır, sadece barındırdıkları CP'ler kapatılır
+    count += worker_pool.kill_all()
     return {"status": "killed", "count": count}
 
 @app.post("/clients/spawn")
-def spawn_clients(req: SpawnReq):
+async def spawn_clients(req: SpawnReq):
     """
     Örnek 1 (prefix + count):
     {
@@ -188,60 +221,83 @@ def spawn_clients(req: SpawnReq):
       "base_port": 8120,
       "ui": true
     }
-    """
-    # Port sayacını çağrıdan gelen base_port'a çek
-    store.set_base_port(req.base_port)
 
-    # log klasörleri
-    logs = ROOT_DIR / "logs" / "clients"
-    logs.mkdir(parents=True, exist_ok=True)
-
-    scheme = _client_scheme()
-    env_template = os.environ.copy()
+    ui=false ise CP'ler SIM_WORKERS adet fleet worker'ına dağıtılır
+    (varsayılan: CPU sayısı); base_port kullanılmaz.
 
+    Spawn arka planda bir iş olarak yürür (bkz. spawn_jobs.py). wait=true
+    (varsayılan) iş bitince sonuç listesini döner; wait=false hemen
+    {"job_id", ...} döner, ilerleme /clients/spawn/jobs/{job_id} ya da
+    .../events (SSE) ile izlenir.
+    """
     # Üretilecek kimliklerin listesini çıkar
     if req.ids:
         ids = req.ids
     else:
         ids = [f"{req.prefix}-{i:03d}" for i in range(req.start_index, req.start_index + (req.count or 0))]
 
-    results: List[SpawnResult] = []
-    cmd = _client_entry_module(ui=req.ui)
-
-    for cp_id in ids:
-        # Kayıtlı ama ölmüşse temizle
-        meta = store.clients.get(cp_id)
-        if meta and not _is_alive(meta.pid):
-            del store.clients[cp_id]
-            meta = None
-
-        # Hâlâ çalışıyorsa atla
-        if meta:
-            continue
-
-        # Uygun ve boş bir port bul
-        port = _next_free_port(store.next_port())
-
-        # ENV'leri hazırla
-        env = env_template.copy()
-        env["APP_PORT"] = str(port)
-        env["CP_ID"] = cp_id
-        env["SERVER_URL"] = req.server_url  # senin serverın: wss:// ... (TLS varsa)
-
-        # stdout/stderr logları
-        out = open(logs / f"{cp_id}.out", "ab")
-        err = open(logs / f"{cp_id}.err", "ab")
-
-        # Proje kökünden çalıştır (import yolları için kritik)
-        proc: Popen = Popen(cmd, env=env, cwd=str(ROOT_DIR), stdout=out, stderr=err)
-
-        store.clients[cp_id] = ClientProcess(pid=proc.pid, port=port, cp_id=cp_id, city=req.city)
-        results.append(SpawnResult(
-            cp_id=cp_id,
-            pid=proc.pid,
-            ui=_ui_url(port, cp_id) if req.ui else None,   # <<< değişti
-            city=req.city
-        ))
-        logger.info(f"Spawned client: {cp_id} pid={proc.pid} port={port} url={scheme}://localhost:{port}")
-
-    return [r.model_dump() for r in results]
+    if req.ui:
+        # Health'te görünen port başlangıcı
+        store.set_base_port(req.base_port)
+        job = spawn_jobs.submit_ui(ids, _client_entry_module(), req.server_url, req.base_port, req.city,
+                                   _ui_url, on_done=_observe_job)
+    else:
+        job = spawn_jobs.submit("fleet", ids, lambda job: _run_fleet_job(job, ids, req), on_done=_observe_job)
+
+    if not req.wait:
+        return JSONResponse(status_code=202, content={
+            "job_id": job.job_id,
+            "status_url": f"/clients/spawn/jobs/{job.job_id}",
+            "events_url": f"/clients/spawn/jobs/{job.job_id}/events",
+        })
+
+    # Event loop bloklanmaz; bekleme thread havuzunda
+    await asyncio.get_running_loop().run_in_executor(None, job.done_event.wait)
+    if job.state == "failed":
+        status = 503 if job.mode == "fleet" else 500
+        raise HTTPException(status, f"Spawn failed: {job.error}")
+    return [SpawnResult(**row).model_dump() for row in job.results]
+
+def _run_fleet_job(job: spawn_jobs.SpawnJob, ids: List[str], req: SpawnReq) -> None:
+    try:
+        rows = worker_pool.spawn(ids, req.server_url, req.city)
+    except worker_pool.WorkerError as e:
+        raise OSError(f"Fleet workers unavailable: {e}") from e
+    job.results.extend(rows)
+    job.skipped = len(ids) - len(rows)
+
+def _observe_job(job: spawn_jobs.SpawnJob) -> None:
+    if job.state == "failed":
+        SPAWN_FAILURES.labels(job.mode).inc()
+        return
+    SPAWNED.labels(job.mode).inc(len(job.results))
+    SPAWN_SECONDS.labels(job.mode).observe(job.elapsed)
+    if job.results and job.elapsed > 0:
+        SPAWN_THROUGHPUT.labels(job.mode).set(len(job.results) / job.elapsed)
+    logger.info(f"Spawn job {job.job_id}: {len(job.results)} {job.mode} client(s) in {job.elapsed:.2f}s")
+
+@app.get("/clients/spawn/jobs/{job_id}")
+def get_spawn_job(job_id: str):
+    job = spawn_jobs.get_job(job_id)
+    if job is None:
+        raise HTTPException(404, "Job not found")
+    return job.to_dict()
+
+@app.get("/clients/spawn/jobs/{job_id}/events")
+async def stream_spawn_job(job_id: str):
+    """Server-Sent Events: iş bitene kadar ~0.5 sn'de bir ilerleme, en sonda tam sonuç."""
+    job = spawn_jobs.get_job(job_id)
+    if job is None:
+        raise HTTPException(404, "Job not found")
+
+    async def events():
+        last = None
+        while not job.done_event.is_set():
+            progress = job.to_dict(include_results=False)
+            if progress != last:
+                yield f"event: progress\ndata: {json.dumps(progress)}\n\n"
+                last = progress
+            await asyncio.sleep(0.5)
+        yield f"event: done\ndata: {json.dumps(job.to_dict())}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
@@ -2,11 +2,8 @@
 from __future__ import annotations
 
 import itertools
-import os
-import platform
-import signal
-from dataclasses import dataclass
-from typing import Dict, Optional
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Set
 
 
 @dataclass
@@ -17,12 +14,31 @@ class ClientProcess:
     city: Optional[str] = None
 
 
+@dataclass
+class WorkerProcess:
+    """Bir shard'lık CP'yi tek süreçte barındıran headless fleet worker'ı."""
+    worker_id: int
+    pid: int
+    control_port: int
+    cp_ids: Set[str] = field(default_factory=set)
+
+
+@dataclass
+class FleetClient:
+    cp_id: str
+    worker_id: int
+    city: Optional[str] = None
+
+
 class ProcessStore:
     def __init__(self, start_port: int = 8101):
         # Sonradan base_port'ı değiştirmek için setter da koyduk
         self._base_port = start_port
         self._seq = itertools.count(start_port)
         self.clients: Dict[str, ClientProcess] = {}
+        # Headless fleet: worker'lar ve hangi CP'nin hangi worker'da olduğu
+        self.workers: Dict[int, WorkerProcess] = {}
+        self.fleet_clients: Dict[str, FleetClient] = {}
 
     @property
     def base_port(self) -> int:
@@ -35,15 +51,21 @@ class ProcessStore:
     def next_port(self) -> int:
         return next(self._seq)
 
-    @staticmethod
-    def kill_pid(pid: int) -> None:
-        try:
-            if platform.system() == "Windows":
-                os.system(f"taskkill /PID {pid} /F >NUL 2>&1")
-            else:
-                os.kill(pid, signal.SIGKILL)
-        except Exception:
-            pass
+    def assign(self, cp_id: str, worker_id: int, city: Optional[str] = None) -> None:
+        self.fleet_clients[cp_id] = FleetClient(cp_id=cp_id, worker_id=worker_id, city=city)
+        self.workers[worker_id].cp_ids.add(cp_id)
+
+    def unassign(self, cp_id: str) -> Optional[FleetClient]:
+        meta = self.fleet_clients.pop(cp_id, None)
+        if meta is not None and meta.worker_id in self.workers:
+            self.workers[meta.worker_id].cp_ids.discard(cp_id)
+        return meta
+
+    def drop_worker(self, worker_id: int) -> None:
+        worker = self.workers.pop(worker_id, None)
+        if worker is not None:
+            for cp_id in worker.cp_ids:
+                self.fleet_clients.pop(cp_id, None)
 
 
 store = ProcessStore()
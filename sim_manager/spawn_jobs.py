@@ -0,0 +1,256 @@
+# sim_manager/spawn_jobs.py
+"""
+Arka planda, paralel toplu spawn.
+
+POST /clients/spawn bir SpawnJob oluşturur; UI'li client'lar için:
+
+    1) reserve_port_range: base_port'tan başlayarak tek geçişte bind ile
+       yoklanan, ardışık count adet boş port (bağlantı denemesi/timeout yok);
+       takip edilen client'ların ve süren işlerin portları atlanır
+    2) Popen + log dosyaları SIM_SPAWN_CONCURRENCY thread'lik havuzda
+       eşzamanlı açılır; FastAPI worker thread'i beklemez. Süreçler
+       supervisor.py üzerinden açılır; çıkınca store'dan kendiliğinden düşer
+
+ui=false ise worker_pool.spawn aynı iş içinde çalışır. İlerleme
+GET /clients/spawn/jobs/{id} ile sorgulanır ya da .../events (SSE) ile
+izlenir; sonuçta CP/sn throughput raporlanır.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from subprocess import Popen
+from typing import Callable, List, Optional, Set
+
+from .process_store import store, ClientProcess
+from .supervisor import AUTO_RESTART, ManagedProcess, supervisor
+
+logger = logging.getLogger("SimManager.Spawn")
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+SPAWN_CONCURRENCY = int(os.getenv("SIM_SPAWN_CONCURRENCY", "16"))
+MAX_PORT = 65535
+KEEP_JOBS = 50  # bitmiş işlerden en fazla bu kadarı sorgulanabilir kalır
+
+_pool = ThreadPoolExecutor(max_workers=SPAWN_CONCURRENCY, thread_name_prefix="spawn")
+_lock = threading.Lock()
+_reserved: Set[int] = set()  # süren işlerin ayırdığı, henüz store'a yazılmamış portlar
+
+
+def set_concurrency(workers: int) -> None:
+    """Launch havuzunun boyutunu değiştir (benchmark karşılaştırması için)."""
+    global _pool
+    old, _pool = _pool, ThreadPoolExecutor(max_workers=workers, thread_name_prefix="spawn")
+    old.shutdown(wait=False)
+
+
+def _bind_free(port: int, host: str = "127.0.0.1") -> bool:
+    # uvicorn SO_REUSEADDR ile dinler; TIME_WAIT'teki port da kullanılabilir sayılır
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            s.bind((host, port))
+            return True
+        except OSError:
+            return False
+
+
+def reserve_port_range(start: int, count: int) -> List[int]:
+    """
+    start'tan itibaren count adet ardışık boş port bul ve ayır. Dolu port
+    görülünce aralık onun bir sonrasından yeniden başlar (tek geçiş).
+    """
+    with _lock:
+        taken = _reserved | {meta.port for meta in store.clients.values()}
+        run: List[int] = []
+        port = start
+        while len(run) < count:
+            if port > MAX_PORT:
+                raise OSError(f"no {count} consecutive free ports from {start}")
+            if port in taken or not _bind_free(port):
+                run = []
+            else:
+                run.append(port)
+            port += 1
+        _reserved.update(run)
+        return run
+
+
+def release_ports(ports) -> None:
+    with _lock:
+        _reserved.difference_update(ports)
+
+
+@dataclass
+class SpawnJob:
+    job_id: str
+    mode: str
+    total: int
+    state: str = "pending"  # pending | running | done | failed
+    results: List[dict] = field(default_factory=list)
+    errors: List[dict] = field(default_factory=list)
+    skipped: int = 0
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started: Optional[float] = None   # perf_counter
+    finished: Optional[float] = None
+    done_event: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def elapsed(self) -> float:
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.perf_counter()) - self.started
+
+    def to_dict(self, include_results: bool = True) -> dict:
+        elapsed = self.elapsed
+        out = {
+            "job_id": self.job_id,
+            "mode": self.mode,
+            "state": self.state,
+            "total": self.total,
+            "spawned": len(self.results),
+            "failed": len(self.errors),
+            "skipped": self.skipped,
+            "elapsed_s": round(elapsed, 3),
+            "cps_per_sec": round(len(self.results) / elapsed, 1) if elapsed > 0 else None,
+            "error": self.error,
+        }
+        if include_results:
+            out["results"] = list(self.results)
+            out["errors"] = list(self.errors)
+        return out
+
+
+_jobs: "OrderedDict[str, SpawnJob]" = OrderedDict()
+
+
+def get_job(job_id: str) -> Optional[SpawnJob]:
+    return _jobs.get(job_id)
+
+
+def _register(job: SpawnJob) -> None:
+    with _lock:
+        _jobs[job.job_id] = job
+        finished = [j for j in _jobs.values() if j.done_event.is_set()]
+        for old in finished[:max(0, len(finished) - KEEP_JOBS)]:
+            _jobs.pop(old.job_id, None)
+
+
+def _launch(cmd: List[str], env_template: dict, cp_id: str, port: int, server_url: str,
+            logs: Path, popen_kwargs: dict) -> Popen:
+    env = env_template.copy()
+    env["APP_PORT"] = str(port)
+    env["CP_ID"] = cp_id
+    env["SERVER_URL"] = server_url
+    # stdout/stderr logları; Popen kendi kopyasını tutar, bizdekiler kapatılır
+    with open(logs / f"{cp_id}.out", "ab") as out, open(logs / f"{cp_id}.err", "ab") as err:
+        # Proje kökünden çalıştır (import yolları için kritik)
+        return Popen(cmd, env=env, cwd=str(ROOT_DIR), stdout=out, stderr=err, **popen_kwargs)
+
+
+def _forget(entry: ManagedProcess) -> None:
+    # Son çıkış (yeniden başlatılmayacak): aynı süreçse kaydı sil
+    meta = store.clients.get(entry.name)
+    if meta is not None and meta.pid == entry.pid:
+        store.clients.pop(entry.name, None)
+
+
+def _restarted(entry: ManagedProcess) -> None:
+    meta = store.clients.get(entry.name)
+    if meta is not None:
+        meta.pid = entry.pid
+
+
+def _start(cmd: List[str], env_template: dict, cp_id: str, port: int, server_url: str,
+           logs: Path) -> ManagedProcess:
+    return supervisor.start(
+        "ui", cp_id,
+        lambda popen_kwargs: _launch(cmd, env_template, cp_id, port, server_url, logs, popen_kwargs),
+        restart=AUTO_RESTART, on_exit=_forget, on_restart=_restarted,
+    )
+
+
+def _run_ui(job: SpawnJob, ids: List[str], cmd: List[str], server_url: str, base_port: int,
+            city: Optional[str], ui_url: Callable[[int, str], str]) -> None:
+    # Çalışan (ya da fleet'te olan) CP atlanır; ölenler supervisor'ca zaten silinmiştir
+    todo = []
+    for cp_id in ids:
+        if cp_id in store.clients or cp_id in store.fleet_clients:
+            job.skipped += 1
+            continue
+        todo.append(cp_id)
+    job.total = len(todo)
+    if not todo:
+        return
+
+    ports = reserve_port_range(base_port, len(todo))
+    logs = ROOT_DIR / "logs" / "clients"
+    logs.mkdir(parents=True, exist_ok=True)
+    env_template = os.environ.copy()
+    try:
+        futures = {
+            _pool.submit(_start, cmd, env_template, cp_id, port, server_url, logs): (cp_id, port)
+            for cp_id, port in zip(todo, ports)
+        }
+        for fut in as_completed(futures):
+            cp_id, port = futures[fut]
+            try:
+                entry = fut.result()
+            except (OSError, ValueError) as e:
+                job.errors.append({"cp_id": cp_id, "error": str(e)})
+                logger.error(f"Spawn failed: {cp_id}: {e}")
+                continue
+            pid = entry.pid
+            store.clients[cp_id] = ClientProcess(pid=pid, port=port, cp_id=cp_id, city=city)
+            if entry.done:
+                # Kayıttan önce çıktıysa on_exit store'da bir şey bulamamıştır
+                _forget(entry)
+            job.results.append({"cp_id": cp_id, "pid": pid, "ui": ui_url(port, cp_id), "city": city})
+            logger.info(f"Spawned client: {cp_id} pid={pid} port={port}")
+        # Sonuçlar istek sırasıyla dönsün
+        order = {cp_id: i for i, cp_id in enumerate(todo)}
+        job.results.sort(key=lambda row: order[row["cp_id"]])
+    finally:
+        release_ports(ports)
+
+
+def _run(job: SpawnJob, target: Callable[[], None], on_done: Callable[[SpawnJob], None]) -> None:
+    job.state = "running"
+    job.started = time.perf_counter()
+    try:
+        target()
+        job.state = "done"
+    except Exception as e:
+        job.state = "failed"
+        job.error = str(e)
+        logger.error(f"Spawn job {job.job_id} failed: {e}")
+    finally:
+        job.finished = time.perf_counter()
+        try:
+            on_done(job)
+        finally:
+            job.done_event.set()
+
+
+def submit(mode: str, ids: List[str], target: Callable[[SpawnJob], None],
+           on_done: Callable[[SpawnJob], None] = lambda job: None) -> SpawnJob:
+    """target(job) ayrı bir koordinatör thread'inde çalışır."""
+    job = SpawnJob(job_id=uuid.uuid4().hex[:12], mode=mode, total=len(ids))
+    _register(job)
+    threading.Thread(target=_run, args=(job, lambda: target(job), on_done),
+                     name=f"spawn-job-{job.job_id}", daemon=True).start()
+    return job
+
+
+def submit_ui(ids: List[str], cmd: List[str], server_url: str, base_port: int, city: Optional[str],
+              ui_url: Callable[[int, str], str], on_done: Callable[[SpawnJob], None] = lambda job: None) -> SpawnJob:
+    return submit("ui", ids, lambda job: _run_ui(job, ids, cmd, server_url, base_port, city, ui_url), on_done)
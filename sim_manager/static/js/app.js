@@ -22,7 +22,7 @@
   async function loadHealth() {
     try {
       const data = await fetchJSON('/health');
-      $('#health-text').textContent = `ok=${data.ok} | clients=${data.clients} | scheme=${data.scheme} | base_port=${data.base_port}`;
+      $('#health-text').textContent = `ok=${data.ok} | clients=${data.clients} (ui=${data.ui_clients}, fleet=${data.fleet_clients}) | workers=${data.workers} | scheme=${data.scheme} | base_port=${data.base_port}`;
     } catch (e) {
       $('#health-text').textContent = 'ERR';
     }
@@ -37,7 +37,9 @@
         <td class="fw-semibold">${r.cp_id}</td>
         <td><code>${r.pid}</code></td>
         <td>${r.city ?? ''}</td>
-        <td><a class="btn btn-sm btn-outline-primary" href="${r.ui}" target="_blank">Aç</a></td>
+        <td>${r.ui
+          ? `<a class="btn btn-sm btn-outline-primary" href="${r.ui}" target="_blank">Aç</a>`
+          : `<span class="badge text-bg-secondary">worker ${r.worker}</span>`}</td>
         <td class="text-end">
           <button class="btn btn-sm btn-outline-danger kill-btn" data-cp="${r.cp_id}">Kill</button>
         </td>
@@ -103,20 +105,37 @@
       body.start_index = start_index;
     }
 
+    // Spawn arka planda iş olarak yürür; ilerleme SSE ile izlenir
+    body.wait = false;
     try {
-      const res = await fetchJSON('/clients/spawn', {
+      const job = await fetchJSON('/clients/spawn', {
         method: 'POST',
         headers: {'Content-Type': 'application/json'},
         body: JSON.stringify(body)
       });
-      if (!res.length) showToast('Yeni client üretilmedi (muhtemelen çakışan ID).', false);
-      else showToast(`Spawn OK (${res.length})`);
-      await refresh();
+      watchSpawnJob(job.events_url);
     } catch (e) {
       showToast(`Spawn failed: ${e.message}`, false);
     }
   });
 
+  function watchSpawnJob(url) {
+    const source = new EventSource(url);
+    source.addEventListener('progress', (ev) => {
+      const p = JSON.parse(ev.data);
+      showToast(`Spawning ${p.spawned}/${p.total}...`);
+    });
+    source.addEventListener('done', async (ev) => {
+      source.close();
+      const job = JSON.parse(ev.data);
+      if (job.state === 'failed') showToast(`Spawn failed: ${job.error}`, false);
+      else if (!job.spawned) showToast('Yeni client üretilmedi (muhtemelen çakışan ID).', false);
+      else showToast(`Spawn OK (${job.spawned}, ${job.cps_per_sec} CP/s)`);
+      await refresh();
+    });
+    source.onerror = () => source.close();
+  }
+
   // Buttons
   $('#refresh-btn').addEventListener('click', refresh);
   $('#kill-all-btn').addEventListener('click', async () => {
@@ -0,0 +1,389 @@
+# sim_manager/supervisor.py
+"""
+Olay güdümlü süreç denetçisi.
+
+UI'li client'lar ve fleet worker'ları buradan başlatılır. Her çocuk için
+bir pidfd (Linux >= 5.3) tek bir izleyici thread'inin selector'üne kaydedilir;
+süreç çıkınca fd okunabilir olur, izleyici çocuğu hemen reap eder (zombi
+kalmaz), durum tablosunu günceller ve on_exit'i çağırır. /health ve
+/clients istek başına os.kill(pid, 0) yoklaması yerine bu tabloya (store)
+bakar. pidfd yoksa (macOS, Windows, eski çekirdek) süreç başına proc.wait()
+bekleyen bir thread kullanılır.
+
+    - Aynı türdeki (ui / worker) çocuklar tek bir süreç grubunda toplanır;
+      stop_kind tüm grubu tek killpg ile kapatır. graceful=True önce
+      SIGTERM, timeout sonunda hâlâ çıkmayanlara SIGKILL
+    - restart=True ile beklenmedik çıkışta süreç jitter'lı üssel backoff ile
+      yeniden başlatılır; stable_after saniyeden uzun yaşamışsa backoff
+      sıfırlanır
+
+Ortam değişkenleri: SIM_AUTO_RESTART (0/1, UI'li client'lar için),
+SIM_RESTART_BASE, SIM_RESTART_CAP, SIM_STOP_TIMEOUT.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import random
+import selectors
+import signal
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from subprocess import Popen
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ocpp_common.metrics import MetricFamily, Sample
+
+logger = logging.getLogger("SimManager.Supervisor")
+
+AUTO_RESTART = os.getenv("SIM_AUTO_RESTART", "0") == "1"
+RESTART_BASE = float(os.getenv("SIM_RESTART_BASE", "1.0"))
+RESTART_CAP = float(os.getenv("SIM_RESTART_CAP", "60.0"))
+STOP_TIMEOUT = float(os.getenv("SIM_STOP_TIMEOUT", "5.0"))
+
+# Popen(process_group=...) 3.11+; fork sonrası setpgid'i C tarafında yapar
+# (preexec_fn'in aksine spawn thread havuzuyla güvenli)
+_GROUPS = os.name == "posix" and sys.version_info >= (3, 11)
+_PIDFD = hasattr(os, "pidfd_open")
+
+# factory(popen_kwargs) -> Popen; popen_kwargs süreç grubu ayarını taşır
+Factory = Callable[[dict], Popen]
+Key = Tuple[str, str]
+
+FINAL_STATES = ("exited", "stopped")
+
+
+@dataclass
+class ManagedProcess:
+    kind: str
+    name: str
+    factory: Factory = field(repr=False)
+    restart: bool = False
+    on_exit: Optional[Callable[["ManagedProcess"], None]] = field(default=None, repr=False)
+    on_restart: Optional[Callable[["ManagedProcess"], None]] = field(default=None, repr=False)
+    proc: Optional[Popen] = field(default=None, repr=False)
+    state: str = "starting"  # starting | running | backoff | exited | stopped
+    returncode: Optional[int] = None
+    restarts: int = 0
+    started_at: float = 0.0
+    exited_at: Optional[float] = None
+    stopping: bool = False
+    attempt: int = 0  # art arda başarısız yeniden başlatma (backoff üssü)
+    pgid: Optional[int] = None
+    timer: Optional[threading.Timer] = field(default=None, repr=False)
+    exited: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self.proc.pid if self.proc is not None else None
+
+    @property
+    def done(self) -> bool:
+        return self.state in FINAL_STATES
+
+    def to_dict(self) -> dict:
+        return {
+            "kind": self.kind,
+            "name": self.name,
+            "pid": self.pid,
+            "state": self.state,
+            "returncode": self.returncode,
+            "restarts": self.restarts,
+            "uptime_s": round(time.time() - self.started_at, 1) if self.state == "running" else None,
+        }
+
+
+class _Group:
+    """Bir türün süreç grubu: ilk üye lider olur, son üye reap edilince grup biter."""
+
+    def __init__(self) -> None:
+        self.pgid: Optional[int] = None
+        self.members = 0
+
+
+class Supervisor:
+    def __init__(self, restart_base: float = RESTART_BASE, restart_cap: float = RESTART_CAP,
+                 stable_after: float = 30.0):
+        self.restart_base = restart_base
+        self.restart_cap = restart_cap
+        self.stable_after = stable_after
+        self._table: Dict[Key, ManagedProcess] = {}
+        self._groups: Dict[str, _Group] = {}
+        self._lock = threading.RLock()
+        self._selector: Optional[selectors.BaseSelector] = None
+        self._wake_w: Optional[int] = None
+        self._rng = random.Random()
+        # Sayaçlar (bkz. collect_metrics)
+        self.exits: Dict[str, int] = {}
+        self.restart_count: Dict[str, int] = {}
+
+    # ------------------------------------------------------------
+    # Başlatma
+    # ------------------------------------------------------------
+    def start(self, kind: str, name: str, factory: Factory, restart: bool = False,
+              on_exit: Optional[Callable[[ManagedProcess], None]] = None,
+              on_restart: Optional[Callable[[ManagedProcess], None]] = None) -> ManagedProcess:
+        """
+        factory ile süreci aç ve izlemeye al. on_exit yalnızca son çıkışta
+        (yeniden başlatılmayacaksa) izleyici thread'inden çağrılır.
+        """
+        entry = ManagedProcess(kind=kind, name=name, factory=factory, restart=restart,
+                               on_exit=on_exit, on_restart=on_restart)
+        with self._lock:
+            old = self._table.get((kind, name))
+            if old is not None and not old.done:
+                raise ValueError(f"{kind} {name} is already supervised")
+            self._table[(kind, name)] = entry
+        try:
+            self._spawn(entry)
+        except BaseException:
+            with self._lock:
+                self._table.pop((kind, name), None)
+            raise
+        return entry
+
+    def _spawn(self, entry: ManagedProcess) -> None:
+        if not _GROUPS:
+            entry.proc = entry.factory({})
+        else:
+            with self._lock:
+                group = self._groups.setdefault(entry.kind, _Group())
+                joining = group.pgid if group.members else None
+                group.members += 1
+                if joining is None:
+                    # Grup yok: bu süreç lider olur; eşzamanlı spawn'lar pgid'i beklesin
+                    try:
+                        entry.proc = entry.factory({"process_group": 0})
+                    except BaseException:
+                        group.members -= 1
+                        raise
+                    group.pgid = entry.proc.pid
+                    joining = group.pgid
+            if entry.proc is None:
+                try:
+                    entry.proc = entry.factory({"process_group": joining})
+                except BaseException:
+                    with self._lock:
+                        group.members -= 1
+                    raise
+            entry.pgid = joining
+        entry.state = "running"
+        entry.started_at = time.time()
+        entry.returncode = None
+        entry.exited.clear()
+        self._watch(entry)
+
+    # ------------------------------------------------------------
+    # Çocuk izleyici
+    # ------------------------------------------------------------
+    def _watch(self, entry: ManagedProcess) -> None:
+        if _PIDFD:
+            try:
+                fd = os.pidfd_open(entry.proc.pid)
+            except OSError:
+                fd = None
+            if fd is not None:
+                with self._lock:
+                    self._ensure_watcher()
+                    self._selector.register(fd, selectors.EVENT_READ, entry)
+                os.write(self._wake_w, b"\0")  # select'i yeni fd ile yeniden kur
+                return
+        threading.Thread(target=self._wait_thread, args=(entry, entry.proc),
+                         name=f"supervise-{entry.name}", daemon=True).start()
+
+    def _ensure_watcher(self) -> None:
+        if self._selector is not None:
+            return
+        self._selector = selectors.DefaultSelector()
+        wake_r, self._wake_w = os.pipe()
+        os.set_blocking(wake_r, False)
+        self._selector.register(wake_r, selectors.EVENT_READ, None)
+        threading.Thread(target=self._watch_loop, args=(wake_r,), name="supervisor", daemon=True).start()
+
+    def _watch_loop(self, wake_r: int) -> None:
+        while True:
+            for key, _ in self._selector.select():
+                if key.data is None:
+                    try:
+                        os.read(wake_r, 4096)
+                    except BlockingIOError:
+                        pass
+                    continue
+                with self._lock:
+                    self._selector.unregister(key.fd)
+                os.close(key.fd)
+                self._reap(key.data, key.data.proc)
+
+    def _wait_thread(self, entry: ManagedProcess, proc: Popen) -> None:
+        proc.wait()
+        self._reap(entry, proc)
+
+    def _reap(self, entry: ManagedProcess, proc: Popen) -> None:
+        returncode = proc.wait()  # pidfd okunabilir: bloklamaz, zombiyi toplar
+        with self._lock:
+            if entry.pgid is not None:
+                group = self._groups[entry.kind]
+                group.members -= 1
+                if group.members == 0:
+                    group.pgid = None
+            entry.returncode = returncode
+            entry.exited_at = time.time()
+            self.exits[entry.kind] = self.exits.get(entry.kind, 0) + 1
+            again = entry.restart and not entry.stopping
+            if again:
+                lived = entry.exited_at - entry.started_at
+                entry.attempt = 0 if lived >= self.stable_after else entry.attempt + 1
+                delay = self._rng.uniform(0, min(self.restart_cap, self.restart_base * 2 ** entry.attempt))
+                entry.state = "backoff"
+                entry.timer = threading.Timer(delay, self._restart, args=(entry,))
+                entry.timer.daemon = True
+                entry.timer.start()
+            else:
+                entry.state = "stopped" if entry.stopping else "exited"
+                self._table.pop((entry.kind, entry.name), None)
+        entry.exited.set()
+        if again:
+            logger.warning(f"{entry.kind} {entry.name} (pid={proc.pid}) exited with {returncode}; "
+                           f"restarting in {delay:.1f}s")
+            return
+        if not entry.stopping:
+            logger.warning(f"{entry.kind} {entry.name} (pid={proc.pid}) exited with {returncode}")
+        self._finish(entry)
+
+    def _restart(self, entry: ManagedProcess) -> None:
+        with self._lock:
+            if entry.stopping:
+                entry.state = "stopped"
+                self._table.pop((entry.kind, entry.name), None)
+                finished = True
+            else:
+                finished = False
+        if finished:
+            self._finish(entry)
+            return
+        try:
+            self._spawn(entry)
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.error(f"Restart of {entry.kind} {entry.name} failed: {e}")
+            with self._lock:
+                entry.state = "exited"
+                self._table.pop((entry.kind, entry.name), None)
+            self._finish(entry)
+            return
+        entry.restarts += 1
+        self.restart_count[entry.kind] = self.restart_count.get(entry.kind, 0) + 1
+        logger.info(f"Restarted {entry.kind} {entry.name} pid={entry.pid} (restart #{entry.restarts})")
+        if entry.on_restart is not None:
+            entry.on_restart(entry)
+
+    @staticmethod
+    def _finish(entry: ManagedProcess) -> None:
+        if entry.on_exit is not None:
+            try:
+                entry.on_exit(entry)
+            except Exception:
+                logger.exception(f"on_exit failed for {entry.kind} {entry.name}")
+
+    # ------------------------------------------------------------
+    # Durdurma
+    # ------------------------------------------------------------
+    def stop(self, kind: str, name: str, graceful: bool = False, timeout: float = STOP_TIMEOUT) -> bool:
+        """Tek süreci durdur; graceful ise önce SIGTERM. Bilinmiyorsa False."""
+        with self._lock:
+            entry = self._table.get((kind, name))
+            if entry is None:
+                return False
+            self._mark_stopping(entry)
+        self._terminate([entry], graceful, timeout, group=None)
+        return True
+
+    def stop_kind(self, kind: str, graceful: bool = False, timeout: float = STOP_TIMEOUT) -> int:
+        """Bir türün tüm süreçlerini (POSIX'te tek killpg ile) durdur; sayıyı döner."""
+        with self._lock:
+            entries = [entry for (k, _), entry in self._table.items() if k == kind]
+            for entry in entries:
+                self._mark_stopping(entry)
+            group = self._groups.get(kind)
+            pgid = group.pgid if group is not None and group.members else None
+        self._terminate(entries, graceful, timeout, group=pgid)
+        return len(entries)
+
+    def shutdown(self, graceful: bool = True, timeout: float = STOP_TIMEOUT) -> int:
+        with self._lock:
+            kinds = {kind for kind, _ in self._table}
+        return sum(self.stop_kind(kind, graceful, timeout) for kind in kinds)
+
+    def _mark_stopping(self, entry: ManagedProcess) -> None:
+        entry.stopping = True
+        if entry.state == "backoff" and entry.timer is not None:
+            entry.timer.cancel()
+            entry.state = "stopped"
+            self._table.pop((entry.kind, entry.name), None)
+            entry.exited.set()
+            threading.Thread(target=self._finish, args=(entry,), daemon=True).start()
+
+    def _terminate(self, entries: List[ManagedProcess], graceful: bool, timeout: float,
+                   group: Optional[int]) -> None:
+        running = [entry for entry in entries if entry.state == "running"]
+        if not running:
+            return
+        if graceful:
+            self._signal(running, signal.SIGTERM, group)
+            deadline = time.monotonic() + timeout
+            for entry in running:
+                entry.exited.wait(max(0.0, deadline - time.monotonic()))
+            running = [entry for entry in running if not entry.exited.is_set()]
+            if not running:
+                return
+            logger.warning(f"{len(running)} process(es) ignored SIGTERM for {timeout}s; sending SIGKILL")
+        self._signal(running, getattr(signal, "SIGKILL", signal.SIGTERM), group)
+
+    @staticmethod
+    def _signal(entries: List[ManagedProcess], sig: int, group: Optional[int]) -> None:
+        if group is not None:
+            try:
+                os.killpg(group, sig)
+                return
+            except ProcessLookupError:
+                return
+            except OSError as e:
+                logger.warning(f"killpg({group}) failed: {e}; signalling one by one")
+        for entry in entries:
+            try:
+                if sig == signal.SIGTERM:
+                    entry.proc.terminate()
+                else:
+                    entry.proc.kill()  # Windows'ta TerminateProcess
+            except OSError:
+                pass
+
+    # ------------------------------------------------------------
+    # Durum tablosu
+    # ------------------------------------------------------------
+    def get(self, kind: str, name: str) -> Optional[ManagedProcess]:
+        return self._table.get((kind, name))
+
+    def snapshot(self) -> List[dict]:
+        with self._lock:
+            entries = list(self._table.values())
+        return [entry.to_dict() for entry in entries]
+
+    def collect_metrics(self) -> List[MetricFamily]:
+        states: Dict[Tuple[str, str], int] = {}
+        with self._lock:
+            for entry in self._table.values():
+                states[(entry.kind, entry.state)] = states.get((entry.kind, entry.state), 0) + 1
+        return [
+            MetricFamily("sim_supervised_processes", "gauge", "Supervised child processes by kind and state",
+                         [Sample("", {"kind": kind, "state": state}, n) for (kind, state), n in sorted(states.items())]),
+            MetricFamily("sim_process_exits_total", "counter", "Child process exits reaped by the supervisor",
+                         [Sample("", {"kind": kind}, n) for kind, n in sorted(self.exits.items())]),
+            MetricFamily("sim_process_restarts_total", "counter", "Automatic child process restarts",
+                         [Sample("", {"kind": kind}, n) for kind, n in sorted(self.restart_count.items())]),
+        ]
+
+
+supervisor = Supervisor()
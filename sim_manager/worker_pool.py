@@ -0,0 +1,218 @@
+# sim_manager/worker_pool.py
+"""
+Headless fleet worker havuzu.
+
+UI'siz client'lar CP başına ayrı süreç yerine, her biri bir CP shard'ını
+tek event loop'ta barındıran worker süreçlerinde çalışır
+(ocpp_client.client.fleet). sim_manager worker'larla 127.0.0.1 üzerindeki
+satır bazlı JSON kontrol kanalı ile konuşur.
+
+Worker'lar supervisor.py altında çalışır; çıkan worker ve barındırdığı
+CP'ler izleyici thread'inde store'dan düşürülür. Worker yeniden
+başlatılmaz (CP durumu süreç içindedir); eksik worker bir sonraki
+spawn'da ensure_workers ile açılır.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socket
+import sys
+import time
+from pathlib import Path
+from subprocess import Popen
+from typing import Dict, List, Optional
+
+from ocpp_common.metrics import MetricFamily, Sample
+
+from .process_store import store, WorkerProcess
+from .supervisor import ManagedProcess, supervisor
+
+logger = logging.getLogger("SimManager.Workers")
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+WORKER_COUNT = int(os.getenv("SIM_WORKERS", "0")) or (os.cpu_count() or 1)
+WORKER_BASE_PORT = int(os.getenv("SIM_WORKER_BASE_PORT", "9100"))
+
+
+class WorkerError(RuntimeError):
+    pass
+
+
+def send_command(port: int, payload: dict, timeout: float = 10.0) -> dict:
+    """Worker'a tek satır JSON gönderir, tek satır yanıt okur."""
+    with socket.create_connection(("127.0.0.1", port), timeout=timeout) as sock:
+        sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+        buf = bytearray()
+        while not buf.endswith(b"\n"):
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            buf.extend(chunk)
+    if not buf:
+        raise WorkerError(f"empty response from worker on port {port}")
+    return json.loads(buf)
+
+
+def _free_port(start_from: int) -> int:
+    p = start_from
+    while True:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            try:
+                s.bind(("127.0.0.1", p))
+                return p
+            except OSError:
+                p += 1
+
+
+def _wait_ready(port: int, worker_id: int, timeout: float = 15.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if supervisor.get("worker", str(worker_id)) is None:
+            return False  # hazır olmadan çıktı
+        try:
+            if send_command(port, {"cmd": "ping"}, timeout=1.0).get("ok"):
+                return True
+        except (OSError, ValueError, WorkerError):
+            time.sleep(0.2)
+    return False
+
+
+def _launch_worker(worker_id: int, port: int, popen_kwargs: dict) -> Popen:
+    logs = ROOT_DIR / "logs" / "workers"
+    logs.mkdir(parents=True, exist_ok=True)
+    cmd = [sys.executable, "-m", "ocpp_client.client.fleet", "--control-port", str(port)]
+    with open(logs / f"worker-{worker_id}.out", "ab") as out, open(logs / f"worker-{worker_id}.err", "ab") as err:
+        return Popen(cmd, cwd=str(ROOT_DIR), stdout=out, stderr=err, **popen_kwargs)
+
+
+def _worker_exited(entry: ManagedProcess) -> None:
+    worker_id = int(entry.name)
+    worker = store.workers.get(worker_id)
+    if worker is not None and worker.pid == entry.pid:
+        logger.warning(f"Fleet worker {worker_id} (pid={worker.pid}) is gone; dropping {len(worker.cp_ids)} CP(s)")
+        store.drop_worker(worker_id)
+
+
+def _start_worker(worker_id: int, port: int) -> WorkerProcess:
+    entry = supervisor.start("worker", str(worker_id),
+                             lambda popen_kwargs: _launch_worker(worker_id, port, popen_kwargs),
+                             on_exit=_worker_exited)
+    worker = WorkerProcess(worker_id=worker_id, pid=entry.pid, control_port=port)
+    logger.info(f"Started fleet worker {worker_id} pid={entry.pid} control_port={port}")
+    return worker
+
+
+def ensure_workers(count: int = WORKER_COUNT) -> List[WorkerProcess]:
+    """Eksik worker'ları başlat ve kontrol kanalı hazır olana kadar bekle."""
+    started = []
+    port = WORKER_BASE_PORT
+    for worker_id in range(count):
+        if worker_id in store.workers:
+            continue
+        port = _free_port(port)
+        worker = _start_worker(worker_id, port)
+        store.workers[worker_id] = worker
+        started.append(worker)
+        port += 1
+    for worker in started:
+        if not _wait_ready(worker.control_port, worker.worker_id):
+            supervisor.stop("worker", str(worker.worker_id))
+            store.drop_worker(worker.worker_id)
+            raise WorkerError(f"fleet worker {worker.worker_id} did not become ready")
+    return list(store.workers.values())
+
+
+def spawn(ids: List[str], server_url: str, city: Optional[str] = None) -> List[dict]:
+    """
+    id'leri en az yüklü worker'lara dağıt, her worker'a tek spawn komutu gönder.
+    """
+    workers = ensure_workers()
+    ids = [cp_id for cp_id in ids if cp_id not in store.fleet_clients and cp_id not in store.clients]
+
+    load = {w.worker_id: len(w.cp_ids) for w in workers}
+    shards: Dict[int, List[str]] = {w.worker_id: [] for w in workers}
+    for cp_id in ids:
+        worker_id = min(load, key=load.get)
+        shards[worker_id].append(cp_id)
+        load[worker_id] += 1
+
+    results = []
+    for worker_id, shard in shards.items():
+        if not shard:
+            continue
+        worker = store.workers[worker_id]
+        resp = send_command(worker.control_port, {"cmd": "spawn", "ids": shard, "server_url": server_url})
+        for cp_id in resp.get("accepted", []):
+            store.assign(cp_id, worker_id, city)
+            results.append({"cp_id": cp_id, "pid": worker.pid, "worker": worker_id, "city": city})
+    logger.info(f"Spawned {len(results)} fleet client(s) across {len(workers)} worker(s)")
+    return results
+
+
+def list_clients() -> List[dict]:
+    """Her worker'dan canlı durumu al; ulaşılamayan worker atlanır."""
+    out = []
+    for worker_id, worker in list(store.workers.items()):
+        try:
+            resp = send_command(worker.control_port, {"cmd": "list"})
+        except (OSError, ValueError, WorkerError) as e:
+            logger.error(f"Fleet worker {worker_id} unreachable: {e}")
+            continue
+        for row in resp.get("clients", []):
+            meta = store.fleet_clients.get(row["cp_id"])
+            out.append({
+                "cp_id": row["cp_id"],
+                "pid": worker.pid,
+                "ui": None,
+                "city": meta.city if meta else None,
+                "worker": worker_id,
+                "connected": row.get("accepted", False),
+            })
+    return out
+
+
+def collect_metrics() -> Dict[str, List[MetricFamily]]:
+    """worker_id -> worker'ın metrik aileleri (client + filo yeniden bağlanma)."""
+    groups = {}
+    for worker_id, worker in list(store.workers.items()):
+        try:
+            resp = send_command(worker.control_port, {"cmd": "metrics"}, timeout=5.0)
+        except (OSError, ValueError, WorkerError) as e:
+            logger.warning(f"Fleet worker {worker_id} unreachable for metrics: {e}")
+            continue
+        groups[str(worker_id)] = [
+            MetricFamily(name, kind, doc, [Sample(*sample) for sample in samples])
+            for name, kind, doc, samples in resp.get("families", [])
+        ]
+    return groups
+
+
+def kill(cp_id: str) -> bool:
+    """Worker'a ulaşılamazsa CP yine de düşürülür ve WorkerError yükselir."""
+    meta = store.fleet_clients.get(cp_id)
+    if meta is None:
+        return False
+    worker = store.workers.get(meta.worker_id)
+    try:
+        if worker is not None:
+            send_command(worker.control_port, {"cmd": "kill", "cp_id": cp_id})
+    except (OSError, ValueError, WorkerError) as e:
+        logger.error(f"Fleet worker {meta.worker_id} kill {cp_id} failed: {e}")
+        raise WorkerError(f"fleet worker {meta.worker_id} unreachable: {e}") from e
+    finally:
+        store.unassign(cp_id)
+    return True
+
+
+def kill_all() -> int:
+    count = 0
+    for worker in list(store.workers.values()):
+        try:
+            count += send_command(worker.control_port, {"cmd": "kill_all"}, timeout=60.0).get("count", 0)
+        except (OSError, ValueError, WorkerError) as e:
+            logger.error(f"Fleet worker {worker.worker_id} kill_all failed: {e}")
+        for cp_id in list(worker.cp_ids):
+            store.unassign(cp_id)
+    return count
@@ -0,0 +1,60 @@
+import asyncio
+import random
+
+from ocpp_client.client.clock import MaxSpeedClock
+from ocpp_client.client.timer_wheel import TimerWheel
+
+
+def _run_max_speed(schedule, timeout=5.0):
+    """schedule(wheel, done) zamanlayıcıları kurar; done set olunca biter."""
+    async def main():
+        clock = MaxSpeedClock()
+        wheel = TimerWheel(clock=clock)
+        done = asyncio.Event()
+        result = schedule(wheel, done)
+        await asyncio.wait_for(done.wait(), timeout)
+        return wheel, result
+
+    return asyncio.run(main())
+
+
+def test_every_timer_fires_once_on_max_speed_clock():
+    rng = random.Random(1)
+    delays = [0.3, 0.7, 1.1, 25.6, 61.7] + [round(rng.uniform(0.05, 3600), 1) for _ in range(500)]
+
+    def schedule(wheel, done):
+        fired = {}
+        start = wheel.clock.time()
+
+        def on_due(i, deadline):
+            assert wheel.clock.time() >= deadline - 1e-6  # erken değil
+            fired[i] = fired.get(i, 0) + 1
+            if len(wheel) == 0:
+                done.set()
+
+        for i, delay in enumerate(delays):
+            wheel.call_at(start + delay, on_due, i, start + delay)
+        return fired
+
+    wheel, fired = _run_max_speed(schedule)
+    assert fired == {i: 1 for i in range(len(delays))}
+    assert wheel.wakeups <= len(delays) * 2
+
+
+def test_rearming_heartbeat_keeps_firing_on_max_speed_clock():
+    def schedule(wheel, done):
+        beats = []
+
+        def beat():
+            beats.append(wheel.clock.time())
+            if len(beats) == 100:
+                done.set()
+            else:
+                wheel.call_later(60, beat)
+
+        wheel.call_later(60, beat)
+        return beats
+
+    wheel, beats = _run_max_speed(schedule)
+    assert len(beats) == 100
+    assert wheel.wakeups < 1000